@@ -1,7 +1,18 @@
 # AI Providers Package
-from .base_provider import BaseProvider
-from .anthropic_provider import AnthropicProvider
-from .huggingface_provider import HuggingFaceProvider
-from .provider_factory import ProviderFactory
+# Exports are imported on first access (PEP 562), so importing the package
+# does not load every provider SDK
+from lazy_exports import lazy_exports
 
-__all__ = ['BaseProvider', 'AnthropicProvider', 'HuggingFaceProvider', 'ProviderFactory']
+_EXPORTS = {
+    'BaseProvider': '.base_provider',
+    'AnthropicProvider': '.anthropic_provider',
+    'HuggingFaceProvider': '.huggingface_provider',
+    'StubProvider': '.stub_provider',
+    'ProviderFactory': '.provider_factory',
+    'SpeculativeAnalysisRegistry': '.speculative',
+    'AnalysisStore': '.analysis_store'
+}
+
+__all__ = ['BaseProvider', 'AnthropicProvider', 'HuggingFaceProvider', 'StubProvider', 'ProviderFactory', 'SpeculativeAnalysisRegistry', 'AnalysisStore']
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from config import config
+
+class AnalysisStore:
+    """
+    Keep recent AI analyses server-side so responses can reference them by id
+    instead of shipping every figure back and forth with each request
+
+    Recent analyses are held in this process; with a shared cache backend
+    they are also written there, so any worker can serve an analysis_id.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or config.ANALYSIS_STORE_SIZE
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, analysis):
+        """Store an analysis and return its content-derived id"""
+        canonical = json.dumps(analysis, sort_keys=True, separators=(',', ':'), default=str)
+        analysis_id = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+        with self._lock:
+            self._entries[analysis_id] = analysis
+            self._entries.move_to_end(analysis_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        shared = _shared_cache()
+        if shared is not None:
+            shared.set('analysis', analysis_id, analysis)
+
+        return analysis_id
+
+    def get(self, analysis_id):
+        """Return the stored analysis, or None if unknown or evicted"""
+        with self._lock:
+            analysis = self._entries.get(analysis_id)
+            if analysis is not None:
+                self._entries.move_to_end(analysis_id)
+                return analysis
+
+        # Stored by another worker, or before a restart
+        shared = _shared_cache()
+        analysis = shared.get('analysis', analysis_id) if shared is not None and analysis_id else None
+        if analysis is not None:
+            with self._lock:
+                self._entries[analysis_id] = analysis
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return analysis
+
+def _shared_cache():
+    from caching.cache_factory import get_cache
+    cache = get_cache('analysis')
+    return cache if cache is not None and cache.shared else None
+
+def strip_figures(analysis):
+    """Copy of an analysis without the chart figure specs (sent separately as rendered charts)"""
+    stripped = dict(analysis)
+    stripped['charts'] = [
+        {key: value for key, value in chart.items() if key != 'figure'}
+        for chart in analysis.get('charts', [])
+    ]
+    return stripped
+
+analysis_store = AnalysisStore()
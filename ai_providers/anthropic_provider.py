@@ -2,6 +2,7 @@ import anthropic
 from .base_provider import BaseProvider
 from visualization.templates import get_template_config
 from config import config
+from metrics import stage, observe_payload
 import json
 import base64
 
@@ -14,10 +15,13 @@ class AnthropicProvider(BaseProvider):
         """Analyze data using Claude"""
         try:
             # Prepare the data for Claude
-            data_summary = self._prepare_data_summary(extracted_data)
+            with stage('profile'):
+                data_summary = self._prepare_data_summary(extracted_data)
             
             # Create the prompt
-            prompt = self._create_analysis_prompt(data_summary, extracted_data, template_name)
+            with stage('prompt'):
+                prompt = self._create_analysis_prompt(data_summary, extracted_data, template_name)
+            observe_payload('prompt', len(prompt.encode('utf-8')))
             
             # Check if there's an image
             messages = []
@@ -27,16 +31,19 @@ class AnthropicProvider(BaseProvider):
                 messages = [{"role": "user", "content": prompt}]
             
             # Call Claude API
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=8192,  # Increased for full Plotly JSON
-                messages=messages
-            )
+            with stage('llm'):
+                response = self.client.messages.create(
+                    model=self.model,
+                    max_tokens=8192,  # Increased for full Plotly JSON
+                    messages=messages
+                )
             
             # Parse the response
             analysis_text = response.content[0].text
+            observe_payload('llm_response', len(analysis_text.encode('utf-8')))
             
-            analysis = self._parse_analysis(analysis_text)
+            with stage('parse'):
+                analysis = self._parse_analysis(analysis_text)
             
             return analysis
             
@@ -24,3 +24,7 @@ class BaseProvider(ABC):
     def is_available(self):
         """Check if the provider is properly configured and available"""
         pass
+    
+    def warm_up(self):
+        """Open connections ahead of the first request (optional; no-op by default)"""
+        pass
@@ -1,9 +1,25 @@
 import os
+import hashlib
 import requests
 from .base_provider import BaseProvider
 from visualization.templates import get_template_config
 from config import config
+from metrics import stage, observe_payload
+from caching.cache_factory import get_cache
 import json
+import threading
+
+# One pooled session per process: keeps TLS connections to the router alive between requests
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Shared keep-alive HTTP session for the Hugging Face router"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        return _session
 
 class HuggingFaceProvider(BaseProvider):
     """
@@ -13,7 +29,7 @@ class HuggingFaceProvider(BaseProvider):
 
     def __init__(self):
         self.api_key = os.getenv('HUGGINGFACE_API_KEY', '')
-        self.api_url = "https://router.huggingface.co/v1/chat/completions"
+        self.api_url = config.HUGGINGFACE_API_URL
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -26,10 +42,13 @@ class HuggingFaceProvider(BaseProvider):
         """Analyze data using Hugging Face Router API"""
         try:
             # Prepare the data for analysis
-            data_summary = self._prepare_data_summary(extracted_data)
+            with stage('profile'):
+                data_summary = self._prepare_data_summary(extracted_data)
 
             # Create the prompt
-            user_prompt = self._create_analysis_prompt(data_summary, extracted_data, template_name)
+            with stage('prompt'):
+                user_prompt = self._create_analysis_prompt(data_summary, extracted_data, template_name)
+            observe_payload('prompt', len(user_prompt.encode('utf-8')))
 
             # Call Hugging Face Router API using OpenAI-compatible format
             payload = {
@@ -49,25 +68,24 @@ class HuggingFaceProvider(BaseProvider):
                 "top_p": 0.95
             }
 
+            # Reuse the response to an identical request (same model, prompt and sampling)
+            cache = get_cache('llm')
+            cache_key = hashlib.sha256(json.dumps([self.api_url, payload], sort_keys=True).encode('utf-8')).hexdigest()
+            analysis_text = cache.get('llm', cache_key) if cache else None
+            cached = analysis_text is not None
+
             # Make the API request
-            response = requests.post(
-                self.api_url,
-                headers=self.headers,
-                json=payload,
-                timeout=90
-            )
-
-            # Check for errors
-            if response.status_code != 200:
-                error_detail = response.text
-                raise Exception(f"API returned status {response.status_code}: {error_detail}")
-
-            # Parse response
-            result = response.json()
-            analysis_text = result['choices'][0]['message']['content']
+            if not cached:
+                with stage('llm'):
+                    analysis_text = self._request_completion(payload)
 
             # Parse the analysis
-            analysis = self._parse_analysis(analysis_text)
+            with stage('parse'):
+                analysis = self._parse_analysis(analysis_text)
+
+            # Only replies that produced charts are kept, so a malformed one is retried next time
+            if cache and not cached and analysis.get('charts'):
+                cache.set('llm', cache_key, analysis_text)
 
             return analysis
 
@@ -75,6 +93,25 @@ class HuggingFaceProvider(BaseProvider):
             print(f"DEBUG: Hugging Face API Error: {str(e)}")
             raise Exception(f"Hugging Face API error: {str(e)}")
 
+    def _request_completion(self, payload):
+        """POST a chat completion to the router and return the message text"""
+        response = get_session().post(
+            self.api_url,
+            headers=self.headers,
+            json=payload,
+            timeout=90
+        )
+        observe_payload('llm_response', len(response.content))
+
+        # Check for errors
+        if response.status_code != 200:
+            error_detail = response.text
+            raise Exception(f"API returned status {response.status_code}: {error_detail}")
+
+        # Parse response
+        result = response.json()
+        return result['choices'][0]['message']['content']
+
     def _prepare_data_summary(self, extracted_data):
         """Prepare a summary of the extracted data"""
         summary = {
@@ -178,6 +215,10 @@ Return ONLY the JSON, no other text."""
                 "summary": "The AI model is processing your request. If you see this message repeatedly, the model may need more time to load."
             }
 
+    def warm_up(self):
+        """Open a pooled TLS connection to the router so the first analysis skips the handshake"""
+        get_session().head(self.api_url, headers=self.headers, timeout=10)
+
     def is_available(self):
         """Check if Hugging Face is properly configured"""
         return self.api_key is not None and self.api_key != ""
@@ -1,7 +1,13 @@
-from .anthropic_provider import AnthropicProvider
-from .huggingface_provider import HuggingFaceProvider
+import importlib
 from config import config
 
+# Provider name -> (module, class); SDKs are imported on first use
+PROVIDERS = {
+    'anthropic': ('.anthropic_provider', 'AnthropicProvider'),
+    'huggingface': ('.huggingface_provider', 'HuggingFaceProvider'),
+    'stub': ('.stub_provider', 'StubProvider')
+}
+
 class ProviderFactory:
     """Factory class to get the appropriate AI provider"""
     
@@ -34,15 +40,17 @@ class ProviderFactory:
         
         # Return the appropriate provider
         if provider_name == 'anthropic':
-            provider = AnthropicProvider()
+            provider = ProviderFactory.get_provider_class(provider_name)()
             if not provider.is_available():
                 raise ValueError("Anthropic API key not configured")
             return provider
         elif provider_name == 'huggingface':
-            provider = HuggingFaceProvider()
+            provider = ProviderFactory.get_provider_class(provider_name)()
             if not provider.is_available():
                 raise ValueError("Hugging Face API key not configured")
             return provider
+        elif provider_name == 'stub':
+            return ProviderFactory.get_provider_class(provider_name)()
         elif provider_name == 'openai':
             # TODO: Implement OpenAI provider
             raise ValueError("OpenAI provider not yet implemented")
@@ -55,6 +63,14 @@ class ProviderFactory:
         else:
             raise ValueError(f"Unsupported provider: {provider_name}")
     
+    @staticmethod
+    def get_provider_class(provider_name):
+        """Import and return the provider class for a name (without instantiating it)"""
+        if provider_name not in PROVIDERS:
+            raise ValueError(f"Unsupported provider: {provider_name}")
+        module_name, class_name = PROVIDERS[provider_name]
+        return getattr(importlib.import_module(module_name, __package__), class_name)
+    
     @staticmethod
     def get_available_providers():
         """Get a list of all available (enabled) providers"""
@@ -0,0 +1,233 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from config import config
+
+# How often /analyze checks on a speculation running in another worker
+SHARED_POLL_SECONDS = 0.2
+
+class SpeculativeAnalysisRegistry:
+    """
+    Start the default-provider analysis in the background as soon as a file is
+    uploaded, so /analyze can attach to the in-flight LLM call instead of
+    starting it only after the user has picked their options.
+
+    The job runs in the worker that handled /upload, while /analyze may land
+    on another. With a shared cache backend, each speculation is also
+    published in the 'speculation' namespace (running, then done with its
+    analysis), so other workers wait for it instead of repeating the LLM
+    call.
+    """
+
+    def __init__(self, max_workers=None, ttl_seconds=None):
+        self.max_workers = max_workers or config.SPECULATIVE_WORKERS
+        self.ttl_seconds = ttl_seconds or config.SPECULATIVE_TTL_SECONDS
+        self.shared_wait_seconds = config.SPECULATIVE_SHARED_WAIT_SECONDS
+        self._executor = None
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def start(self, upload_key, extracted_data, provider_name, template_name):
+        """
+        Kick off a background analysis for an upload
+
+        Args:
+            upload_key: Key identifying the upload (the stored file path)
+            extracted_data: Data already extracted, or None to extract the
+                file in the background first (/upload only extracts a preview)
+            provider_name: Provider the analysis is speculatively run with
+            template_name: Template the prompt is built for
+        """
+        with self._lock:
+            self._prune_expired()
+            previous = self._entries.pop(upload_key, None)
+            if previous:
+                self._cancel(upload_key, previous)
+
+            # Resolved by the job once the file is extracted, so a claim with other
+            # parameters can reuse the extraction instead of running a second one
+            extraction = Future()
+            if extracted_data is not None:
+                extraction.set_result(extracted_data)
+            abandoned = threading.Event()
+
+            # Run in a copy of the caller's context so metric labels carry over
+            future = self._get_executor().submit(
+                contextvars.copy_context().run,
+                self._run_analysis, upload_key, extraction, abandoned, provider_name, template_name
+            )
+            self._publish(upload_key, provider_name, template_name, {
+                'state': 'running',
+                'pid': os.getpid(),
+                'started_at': time.time()
+            })
+            self._entries[upload_key] = {
+                'future': future,
+                'extraction': extraction,
+                'abandoned': abandoned,
+                'provider': provider_name.lower(),
+                'template': template_name,
+                'created_at': time.monotonic()
+            }
+
+    def claim(self, upload_key, provider_name, template_name):
+        """
+        Attach to the speculative analysis for an upload
+
+        Returns:
+            Tuple (extracted_data, analysis) if a matching speculation exists and
+            succeeded. If only its extraction is usable (the speculation used
+            other parameters, or its analysis failed), analysis is None and the
+            caller analyzes the extracted data itself. None if there is nothing
+            to reuse. A speculation with other parameters is cancelled, or, if
+            it is already running, stops after its extraction.
+        """
+        with self._lock:
+            entry = self._entries.pop(upload_key, None)
+
+        if entry is None:
+            # Possibly started by another worker
+            return self._claim_shared(upload_key, provider_name, template_name)
+
+        expired = time.monotonic() - entry['created_at'] > self.ttl_seconds
+        if expired or entry['provider'] != provider_name.lower() or entry['template'] != template_name:
+            self._cancel(upload_key, entry)
+            return self._reuse_extraction(entry)
+
+        try:
+            result = entry['future'].result()
+        except Exception as e:
+            # Let /analyze retry the analysis in the foreground and surface its own error
+            print(f"Speculative analysis failed: {str(e)}")
+            return self._reuse_extraction(entry)
+        self._unpublish(upload_key, provider_name, template_name)
+        return result
+
+    def discard(self, upload_key):
+        """Cancel and forget any speculation for an upload"""
+        with self._lock:
+            entry = self._entries.pop(upload_key, None)
+        if entry:
+            self._cancel(upload_key, entry)
+
+    def _cancel(self, upload_key, entry):
+        """Stop a speculation: a queued job never runs, a running one stops after extracting"""
+        entry['abandoned'].set()
+        if entry['future'].cancel():
+            entry['extraction'].cancel()
+            self._unpublish(upload_key, entry['provider'], entry['template'])
+
+    def _reuse_extraction(self, entry):
+        """Wait for the speculation's extraction (already running, so cheaper than starting another)"""
+        try:
+            return entry['extraction'].result(), None
+        except CancelledError:
+            return None
+        except Exception as e:
+            print(f"Speculative extraction failed: {str(e)}")
+            return None
+
+    def _run_analysis(self, upload_key, extraction, abandoned, provider_name, template_name):
+        from .provider_factory import ProviderFactory
+        from metrics import set_metric_labels, stage
+
+        set_metric_labels(provider=provider_name.lower(), template=template_name)
+        try:
+            if not extraction.done():
+                from data_extractors.extractor_factory import ExtractorFactory
+                try:
+                    with stage('extract'):
+                        extraction.set_result(ExtractorFactory.extract(upload_key))
+                except Exception as e:
+                    extraction.set_exception(e)
+                    raise
+            extracted_data = extraction.result()
+
+            if abandoned.is_set():
+                # Claimed with other parameters: the extraction was all that was needed
+                self._unpublish(upload_key, provider_name, template_name)
+                return extracted_data, None
+
+            provider = ProviderFactory.get_provider(provider_name)
+            analysis = provider.analyze_data(extracted_data, template_name)
+        except Exception:
+            self._unpublish(upload_key, provider_name, template_name)
+            raise
+
+        self._publish(upload_key, provider_name, template_name, {
+            'state': 'done',
+            'started_at': time.time(),
+            'analysis': analysis
+        })
+        return extracted_data, analysis
+
+    def _claim_shared(self, upload_key, provider_name, template_name):
+        """Wait for (up to SPECULATIVE_SHARED_WAIT_SECONDS) and take a speculation published by another worker"""
+        cache = self._shared_cache()
+        if cache is None:
+            return None
+
+        key = self._shared_key(upload_key, provider_name, template_name)
+        deadline = time.monotonic() + self.shared_wait_seconds
+        while True:
+            entry = cache.get('speculation', key)
+            if entry is None or time.time() - entry['started_at'] > self.ttl_seconds:
+                return None
+            if entry['state'] == 'done':
+                break
+            if not _process_alive(entry['pid']) or time.monotonic() > deadline:
+                return None
+            time.sleep(SHARED_POLL_SECONDS)
+
+        cache.delete('speculation', key)
+        from data_extractors.extractor_factory import ExtractorFactory
+        from metrics import stage
+        # Extracted by the speculating worker, so normally an extraction cache hit
+        with stage('extract'):
+            extracted_data = ExtractorFactory.extract(upload_key)
+        return extracted_data, entry['analysis']
+
+    def _publish(self, upload_key, provider_name, template_name, entry):
+        cache = self._shared_cache()
+        if cache is not None:
+            cache.set('speculation', self._shared_key(upload_key, provider_name, template_name), entry)
+
+    def _unpublish(self, upload_key, provider_name, template_name):
+        cache = self._shared_cache()
+        if cache is not None:
+            cache.delete('speculation', self._shared_key(upload_key, provider_name, template_name))
+
+    def _shared_cache(self):
+        from caching.cache_factory import get_cache
+        cache = get_cache('speculation')
+        # An in-process backend sees nothing the local entries do not
+        return cache if cache is not None and cache.shared else None
+
+    def _shared_key(self, upload_key, provider_name, template_name):
+        return f"{upload_key}|{provider_name.lower()}|{template_name}"
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='speculative-analysis'
+            )
+        return self._executor
+
+    def _prune_expired(self):
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if now - e['created_at'] > self.ttl_seconds]:
+            self._cancel(key, self._entries.pop(key))
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+speculative_registry = SpeculativeAnalysisRegistry()
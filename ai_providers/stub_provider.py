@@ -0,0 +1,123 @@
+import itertools
+import json
+import threading
+import time
+from .huggingface_provider import HuggingFaceProvider
+from metrics import observe_payload
+from config import config
+
+# Canned responses loaded from STUB_RESPONSES_PATH, replayed round-robin across instances
+_responses = None
+_response_counter = itertools.count()
+_responses_lock = threading.Lock()
+
+class StubProvider(HuggingFaceProvider):
+    """
+    Local stand-in for the Hugging Face router, for benchmarks and offline development
+
+    The prompt is built and the reply parsed by the same code as the real
+    provider; only the HTTP call is replaced by a configurable delay
+    (STUB_LATENCY_SECONDS) and a canned reply. Replies are replayed from the
+    JSON list in STUB_RESPONSES_PATH, or built from the uploaded data's columns.
+    """
+
+    def __init__(self, latency=None):
+        super().__init__()
+        self.model = 'stub'
+        self.latency = config.STUB_LATENCY_SECONDS if latency is None else latency
+        self._extracted_data = {}
+
+    def analyze_data(self, extracted_data, template_name='professional'):
+        """Analyze data with a canned reply"""
+        self._extracted_data = extracted_data
+        return super().analyze_data(extracted_data, template_name)
+
+    def _request_completion(self, payload):
+        time.sleep(self.latency)
+        text = json.dumps(self._next_response())
+        observe_payload('llm_response', len(text.encode('utf-8')))
+        return text
+
+    def _next_response(self):
+        responses = _load_responses()
+        if responses:
+            return responses[next(_response_counter) % len(responses)]
+        return build_response(self._extracted_data)
+
+    def warm_up(self):
+        pass
+
+    def is_available(self):
+        """The stub needs no credentials"""
+        return True
+
+def _load_responses():
+    global _responses
+    if not config.STUB_RESPONSES_PATH:
+        return None
+    with _responses_lock:
+        if _responses is None:
+            with open(config.STUB_RESPONSES_PATH, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+            _responses = loaded if isinstance(loaded, list) else [loaded]
+        return _responses
+
+def build_response(extracted_data, max_points=2000):
+    """
+    A reply shaped like the model's: insights, a summary and three charts
+    (category bar, numeric line, scatter) over the uploaded columns
+    """
+    rows = extracted_data.get('dataframe') or extracted_data.get('sample_data') or []
+    sample = rows[:max_points]
+    columns = extracted_data.get('columns') or (list(sample[0].keys()) if sample else [])
+
+    numeric = [col for col in columns if sample and all(_is_number(row.get(col)) for row in sample[:20])]
+    text = [col for col in columns if col not in numeric]
+    category = text[0] if text else None
+    first, second = (numeric + [None, None])[:2]
+
+    charts = []
+    if category and first:
+        top = sample[:20]
+        charts.append(_chart('bar', f"{first} by {category}", {
+            'type': 'bar', 'x': [row.get(category) for row in top], 'y': [row.get(first) for row in top]
+        }, category, first))
+    if first:
+        charts.append(_chart('line', f"{first} over rows", {
+            'type': 'scatter', 'mode': 'lines', 'y': [row.get(first) for row in sample]
+        }, 'Row', first))
+    if first and second:
+        charts.append(_chart('scatter', f"{second} vs {first}", {
+            'type': 'scatter', 'mode': 'markers', 'x': [row.get(first) for row in sample], 'y': [row.get(second) for row in sample]
+        }, first, second))
+
+    return {
+        'insights': [
+            f"The data has {extracted_data.get('row_count', len(rows))} rows and {len(columns)} columns",
+            f"Numeric columns: {', '.join(map(str, numeric)) or 'none'}"
+        ],
+        'charts': charts,
+        'key_metrics': {'Rows': extracted_data.get('row_count', len(rows)), 'Columns': len(columns)},
+        'summary': 'Canned analysis from the local stub provider.'
+    }
+
+def _chart(chart_type, title, trace, x_title, y_title):
+    return {
+        'title': title,
+        'description': f"Stub {chart_type} chart",
+        'chart_type': chart_type,
+        'figure': {
+            'data': [trace],
+            'layout': {'title': title, 'xaxis': {'title': str(x_title)}, 'yaxis': {'title': str(y_title)}}
+        }
+    }
+
+def _is_number(value):
+    # PDF tables arrive as strings; numeric-looking strings still plot as numbers
+    if value is None or isinstance(value, (int, float)):
+        return True
+    try:
+        float(str(value).replace(',', ''))
+        return True
+    except ValueError:
+        return False
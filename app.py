@@ -1,11 +1,21 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, g
 import os
-from werkzeug.utils import secure_filename
 from config import config
 from ai_providers.provider_factory import ProviderFactory
+from ai_providers.speculative import speculative_registry
+from ai_providers.analysis_store import analysis_store, strip_figures
 from data_extractors.extractor_factory import ExtractorFactory
-from visualization.template_manager import TemplateManager
+from visualization.theming import get_theme_patch
+from warmup import warmup
+from profiling import maybe_start_profile
+from memory_accounting import MemoryBudgetExceeded
+from upload_store import upload_store
+from chunked_uploads import chunked_uploads, UploadNotFound, UploadTooLarge, UploadQuotaExceeded, UploadOffsetMismatch
+from metrics import registry, worker_activity, stage, set_metric_labels, clear_metric_labels, extractor_label, observe_payload, REQUEST_SECONDS, RESPONSE_BYTES, SPECULATION_CLAIMS
+import hashlib
 import json
+import tempfile
+import time
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = config.UPLOAD_FOLDER
@@ -15,10 +25,82 @@ app.config['MAX_CONTENT_LENGTH'] = config.MAX_FILE_SIZE
 os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
 os.makedirs('temp', exist_ok=True)
 
+@app.before_request
+def start_request_timer():
+    clear_metric_labels()
+    g.request_started = time.perf_counter()
+    worker_activity.begin()
+
+@app.before_request
+def start_warmup():
+    # Servers without a post_fork hook (flask run, other WSGI servers, the test client)
+    # start warm-up on the first request; a no-op once it has started
+    if warmup.status == 'pending':
+        warmup.start()
+
+@app.before_request
+def start_request_profile():
+    g.profile = maybe_start_profile(request)
+
+@app.after_request
+def finish_request_profile(response):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        response.headers['X-Profile-File'] = profile.finish() or ''
+    return response
+
+@app.teardown_request
+def end_request_activity(exc):
+    # Teardown runs for every request, including ones that raised
+    if g.pop('request_started', None) is not None:
+        worker_activity.end()
+
+@app.teardown_request
+def stop_request_profile(exc):
+    # Requests that failed before after_request still release their profiler
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.finish()
+
+@app.after_request
+def record_request_metrics(response):
+    # Route patterns, not raw paths, keep label cardinality bounded
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    if 'request_started' in g:
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_started,
+            endpoint=endpoint, method=request.method, status=response.status_code
+        )
+    if response.content_length is not None:
+        RESPONSE_BYTES.observe(response.content_length, endpoint=endpoint)
+    return response
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in config.ALLOWED_EXTENSIONS
 
+def get_output_format(data):
+    """Chart transport requested by the client ('json' or 'html')"""
+    output_format = data.get('format', config.CHART_OUTPUT_FORMAT)
+    if output_format not in config.CHART_OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported chart output format: {output_format}")
+    return output_format
+
+def figure_json_response(payload, status=200):
+    """Serialize a payload containing figure data with Plotly's fast JSON encoder (orjson when available)"""
+    from plotly.io.json import to_json_plotly
+    body = to_json_plotly(payload, engine=config.JSON_ENGINE)
+    return app.response_class(body, status=status, mimetype='application/json')
+
+def conditional_response(response, etag=None, cache_control='no-cache'):
+    """Attach an ETag (content hash unless given) and answer a matching If-None-Match with 304"""
+    if etag:
+        response.set_etag(etag)
+    else:
+        response.add_etag()
+    response.headers['Cache-Control'] = cache_control
+    return response.make_conditional(request)
+
 @app.route('/')
 def index():
     return render_template('index.html',
@@ -35,18 +117,30 @@ def upload_file():
             return jsonify({'error': 'No selected file'}), 400
         
         if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
+            # Stored under its content digest; an identical earlier upload is reused
+            stored = upload_store.save(file)
+            filepath = stored['filepath']
+            set_metric_labels(extractor=extractor_label(filepath))
+            observe_payload('upload', stored['size'])
             
-            # Extract data from file
-            extractor = ExtractorFactory.get_extractor(filepath)
-            data = extractor.extract()
+            # Only the preview is shown here; full extraction waits for analysis
+            with stage('preview'):
+                data = ExtractorFactory.extract_preview(filepath)
+            
+            # Start the default analysis (extracting in the background) while the user is still choosing options
+            if config.SPECULATIVE_ANALYSIS:
+                speculative_registry.start(
+                    filepath,
+                    None,
+                    config.DEFAULT_AI_PROVIDER,
+                    config.DEFAULT_TEMPLATE
+                )
             
             return jsonify({
                 'success': True,
-                'filename': filename,
+                'filename': stored['filename'],
                 'filepath': filepath,
+                'deduplicated': stored['deduplicated'],
                 'data_preview': data.get('preview', 'Data extracted successfully')
             })
         else:
@@ -55,37 +149,129 @@ def upload_file():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/upload/chunked', methods=['POST'])
+def create_chunked_upload():
+    """Start a resumable upload for files too large for /upload"""
+    try:
+        data = request.get_json(silent=True) or {}
+        filename = data.get('filename', '')
+        if not filename:
+            return jsonify({'error': 'No filename given'}), 400
+        if not allowed_file(filename):
+            return jsonify({'error': 'File type not allowed'}), 400
+        
+        upload = chunked_uploads.create(filename, data.get('size'))
+        upload['chunk_size'] = config.UPLOAD_CHUNK_MB * 1024 * 1024
+        return jsonify(upload), 201
+        
+    except UploadTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except UploadQuotaExceeded as e:
+        return jsonify({'error': str(e)}), 507
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Upload size must be given in bytes'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/upload/chunked/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    """Append the request body at Upload-Offset"""
+    try:
+        offset = request.headers.get('Upload-Offset', request.args.get('offset'))
+        if offset is None:
+            return jsonify({'error': 'Upload-Offset header is required'}), 400
+        
+        received = chunked_uploads.write_chunk(upload_id, int(offset), request.stream)
+        observe_payload('upload_chunk', received - int(offset))
+        return jsonify({'success': True, 'offset': received})
+        
+    except UploadOffsetMismatch as e:
+        # The client resumes from the offset we actually have
+        return jsonify({'error': str(e), 'offset': e.offset}), 409
+    except UploadNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except UploadTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/upload/chunked/<upload_id>', methods=['GET'])
+def chunked_upload_status(upload_id):
+    try:
+        return jsonify(chunked_uploads.status(upload_id))
+    except UploadNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/upload/chunked/<upload_id>/complete', methods=['POST'])
+def complete_chunked_upload(upload_id):
+    """Store the upload and extract it in the background; poll the status until 'ready'"""
+    try:
+        return jsonify(chunked_uploads.complete(upload_id)), 202
+    except UploadOffsetMismatch as e:
+        return jsonify({'error': f"Upload is incomplete: {str(e)}", 'offset': e.offset}), 409
+    except UploadNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/analyze', methods=['POST'])
 def analyze_data():
     try:
         data = request.json
         filepath = data.get('filepath')
-        provider_name = data.get('provider', config.DEFAULT_AI_PROVIDER)
+        provider_name = data.get('provider') or config.DEFAULT_AI_PROVIDER
         template_name = data.get('template', config.DEFAULT_TEMPLATE)
+        output_format = get_output_format(data)
+        set_metric_labels(extractor=extractor_label(filepath), provider=provider_name.lower(), template=template_name)
         
-        # Extract data
-        extractor = ExtractorFactory.get_extractor(filepath)
-        extracted_data = extractor.extract()
+        # Attach to the analysis started at upload time if it used the same parameters,
+        # or at least to its extraction if it did not
+        extracted_data, analysis = speculative_registry.claim(filepath, provider_name, template_name) or (None, None)
+        SPECULATION_CLAIMS.inc(result='hit' if analysis else 'extraction' if extracted_data else 'miss')
         
-        # Get AI provider
-        provider = ProviderFactory.get_provider(provider_name)
+        if extracted_data is None:
+            # Extract data
+            with stage('extract'):
+                extracted_data = ExtractorFactory.extract(filepath)
         
-        # Analyze data with AI
-        analysis = provider.analyze_data(extracted_data, template_name)
+        if analysis is None:
+            # Get AI provider
+            provider = ProviderFactory.get_provider(provider_name)
+            
+            # Analyze data with AI
+            analysis = provider.analyze_data(extracted_data, template_name)
         
         # Generate visualizations
-        template_manager = TemplateManager(template_name)
-        visualizations = template_manager.generate_visualizations(
-            extracted_data, 
-            analysis
-        )
+        with stage('render'):
+            from visualization.template_manager import TemplateManager
+            template_manager = TemplateManager(template_name, output_format)
+            visualizations = template_manager.generate_visualizations(
+                extracted_data, 
+                analysis
+            )
         
-        return jsonify({
-            'success': True,
-            'analysis': analysis,
-            'visualizations': visualizations
-        })
+        with stage('serialize'):
+            if output_format == 'json':
+                # Figures are sent once, as rendered charts; the analysis is kept server-side
+                return figure_json_response({
+                    'success': True,
+                    'analysis_id': analysis_store.put(analysis),
+                    'analysis': strip_figures(analysis),
+                    'visualizations': visualizations
+                })
+            
+            return jsonify({
+                'success': True,
+                'analysis': analysis,
+                'visualizations': visualizations
+            })
         
+    except MemoryBudgetExceeded as e:
+        return jsonify({'error': str(e)}), 413
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -95,38 +281,221 @@ def regenerate_visualization():
         data = request.json
         filepath = data.get('filepath')
         template_name = data.get('template')
-        previous_analysis = data.get('analysis')
+        output_format = get_output_format(data)
+        
+        if data.get('analysis_id'):
+            previous_analysis = analysis_store.get(data['analysis_id'])
+            if previous_analysis is None:
+                return jsonify({'error': 'Analysis not found. Please generate visualizations again.'}), 404
+        else:
+            previous_analysis = data.get('analysis')
+        
+        set_metric_labels(extractor=extractor_label(filepath), template=template_name)
         
         # Extract data
-        extractor = ExtractorFactory.get_extractor(filepath)
-        extracted_data = extractor.extract()
+        with stage('extract'):
+            extracted_data = ExtractorFactory.extract(filepath)
         
         # Generate visualizations with new template
-        template_manager = TemplateManager(template_name)
-        visualizations = template_manager.generate_visualizations(
-            extracted_data, 
-            previous_analysis
-        )
+        with stage('render'):
+            from visualization.template_manager import TemplateManager
+            template_manager = TemplateManager(template_name, output_format)
+            visualizations = template_manager.generate_visualizations(
+                extracted_data, 
+                previous_analysis
+            )
         
-        return jsonify({
-            'success': True,
-            'visualizations': visualizations
-        })
+        with stage('serialize'):
+            if output_format == 'json':
+                return figure_json_response({
+                    'success': True,
+                    'visualizations': visualizations
+                })
+            
+            return jsonify({
+                'success': True,
+                'visualizations': visualizations
+            })
+        
+    except MemoryBudgetExceeded as e:
+        return jsonify({'error': str(e)}), 413
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/visualizations/<analysis_id>', methods=['GET'])
+def get_visualizations(analysis_id):
+    """Cacheable GET form of /regenerate for a stored analysis (supports If-None-Match)"""
+    try:
+        template_name = request.args.get('template', config.DEFAULT_TEMPLATE)
+        output_format = get_output_format(request.args)
+        filepath = request.args.get('filepath')
+        
+        previous_analysis = analysis_store.get(analysis_id)
+        if previous_analysis is None:
+            return jsonify({'error': 'Analysis not found. Please generate visualizations again.'}), 404
+        
+        # The ETag is derived from the inputs, so a revalidation is answered before any work.
+        # Stored uploads are immutable and named by their digest; other files use size and mtime
+        file_stamp = upload_store.digest_of(filepath) if filepath else ''
+        if file_stamp is None and os.path.exists(filepath):
+            stat = os.stat(filepath)
+            file_stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+        etag = hashlib.sha256(
+            f"{analysis_id}|{template_name}|{output_format}|{filepath}|{file_stamp}".encode('utf-8')
+        ).hexdigest()[:32]
         
+        if request.if_none_match.contains(etag):
+            return conditional_response(app.response_class(status=304), etag=etag)
+        
+        set_metric_labels(extractor=extractor_label(filepath), template=template_name)
+        
+        with stage('extract'):
+            extracted_data = ExtractorFactory.extract(filepath) if filepath else {}
+        
+        with stage('render'):
+            from visualization.template_manager import TemplateManager
+            template_manager = TemplateManager(template_name, output_format)
+            visualizations = template_manager.generate_visualizations(
+                extracted_data, 
+                previous_analysis
+            )
+        
+        with stage('serialize'):
+            response = figure_json_response({'success': True, 'visualizations': visualizations})
+        
+        return conditional_response(response, etag=etag)
+        
+    except MemoryBudgetExceeded as e:
+        return jsonify({'error': str(e)}), 413
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/charts/<chart_id>', methods=['GET'])
+def get_chart(chart_id):
+    """Serve a rendered chart by its content-derived id; ids never change meaning, so it is immutable"""
+    from visualization.render_cache import render_cache
+    chart = render_cache.get_by_id(chart_id)
+    if chart is None:
+        return jsonify({'error': 'Chart not found'}), 404
+    
+    return conditional_response(
+        figure_json_response({'success': True, 'chart': chart}),
+        etag=chart_id,
+        cache_control='public, max-age=31536000, immutable'
+    )
+
+@app.route('/theme-patch', methods=['GET'])
+def theme_patch():
+    """Return the relayout/restyle patch that switches rendered charts between templates"""
+    try:
+        from_template = request.args.get('from', config.DEFAULT_TEMPLATE)
+        to_template = request.args.get('to', config.DEFAULT_TEMPLATE)
+        
+        if to_template not in config.AVAILABLE_TEMPLATES:
+            return jsonify({'error': f"Unknown template: {to_template}"}), 400
+        
+        patch = get_theme_patch(from_template, to_template)
+        
+        return conditional_response(
+            jsonify({'success': True, **patch}),
+            cache_control='public, max-age=3600'
+        )
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/health', methods=['GET'])
+def health():
+    """Readiness probe: 503 until the worker has finished warming up (warm-up starts with the first request)"""
+    state = warmup.snapshot()
+    if not warmup.is_ready():
+        return jsonify({'status': 'warming', 'warmup': state}), 503
+    return jsonify({'status': 'ready', 'warmup': state})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of this worker's stage timings, request latency, sizes and cache hit rates"""
+    return app.response_class(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    """Render, image and shared cache usage, upload storage and how often each figure budget limit fired"""
+    from visualization.render_cache import render_cache
+    from visualization.figure_budget import budget_counters
+    from visualization.static_export import static_renderer
+    from caching.cache_factory import get_cache
+    shared = next(filter(None, (get_cache(name) for name in config.CACHE_NAMESPACES)), None)
+    return jsonify({
+        'render_cache': render_cache.stats(),
+        'figure_budget': budget_counters.snapshot(),
+        'image_cache': static_renderer.stats(),
+        'shared_cache': shared.stats() if shared else None,
+        'uploads': upload_store.stats()
+    })
+
 @app.route('/export-pdf', methods=['POST'])
 def export_pdf():
+    """Build a PDF report for a stored analysis and stream it back"""
     try:
-        data = request.json
-        # TODO: Implement PDF export
-        return jsonify({'success': True, 'message': 'PDF export coming soon'})
+        data = request.json or {}
+        template_name = data.get('template', config.DEFAULT_TEMPLATE)
+        filepath = data.get('filepath')
+        
+        analysis = analysis_store.get(data.get('analysis_id'))
+        if analysis is None:
+            return jsonify({'error': 'Analysis not found. Please generate visualizations again.'}), 404
+        
+        set_metric_labels(extractor=extractor_label(filepath), template=template_name)
+        
+        with stage('extract'):
+            extracted_data = ExtractorFactory.extract(filepath) if filepath else {}
+        
+        from visualization.template_manager import TemplateManager
+        from visualization.static_export import static_renderer
+        from visualization.pdf_report import build_pdf_report
+        
+        # Same charts as the dashboard; usually served from the render cache
+        with stage('render'):
+            template_manager = TemplateManager(template_name, 'json')
+            visualizations = template_manager.generate_visualizations(extracted_data, analysis)
+        
+        layout_template = visualizations.get('layout_template')
+        charts = visualizations['charts']
+        figure_charts = [i for i, chart in enumerate(charts) if 'figure' in chart]
+        figures = [
+            dict(charts[i]['figure'], layout=dict({'template': layout_template}, **charts[i]['figure'].get('layout', {})))
+            for i in figure_charts
+        ]
+        
+        images = [None] * len(charts)
+        failed = set()
+        with stage('image'):
+            for i, image in zip(figure_charts, static_renderer.render_images(figures)):
+                images[i] = image
+                if image is None:
+                    failed.add(i)
+        
+        # Large reports spill to disk instead of being held in memory
+        with stage('pdf'):
+            report = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+            build_pdf_report(report, visualizations, images, failed)
+            report.seek(0)
+        
+        return send_file(
+            report,
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name='AI_Data_Analysis_Report.pdf',
+            max_age=0
+        )
+    except MemoryBudgetExceeded as e:
+        return jsonify({'error': str(e)}), 413
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
-    # For production deployment (Hugging Face, etc.)
+    # Development server; production runs gunicorn -c gunicorn.conf.py wsgi:app
     import os
     port = int(os.environ.get('PORT', 5000))
+    warmup.start()
     app.run(host='0.0.0.0', port=port, debug=False)
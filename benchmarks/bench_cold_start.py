@@ -0,0 +1,89 @@
+"""
+Cold-start benchmark: how long `import app` takes in a fresh interpreter,
+which modules dominate it, and whether heavy backends leaked back into the
+import path
+
+Exits non-zero when the median import time exceeds --max-seconds or a heavy
+module is imported eagerly, so it can gate CI.
+
+Usage:
+    python -m benchmarks.bench_cold_start [--runs 5] [--max-seconds 0.5] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Backends that must only load on first use
+HEAVY_MODULES = ('plotly', 'pandas', 'numpy', 'anthropic', 'pdfplumber', 'pytesseract', 'PIL', 'reportlab', 'kaleido')
+
+PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import app\n"
+    "elapsed = time.perf_counter() - start\n"
+    f"loaded = [name for name in {HEAVY_MODULES!r} if name in sys.modules]\n"
+    "print(elapsed, ','.join(loaded))\n"
+)
+
+def run_python(args):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    return subprocess.run([sys.executable] + args, cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True)
+
+def measure_import(runs):
+    """Median wall time of `import app` over fresh interpreters, plus eagerly loaded heavy modules"""
+    timings, leaked = [], set()
+    for _ in range(runs):
+        elapsed, loaded = run_python(['-c', PROBE]).stdout.strip().splitlines()[-1].split(' ', 1) + ['']
+        timings.append(float(elapsed))
+        leaked.update(name for name in loaded.split(',') if name)
+    return statistics.median(timings), sorted(leaked)
+
+def import_profile(top):
+    """Top-level packages by cumulative import time, from python -X importtime"""
+    stderr = run_python(['-X', 'importtime', '-c', 'import app']).stderr
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented; count each package once at its outermost import
+        depth = len(name) - len(name.lstrip()) - 1
+        package = name.strip().split('.')[0]
+        if depth == 0 or package == 'app':
+            continue
+        current = packages.get(package)
+        if current is None or depth < current[1]:
+            packages[package] = (int(cumulative), depth)
+    return sorted(((us, package) for package, (us, _) in packages.items()), reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=0.5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    print("Import-time profile (cumulative, top-level packages):")
+    for microseconds, package in import_profile(args.top):
+        print(f"  {package:<30} {microseconds / 1000:>8.1f}ms")
+
+    median, leaked = measure_import(args.runs)
+    print(f"\nimport app: {median * 1000:.1f}ms median over {args.runs} runs (limit {args.max_seconds * 1000:.0f}ms)")
+
+    failed = False
+    if leaked:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(leaked)}")
+        failed = True
+    if median > args.max_seconds:
+        print("FAIL: cold start exceeds the limit")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
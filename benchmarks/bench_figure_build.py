@@ -0,0 +1,69 @@
+"""
+Benchmark AI chart rendering: full go.Figure validation versus the
+structural check + dict-level layout merge fast path
+
+Usage:
+    python -m benchmarks.bench_figure_build [--points 1000 10000 100000] [--traces 3]
+"""
+import argparse
+import time
+import numpy as np
+from config import config
+from visualization.chart_generator import ChartGenerator
+
+def make_spec(points, traces, seed=0):
+    """An AI-style spec: plain JSON lists, like a parsed LLM response"""
+    rng = np.random.default_rng(seed)
+    return {
+        'title': 'Benchmark',
+        'chart_type': 'bar',
+        'figure': {
+            'data': [
+                {
+                    'type': 'bar',
+                    'name': f"series {i}",
+                    'x': [f"item {j}" for j in range(points)],
+                    'y': rng.random(points).round(3).tolist(),
+                    'marker': {'color': '#4A90E2'}
+                }
+                for i in range(traces)
+            ],
+            'layout': {'title': 'Benchmark', 'xaxis': {'title': 'Item'}, 'yaxis': {'title': 'Value'}}
+        }
+    }
+
+def render_seconds(spec, full_validation, output_format, repeat):
+    config.FULL_FIGURE_VALIDATION = full_validation
+    generator = ChartGenerator('professional', output_format)
+    # Bypass the render cache so every iteration renders
+    render = ChartGenerator.create_chart_from_json.__wrapped__
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chart = render(generator, spec)
+        best = min(best, time.perf_counter() - start)
+    assert chart['type'] != 'error', chart
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--traces', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    original = config.FULL_FIGURE_VALIDATION
+    try:
+        print(f"{'points':>9} {'format':>6} {'go.Figure':>11} {'fast path':>11} {'speedup':>8}")
+        for points in args.points:
+            spec = make_spec(points, args.traces)
+            for output_format in config.CHART_OUTPUT_FORMATS:
+                full = render_seconds(spec, True, output_format, args.repeat)
+                fast = render_seconds(spec, False, output_format, args.repeat)
+                print(f"{points:>9,} {output_format:>6} {full:>10.3f}s {fast:>10.3f}s {full / fast:>7.1f}x")
+    finally:
+        config.FULL_FIGURE_VALIDATION = original
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark figure JSON size and encode latency: plain number lists versus
+base64 typed arrays
+
+Usage:
+    python -m benchmarks.bench_typed_arrays [--points 1000 10000 100000 1000000]
+"""
+import argparse
+import gzip
+import json
+import time
+import numpy as np
+from plotly.io.json import to_json_plotly
+from config import config
+from visualization.encoding import encode_typed_arrays
+
+def make_figure(points, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        'data': [
+            {'type': 'scattergl', 'mode': 'markers', 'x': rng.random(points) * 1000, 'y': rng.standard_normal(points)},
+            {'type': 'scattergl', 'mode': 'lines', 'x': np.arange(points), 'y': np.cumsum(rng.standard_normal(points))}
+        ],
+        'layout': {'title': 'Benchmark'}
+    }
+
+def best_of(fn, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'points':>10} {'encoding':>12} {'bytes':>12} {'gzip bytes':>12} {'encode':>9} {'parse':>9}")
+    for points in args.points:
+        figure = make_figure(points)
+        candidates = {
+            'json lists': lambda: to_json_plotly(figure, engine=config.JSON_ENGINE),
+            'typed array': lambda: to_json_plotly(encode_typed_arrays(figure, min_length=1), engine=config.JSON_ENGINE)
+        }
+        for name, encode in candidates.items():
+            body, encode_seconds = best_of(encode, args.repeat)
+            # Client-side parse cost proxy: JSON.parse of the body
+            _, parse_seconds = best_of(lambda: json.loads(body), args.repeat)
+            print(
+                f"{points:>10,} {name:>12} {len(body):>12,} {len(gzip.compress(body.encode('utf-8'), 6)):>12,} "
+                f"{encode_seconds * 1000:>7.1f}ms {parse_seconds * 1000:>7.1f}ms"
+            )
+
+if __name__ == '__main__':
+    main()
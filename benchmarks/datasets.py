@@ -0,0 +1,133 @@
+"""
+Deterministic synthetic inputs for the benchmark suite
+
+Every format holds the same sales table (date, region, product, units,
+price, revenue) generated from a fixed seed, so runs on different machines
+and commits process identical bytes. Files are written once per
+(format, scale) and reused from the data directory.
+
+Usage:
+    python -m benchmarks.datasets [--scales small medium] [--formats csv xlsx pdf png]
+"""
+import argparse
+import os
+import tempfile
+import numpy as np
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'report-benchmark-data')
+
+FORMATS = ('csv', 'xlsx', 'pdf', 'png')
+
+# Size of each input: rows for tabular formats, pages for PDF and PNG
+SCALES = {
+    'small': {'csv': 1000, 'xlsx': 1000, 'pdf': 1, 'png': 1},
+    'medium': {'csv': 100000, 'xlsx': 100000, 'pdf': 30, 'png': 5},
+    'large': {'csv': 1000000, 'xlsx': 1000000, 'pdf': 300, 'png': 20}
+}
+
+ROWS_PER_PAGE = 40
+
+COLUMNS = ['Date', 'Region', 'Product', 'Units', 'Price', 'Revenue']
+REGIONS = ['North', 'South', 'East', 'West', 'Central']
+PRODUCTS = ['Widget', 'Gadget', 'Gizmo', 'Doohickey', 'Sprocket', 'Flange', 'Bracket', 'Valve']
+
+def sales_table(rows, seed=0):
+    """Synthetic sales rows as a DataFrame"""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    units = rng.integers(1, 500, rows)
+    price = np.round(rng.uniform(2, 250, rows), 2)
+    return pd.DataFrame({
+        'Date': (np.datetime64('2020-01-01') + rng.integers(0, 1460, rows).astype('timedelta64[D]')).astype(str),
+        'Region': np.array(REGIONS)[rng.integers(0, len(REGIONS), rows)],
+        'Product': np.array(PRODUCTS)[rng.integers(0, len(PRODUCTS), rows)],
+        'Units': units,
+        'Price': price,
+        'Revenue': np.round(units * price, 2)
+    }, columns=COLUMNS)
+
+def write_csv(path, rows):
+    sales_table(rows).to_csv(path, index=False)
+
+def write_xlsx(path, rows):
+    # Write-only mode streams rows to disk; pandas' writer keeps the whole workbook in memory
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sales')
+    sheet.append(COLUMNS)
+    for record in sales_table(rows).itertuples(index=False):
+        sheet.append([record.Date, record.Region, record.Product, int(record.Units), float(record.Price), float(record.Revenue)])
+    workbook.save(path)
+
+def write_pdf(path, pages):
+    """One table of ROWS_PER_PAGE rows per page"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, PageBreak
+
+    df = sales_table(pages * ROWS_PER_PAGE).astype(str)
+    style = TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('FONTSIZE', (0, 0), (-1, -1), 7)
+    ])
+    story = []
+    for page in range(pages):
+        chunk = df.iloc[page * ROWS_PER_PAGE:(page + 1) * ROWS_PER_PAGE]
+        story.append(Table([COLUMNS] + chunk.values.tolist(), style=style))
+        story.append(PageBreak())
+    SimpleDocTemplate(path, pagesize=A4).build(story)
+
+def write_png(path, pages):
+    """A table image, one page of ROWS_PER_PAGE rows stacked per page"""
+    from PIL import Image, ImageDraw
+
+    df = sales_table(pages * ROWS_PER_PAGE).astype(str)
+    line_height, column_width = 24, 130
+    image = Image.new('RGB', (column_width * len(COLUMNS) + 40, line_height * (len(df) + pages) + 40), 'white')
+    draw = ImageDraw.Draw(image)
+    y = 20
+    for page in range(pages):
+        chunk = df.iloc[page * ROWS_PER_PAGE:(page + 1) * ROWS_PER_PAGE]
+        for row in [COLUMNS] + chunk.values.tolist():
+            for index, value in enumerate(row):
+                draw.text((20 + index * column_width, y), value, fill='black')
+            y += line_height
+    image.save(path, optimize=False)
+
+WRITERS = {
+    'csv': write_csv,
+    'xlsx': write_xlsx,
+    'pdf': write_pdf,
+    'png': write_png
+}
+
+def dataset_path(file_format, scale, data_dir=DEFAULT_DATA_DIR):
+    """Path of a synthetic input, generating it on first use"""
+    size = SCALES[scale][file_format]
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"sales_{scale}_{size}.{file_format}")
+    if not os.path.exists(path):
+        print(f"Generating {os.path.basename(path)}...")
+        # Write under a temporary name so an interrupted run never leaves a truncated input
+        partial = f"{path}.partial.{file_format}"
+        WRITERS[file_format](partial, size)
+        os.replace(partial, path)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=list(SCALES))
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        for file_format in args.formats:
+            path = dataset_path(file_format, scale, args.data_dir)
+            print(f"{path}: {os.path.getsize(path):,} bytes")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""
+Local stand-in for the Hugging Face router's chat-completions endpoint
+
+Serves POST /v1/chat/completions with OpenAI-shaped replies built from the
+prompt's column names and sample rows. Each call holds one of --replicas
+model slots for a service time drawn from a lognormal distribution
+(--latency-median, --latency-sigma); calls beyond the free slots wait in a
+queue, and are rejected with 429 once --queue-limit calls are waiting, as
+the real router does under load. GET /stats reports calls, queueing and
+concurrency.
+
+Point the app at it with HUGGINGFACE_API_URL=http://127.0.0.1:<port>/v1/chat/completions
+and any non-empty HUGGINGFACE_API_KEY.
+
+Usage:
+    python -m benchmarks.fake_router [--port 8089] [--replicas 8] [--latency-median 2.0]
+        [--latency-sigma 0.5] [--queue-limit 64]
+"""
+import argparse
+import json
+import math
+import re
+import threading
+import time
+import numpy as np
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHAT_PATH = '/v1/chat/completions'
+
+class RouterSimulator:
+    """Model slots, queue and latency distribution shared by all handler threads"""
+
+    def __init__(self, replicas=8, latency_median=2.0, latency_sigma=0.5, queue_limit=64, seed=0):
+        self.replicas = replicas
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.queue_limit = queue_limit
+        self._slots = threading.Semaphore(replicas)
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.rejected = 0
+        self.waiting = 0
+        self.active = 0
+        self.max_waiting = 0
+        self.max_active = 0
+        self.queue_seconds = []
+        self.service_seconds = []
+
+    def service_time(self):
+        with self._lock:
+            return float(self._rng.lognormal(math.log(self.latency_median), self.latency_sigma))
+
+    def call(self):
+        """
+        Occupy a model slot for one completion
+
+        Returns:
+            (queue_seconds, service_seconds), or None if the queue is full
+        """
+        with self._lock:
+            if self.waiting >= self.queue_limit:
+                self.rejected += 1
+                return None
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+        queued_at = time.perf_counter()
+        self._slots.acquire()
+        queue_seconds = time.perf_counter() - queued_at
+        with self._lock:
+            self.waiting -= 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+        try:
+            service_seconds = self.service_time()
+            time.sleep(service_seconds)
+        finally:
+            self._slots.release()
+            with self._lock:
+                self.active -= 1
+                self.calls += 1
+                self.queue_seconds.append(queue_seconds)
+                self.service_seconds.append(service_seconds)
+        return queue_seconds, service_seconds
+
+    def stats(self):
+        with self._lock:
+            return {
+                'replicas': self.replicas,
+                'calls': self.calls,
+                'rejected': self.rejected,
+                'active': self.active,
+                'waiting': self.waiting,
+                'max_active': self.max_active,
+                'max_waiting': self.max_waiting,
+                'queue_seconds': _summary(self.queue_seconds),
+                'service_seconds': _summary(self.service_seconds)
+            }
+
+def completion_text(prompt):
+    """Reply JSON for a prompt, built from the columns and sample rows it quotes"""
+    from ai_providers.stub_provider import build_response
+
+    columns = re.search(r'- Column names: (.*)', prompt)
+    sample = re.search(r'Sample Data \(first 5 rows\):\n(.*?)\n\nTask:', prompt, re.S)
+    try:
+        rows = json.loads(sample.group(1)) if sample else []
+    except json.JSONDecodeError:
+        rows = []
+    return json.dumps(build_response({
+        'columns': columns.group(1).split(', ') if columns and columns.group(1) else [],
+        'sample_data': rows,
+        'row_count': len(rows)
+    }))
+
+def make_handler(simulator):
+    class RouterHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_HEAD(self):
+            # Connection warm-up from HuggingFaceProvider.warm_up
+            self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self._send_json(200, simulator.stats())
+            else:
+                self._send_json(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path != CHAT_PATH:
+                self._send_json(404, {'error': 'Not found'})
+                return
+            try:
+                payload = json.loads(body)
+                prompt = payload['messages'][-1]['content']
+            except (ValueError, KeyError, IndexError):
+                self._send_json(400, {'error': 'Malformed chat completion request'})
+                return
+
+            if simulator.call() is None:
+                self._send_json(429, {'error': 'Model is overloaded, please retry later'})
+                return
+            self._send_json(200, {
+                'object': 'chat.completion',
+                'model': payload.get('model', 'fake'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': completion_text(prompt)}, 'finish_reason': 'stop'}]
+            })
+
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return RouterHandler
+
+def start_router(simulator, host='127.0.0.1', port=0):
+    """Serve the simulator from a daemon thread; returns the server (server.server_port is the bound port)"""
+    server = ThreadingHTTPServer((host, port), make_handler(simulator))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fake-router', daemon=True).start()
+    return server
+
+def _summary(values):
+    if not values:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    ordered = sorted(values)
+    return {
+        'mean': sum(ordered) / len(ordered),
+        'p50': percentile(ordered, 50),
+        'p95': percentile(ordered, 95),
+        'max': ordered[-1]
+    }
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+def add_router_arguments(parser):
+    parser.add_argument('--replicas', type=int, default=8, help='concurrent completions the router serves')
+    parser.add_argument('--latency-median', type=float, default=2.0, help='median completion time in seconds')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='lognormal shape of completion times')
+    parser.add_argument('--queue-limit', type=int, default=64, help='waiting calls before the router answers 429')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    add_router_arguments(parser)
+    args = parser.parse_args()
+
+    simulator = RouterSimulator(args.replicas, args.latency_median, args.latency_sigma, args.queue_limit)
+    server = start_router(simulator, args.host, args.port)
+    print(f"Fake router listening on http://{args.host}:{server.server_port}{CHAT_PATH}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(json.dumps(simulator.stats(), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+"""
+Concurrent load test: a configurable mix of uploads, analyses and template
+switches against a running app, with a simulated Hugging Face router
+
+Each virtual user keeps its own upload and analysis, and picks its next
+operation from --mix (weights per operation); an operation whose
+prerequisite is missing runs the prerequisite instead. The LLM calls go to
+benchmarks.fake_router, started in-process unless --router-url is given, so
+results reflect queueing at the model as well as in the app's workers.
+
+Reports throughput and p50/p95/p99 latency per route, and worker
+saturation from the dataviz_worker_* series on /metrics (busy fraction and
+mean requests in flight per worker pid). Run it against each serving setup
+(dev server, gunicorn sync/gthread/gevent, pool sizes) to compare them.
+
+Usage:
+    python -m benchmarks.load_test --app-command "python app.py" --url http://127.0.0.1:5000
+        [--concurrency 16] [--duration 60] [--mix upload=1,analyze=2,regenerate=4]
+        [--replicas 8] [--latency-median 2.0] [--output load.json]
+
+Without --app-command the app at --url must already be running with
+HUGGINGFACE_API_URL pointing at the router (printed on start-up).
+"""
+import argparse
+import json
+import os
+import random
+import re
+import shlex
+import subprocess
+import threading
+import time
+from collections import defaultdict
+import requests
+from benchmarks.fake_router import CHAT_PATH, RouterSimulator, add_router_arguments, percentile, start_router
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OPERATIONS = ('upload', 'analyze', 'regenerate')
+
+WORKER_SERIES = re.compile(r'^(dataviz_worker_\w+)\{pid="(\d+)"\} (\S+)$', re.M)
+
+class VirtualUser(threading.Thread):
+    """One client session looping over weighted operations until the deadline"""
+
+    def __init__(self, index, args, dataset, deadline, results):
+        super().__init__(name=f"load-user-{index}", daemon=True)
+        self.index = index
+        self.args = args
+        self.dataset = dataset
+        self.deadline = deadline
+        self.results = results
+        self.random = random.Random(args.seed + index)
+        self.session = requests.Session()
+        self.filepath = None
+        self.analysis_id = None
+        self.template = args.templates[0]
+
+    def run(self):
+        operations, weights = zip(*self.args.mix.items())
+        while time.monotonic() < self.deadline:
+            operation = self.random.choices(operations, weights)[0]
+            if operation == 'regenerate' and self.analysis_id is None:
+                operation = 'analyze'
+            if operation == 'analyze' and self.filepath is None:
+                operation = 'upload'
+            getattr(self, operation)()
+            if self.args.think_time:
+                time.sleep(self.random.expovariate(1 / self.args.think_time))
+
+    def upload(self):
+        with open(self.dataset, 'rb') as f:
+            body = self._request('/upload', files={'file': (os.path.basename(self.dataset), f)})
+        if body:
+            self.filepath, self.analysis_id = body['filepath'], None
+
+    def analyze(self):
+        self.template = self.random.choice(self.args.templates)
+        body = self._request('/analyze', json={
+            'filepath': self.filepath,
+            'provider': 'huggingface',
+            'template': self.template,
+            'format': 'json'
+        })
+        if body:
+            self.analysis_id = body.get('analysis_id')
+
+    def regenerate(self):
+        choices = [name for name in self.args.templates if name != self.template] or self.args.templates
+        self.template = self.random.choice(choices)
+        self._request('/regenerate', json={
+            'filepath': self.filepath,
+            'template': self.template,
+            'format': 'json',
+            'analysis_id': self.analysis_id
+        })
+
+    def _request(self, route, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.args.url + route, timeout=self.args.timeout, **kwargs)
+            status = response.status_code
+            body = response.json() if status == 200 else None
+        except (requests.RequestException, ValueError) as e:
+            status, body = type(e).__name__, None
+        self.results.append((route, status, time.perf_counter() - start, time.monotonic()))
+        return body
+
+class WorkerSampler(threading.Thread):
+    """Scrape /metrics periodically and keep the first and last worker sample per pid"""
+
+    def __init__(self, url, interval):
+        super().__init__(name='load-metrics', daemon=True)
+        self.url = url
+        self.interval = interval
+        self.first = {}
+        self.last = {}
+        self.max_in_flight = defaultdict(int)
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                # A new connection per scrape, so scrapes spread over all worker processes
+                text = requests.get(self.url + '/metrics', headers={'Connection': 'close'}, timeout=self.interval * 5).text
+            except requests.RequestException:
+                continue
+            now = time.monotonic()
+            samples = defaultdict(dict)
+            for name, pid, value in WORKER_SERIES.findall(text):
+                samples[pid][name] = float(value)
+            for pid, values in samples.items():
+                values['at'] = now
+                self.first.setdefault(pid, values)
+                self.last[pid] = values
+                self.max_in_flight[pid] = max(self.max_in_flight[pid], int(values.get('dataviz_worker_requests_in_flight', 0)))
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def saturation(self):
+        """Per worker pid: busy fraction and mean requests in flight between its first and last scrape"""
+        workers = {}
+        for pid, last in self.last.items():
+            first = self.first[pid]
+            elapsed = last['at'] - first['at']
+            if elapsed <= 0:
+                continue
+            workers[pid] = {
+                'busy_fraction': (last['dataviz_worker_busy_seconds_total'] - first['dataviz_worker_busy_seconds_total']) / elapsed,
+                'mean_in_flight': (last['dataviz_worker_request_seconds_total'] - first['dataviz_worker_request_seconds_total']) / elapsed,
+                'max_in_flight_seen': self.max_in_flight[pid],
+                'observed_seconds': elapsed
+            }
+        return workers
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation '{name}' (expected one of {', '.join(OPERATIONS)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def parse_args():
+    from benchmarks.datasets import SCALES, FORMATS, DEFAULT_DATA_DIR
+    from visualization.templates import TEMPLATES
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='base URL of the app')
+    parser.add_argument('--app-command', help='start the app with this command (router settings are passed in its environment)')
+    parser.add_argument('--startup-timeout', type=float, default=120, help='seconds to wait for /health after --app-command')
+    parser.add_argument('--concurrency', type=int, default=16, help='virtual users')
+    parser.add_argument('--duration', type=float, default=60, help='seconds of load')
+    parser.add_argument('--mix', type=parse_mix, default='upload=1,analyze=2,regenerate=4', help='operation weights')
+    parser.add_argument('--think-time', type=float, default=0, help='mean pause between a user\'s operations, in seconds')
+    parser.add_argument('--templates', type=lambda text: text.split(','), default=list(TEMPLATES))
+    parser.add_argument('--format', choices=FORMATS, default='csv', help='format of the uploaded dataset')
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--timeout', type=float, default=180, help='per-request client timeout')
+    parser.add_argument('--router-url', help='use an already running router instead of starting one')
+    parser.add_argument('--router-port', type=int, default=0)
+    add_router_arguments(parser)
+    parser.add_argument('--metrics-interval', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the report as JSON')
+    return parser.parse_args()
+
+def start_app(args, router_url):
+    env = dict(os.environ, HUGGINGFACE_API_URL=router_url, DEFAULT_AI_PROVIDER='huggingface')
+    env['HUGGINGFACE_API_KEY'] = env.get('HUGGINGFACE_API_KEY') or 'load-test'
+    # Every user uploads the same dataset: cached LLM replies (or analyses speculated
+    # for another user's upload) would keep the router idle
+    env.setdefault('CACHE_NAMESPACES', 'extraction,analysis,render')
+    process = subprocess.Popen(shlex.split(args.app_command), cwd=REPO_ROOT, env=env)
+
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited with status {process.returncode} during start-up")
+        try:
+            # /health answers 503 until warm-up has finished
+            if requests.get(args.url + '/health', timeout=2).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"App did not become healthy within {args.startup_timeout:.0f}s")
+
+def summarize(results, elapsed):
+    routes = defaultdict(list)
+    for route, status, latency, _ in results:
+        routes[route].append((status, latency))
+
+    report = {}
+    for route, calls in sorted(routes.items()):
+        latencies = sorted(latency for _, latency in calls)
+        errors = defaultdict(int)
+        for status, _ in calls:
+            if status != 200:
+                errors[str(status)] += 1
+        report[route] = {
+            'requests': len(calls),
+            'throughput': len(calls) / elapsed,
+            'errors': dict(errors),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': latencies[-1]
+        }
+    return report
+
+def print_report(report):
+    print(f"\n{'route':<12} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for route, stats in report['routes'].items():
+        print(
+            f"{route:<12} {stats['requests']:>9} {stats['throughput']:>8.2f} {sum(stats['errors'].values()):>7} "
+            f"{stats['p50']:>7.2f}s {stats['p95']:>7.2f}s {stats['p99']:>7.2f}s {stats['max']:>7.2f}s"
+        )
+    print(f"{'all':<12} {report['requests']:>9} {report['throughput']:>8.2f}")
+
+    print(f"\n{'worker pid':<12} {'busy':>7} {'mean in flight':>15} {'max seen':>9}")
+    for pid, stats in sorted(report['workers'].items()):
+        print(f"{pid:<12} {stats['busy_fraction'] * 100:>6.0f}% {stats['mean_in_flight']:>15.2f} {stats['max_in_flight_seen']:>9}")
+    if not report['workers']:
+        print("  (no worker samples; is /metrics reachable?)")
+
+    router = report.get('router')
+    if router:
+        print(
+            f"\nRouter: {router['calls']} calls, {router['rejected']} rejected (429), "
+            f"max {router['max_active']}/{router['replicas']} replicas busy, max {router['max_waiting']} queued, "
+            f"queue wait p95 {router['queue_seconds']['p95']:.2f}s, service p50 {router['service_seconds']['p50']:.2f}s"
+        )
+
+def main():
+    args = parse_args()
+    from benchmarks.datasets import dataset_path
+
+    dataset = dataset_path(args.format, args.scale, args.data_dir)
+    simulator = None
+    router_url = args.router_url
+    if not router_url:
+        simulator = RouterSimulator(args.replicas, args.latency_median, args.latency_sigma, args.queue_limit, args.seed)
+        server = start_router(simulator, port=args.router_port)
+        router_url = f"http://127.0.0.1:{server.server_port}{CHAT_PATH}"
+    print(f"Router: {router_url}")
+
+    process = start_app(args, router_url) if args.app_command else None
+    try:
+        results = []
+        sampler = WorkerSampler(args.url, args.metrics_interval)
+        sampler.start()
+        started = time.monotonic()
+        users = [VirtualUser(i, args, dataset, started + args.duration, results) for i in range(args.concurrency)]
+        for user in users:
+            user.start()
+        print(f"{args.concurrency} users for {args.duration:.0f}s, mix {args.mix}...")
+        for user in users:
+            user.join()
+        elapsed = time.monotonic() - started
+        sampler.stop()
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    report = {
+        'settings': vars(args),
+        'elapsed': elapsed,
+        'requests': len(results),
+        'throughput': len(results) / elapsed,
+        'routes': summarize(results, elapsed),
+        'workers': sampler.saturation(),
+        'router': simulator.stats() if simulator else None
+    }
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+if __name__ == '__main__':
+    main()
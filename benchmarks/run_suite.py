@@ -0,0 +1,192 @@
+"""
+End-to-end benchmark suite: /upload, /analyze and /regenerate over synthetic
+CSV, Excel, PDF and PNG inputs, with the local stub provider in place of the
+Hugging Face router
+
+The stub builds the real prompt and parses a canned reply after a fixed
+delay (--latency), so timings measure this service rather than the network.
+Results are written as JSON; with --baseline, any step whose median is more
+than --threshold slower than the baseline's (and by more than --min-delta
+seconds) fails the run with exit status 1.
+
+Usage:
+    python -m benchmarks.run_suite [--scales small medium] [--formats csv xlsx pdf png]
+        [--repeat 3] [--latency 0.5] [--output results.json]
+        [--baseline previous.json] [--threshold 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STEPS = ('upload', 'analyze', 'regenerate')
+
+def parse_args():
+    from benchmarks.datasets import SCALES, FORMATS, DEFAULT_DATA_DIR
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['small', 'medium'])
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.5, help='stub provider delay in seconds')
+    parser.add_argument('--responses', default='', help='JSON file of canned replies to replay (default: built from the data)')
+    parser.add_argument('--template', default='professional')
+    parser.add_argument('--regenerate-template', default='dark')
+    parser.add_argument('--cache', choices=['off', 'memory', 'sqlite'], default='off', help='CACHE_BACKEND for the run (off measures uncached work)')
+    parser.add_argument('--max-upload-mb', type=int, default=1024, help='overrides MAX_CONTENT_LENGTH for large inputs')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--output', default=f"benchmark-results-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown as a fraction of the baseline')
+    parser.add_argument('--min-delta', type=float, default=0.05, help='ignore slowdowns smaller than this many seconds')
+    return parser.parse_args()
+
+def configure_environment(args):
+    """Point the app at the stub provider; must run before config is imported"""
+    os.environ['STUB_PROVIDER'] = 'true'
+    os.environ['DEFAULT_AI_PROVIDER'] = 'stub'
+    os.environ['STUB_LATENCY_SECONDS'] = str(args.latency)
+    os.environ['STUB_RESPONSES_PATH'] = os.path.abspath(args.responses) if args.responses else ''
+    os.environ['CACHE_BACKEND'] = args.cache
+
+def run_pipeline(client, path, args):
+    """One upload -> analyze -> regenerate pass; returns step timings and response sizes"""
+    timings, sizes = {}, {}
+
+    def timed(step, method, url, **kwargs):
+        start = time.perf_counter()
+        response = getattr(client, method)(url, **kwargs)
+        timings[step] = time.perf_counter() - start
+        sizes[step] = len(response.data)
+        if response.status_code != 200:
+            raise RuntimeError(f"{step} returned {response.status_code}: {response.get_data(as_text=True)[:300]}")
+        return response.get_json()
+
+    with open(path, 'rb') as f:
+        uploaded = timed('upload', 'post', '/upload', data={'file': (f, os.path.basename(path))})
+
+    analyzed = timed('analyze', 'post', '/analyze', json={
+        'filepath': uploaded['filepath'],
+        'provider': 'stub',
+        'template': args.template,
+        'format': 'json'
+    })
+    timed('regenerate', 'post', '/regenerate', json={
+        'filepath': uploaded['filepath'],
+        'template': args.regenerate_template,
+        'format': 'json',
+        'analysis_id': analyzed['analysis_id']
+    })
+    timings['total'] = sum(timings[step] for step in STEPS)
+    return timings, sizes, len(analyzed['visualizations'].get('charts', []))
+
+def run_case(client, file_format, scale, args):
+    from benchmarks.datasets import SCALES, dataset_path
+    from visualization.render_cache import render_cache
+
+    path = dataset_path(file_format, scale, args.data_dir)
+    runs = []
+    for _ in range(args.repeat):
+        # Every pass renders from scratch; the render cache would otherwise serve repeats
+        render_cache.clear()
+        runs.append(run_pipeline(client, path, args))
+
+    case = {
+        'format': file_format,
+        'scale': scale,
+        'size': SCALES[scale][file_format],
+        'file_bytes': os.path.getsize(path),
+        'charts': runs[-1][2],
+        'response_bytes': runs[-1][1],
+        'seconds': {}
+    }
+    for step in STEPS + ('total',):
+        values = [timings[step] for timings, _, _ in runs]
+        case['seconds'][step] = {'median': statistics.median(values), 'min': min(values), 'runs': values}
+    return case
+
+def compare(results, baseline, threshold, min_delta):
+    """Steps slower than the baseline beyond the threshold, as printable lines"""
+    regressions = []
+    for key, case in results['cases'].items():
+        previous = baseline.get('cases', {}).get(key)
+        if previous is None:
+            continue
+        for step, timing in case['seconds'].items():
+            before = previous['seconds'].get(step, {}).get('median')
+            now = timing['median']
+            if before is None or now - before <= min_delta:
+                continue
+            if now > before * (1 + threshold):
+                regressions.append(f"{key} {step}: {before:.3f}s -> {now:.3f}s ({(now / before - 1) * 100:+.0f}%)")
+    return regressions
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+
+    from app import app
+    from warmup import warmup
+
+    # The app warms up on its first request; finish that before timing anything
+    warmup.start()
+    warmup.wait()
+
+    app.config['MAX_CONTENT_LENGTH'] = args.max_upload_mb * 1024 * 1024
+    client = app.test_client()
+
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': {
+            'repeat': args.repeat,
+            'latency': args.latency,
+            'cache': args.cache,
+            'responses': args.responses or None,
+            'template': args.template,
+            'regenerate_template': args.regenerate_template
+        },
+        'cases': {}
+    }
+
+    print(f"{'case':<14} {'size':>9} {'file bytes':>13} {'upload':>9} {'analyze':>9} {'regen':>9} {'total':>9}")
+    for scale in args.scales:
+        for file_format in args.formats:
+            case = run_case(client, file_format, scale, args)
+            key = f"{file_format}/{scale}"
+            results['cases'][key] = case
+            medians = [case['seconds'][step]['median'] for step in STEPS + ('total',)]
+            print(f"{key:<14} {case['size']:>9,} {case['file_bytes']:>13,} " + ' '.join(f"{m:>8.3f}s" for m in medians))
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"FAIL: {len(regressions)} step(s) regressed more than {args.threshold * 100:.0f}% against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"OK: no regressions over {args.threshold * 100:.0f}% against {args.baseline}")
+
+if __name__ == '__main__':
+    main()
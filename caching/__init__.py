@@ -0,0 +1,17 @@
+# Caching Package
+# Exports are imported on first access (PEP 562), so importing the package
+# does not open the cache database up front
+from lazy_exports import lazy_exports
+
+_EXPORTS = {
+    'CacheBackend': '.base',
+    'NAMESPACE_VERSIONS': '.base',
+    'MemoryCacheBackend': '.memory_backend',
+    'SQLiteCacheBackend': '.sqlite_backend',
+    'CacheFactory': '.cache_factory',
+    'get_cache': '.cache_factory'
+}
+
+__all__ = ['CacheBackend', 'NAMESPACE_VERSIONS', 'MemoryCacheBackend', 'SQLiteCacheBackend', 'CacheFactory', 'get_cache']
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
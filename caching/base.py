@@ -0,0 +1,77 @@
+import pickle
+from abc import ABC, abstractmethod
+
+# Namespaces and their format versions. Bump a version when the shape of the
+# cached values changes: entries written under the old version are no longer
+# read, and are dropped by eviction (or purge_stale()).
+NAMESPACE_VERSIONS = {
+    'extraction': 1,   # extracted datasets (columns, sample rows, records) by file digest
+    'llm': 1,          # raw model responses by prompt hash
+    'analysis': 1,     # parsed analyses by analysis_id
+    'render': 1,       # rendered charts by render key
+    'render_id': 1,    # chart id -> render key, for /charts/<chart_id>
+    'speculation': 1   # state and result of speculative analyses, across workers
+}
+
+class CacheBackend(ABC):
+    """
+    Base class for cache backends
+
+    Values are any picklable object. Keys are strings scoped by namespace;
+    the namespace's version from NAMESPACE_VERSIONS is part of the stored
+    key. Backends evict least recently used entries to stay under max_bytes,
+    and never raise on a failed lookup or write: a cache problem degrades to
+    a miss.
+    """
+
+    # Whether other worker processes see this backend's entries
+    shared = False
+
+    def __init__(self, max_bytes, max_entry_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes
+
+    @abstractmethod
+    def get(self, namespace, key):
+        """
+        Look up a value
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        pass
+
+    @abstractmethod
+    def set(self, namespace, key, value):
+        """Store a value (skipped if it serializes larger than max_entry_bytes)"""
+        pass
+
+    @abstractmethod
+    def delete(self, namespace, key):
+        """Remove one entry"""
+        pass
+
+    @abstractmethod
+    def clear(self, namespace=None):
+        """Remove every entry, or every entry of one namespace"""
+        pass
+
+    @abstractmethod
+    def stats(self):
+        """Entries, bytes, hits and misses (dict)"""
+        pass
+
+    def purge_stale(self):
+        """Drop entries written under namespace versions that are no longer current"""
+        pass
+
+    def versioned(self, namespace):
+        if namespace not in NAMESPACE_VERSIONS:
+            raise ValueError(f"Unknown cache namespace: {namespace}")
+        return f"{namespace}:v{NAMESPACE_VERSIONS[namespace]}"
+
+    def dumps(self, value):
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        return pickle.loads(data)
@@ -0,0 +1,57 @@
+import importlib
+import threading
+from config import config
+
+# Backend name -> (module, class); backends are imported on first use
+BACKENDS = {
+    'memory': ('.memory_backend', 'MemoryCacheBackend'),
+    'sqlite': ('.sqlite_backend', 'SQLiteCacheBackend')
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+class CacheFactory:
+    """Factory for the configured cache backend"""
+
+    @staticmethod
+    def create_backend(backend_name=None):
+        """
+        Create a cache backend
+
+        Args:
+            backend_name: 'memory' or 'sqlite' (default: CACHE_BACKEND)
+
+        Raises:
+            ValueError: If the backend is unknown
+        """
+        backend_name = (backend_name or config.CACHE_BACKEND).lower()
+        if backend_name not in BACKENDS:
+            raise ValueError(f"Unknown cache backend: {backend_name}")
+
+        module_name, class_name = BACKENDS[backend_name]
+        backend_class = getattr(importlib.import_module(module_name, __package__), class_name)
+        if backend_name == 'sqlite':
+            return backend_class(config.CACHE_PATH, config.CACHE_MAX_BYTES, config.CACHE_MAX_ENTRY_BYTES)
+        return backend_class(config.CACHE_MAX_BYTES, config.CACHE_MAX_ENTRY_BYTES)
+
+def get_cache(namespace):
+    """
+    The process-wide cache backend, if caching is enabled for a namespace
+
+    Returns:
+        CacheBackend, or None when CACHE_BACKEND is 'off' or the namespace is
+        not listed in CACHE_NAMESPACES
+    """
+    global _backend
+    if config.CACHE_BACKEND == 'off' or namespace not in config.CACHE_NAMESPACES:
+        return None
+
+    with _backend_lock:
+        if _backend is None:
+            _backend = CacheFactory.create_backend()
+            try:
+                _backend.purge_stale()
+            except Exception as e:
+                print(f"Could not purge stale cache entries: {str(e)}")
+        return _backend
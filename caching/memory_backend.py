@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from .base import CacheBackend
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU bounded by pickled size
+
+    Entries are stored pickled, so callers always get an independent copy,
+    and are lost on restart and invisible to other workers. For single-process
+    use and development.
+    """
+
+    shared = False
+
+    def __init__(self, max_bytes, max_entry_bytes=None):
+        super().__init__(max_bytes, max_entry_bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, namespace, key):
+        try:
+            full_key = (self.versioned(namespace), key)
+            with self._lock:
+                data = self._entries.get(full_key)
+                if data is None:
+                    self.misses += 1
+                    return None
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+            return self.loads(data)
+        except Exception as e:
+            print(f"Cache read failed ({namespace}): {str(e)}")
+            return None
+
+    def set(self, namespace, key, value):
+        try:
+            data = self.dumps(value)
+            if len(data) > self.max_entry_bytes:
+                return
+
+            full_key = (self.versioned(namespace), key)
+            with self._lock:
+                if full_key in self._entries:
+                    self._bytes -= len(self._entries.pop(full_key))
+                self._entries[full_key] = data
+                self._bytes += len(data)
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted)
+        except Exception as e:
+            print(f"Cache write failed ({namespace}): {str(e)}")
+
+    def delete(self, namespace, key):
+        with self._lock:
+            data = self._entries.pop((self.versioned(namespace), key), None)
+            if data is not None:
+                self._bytes -= len(data)
+
+    def clear(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            prefix = self.versioned(namespace)
+            for full_key in [k for k in self._entries if k[0] == prefix]:
+                self._bytes -= len(self._entries.pop(full_key))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
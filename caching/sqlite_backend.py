@@ -0,0 +1,197 @@
+import os
+import sqlite3
+import threading
+import time
+from .base import CacheBackend, NAMESPACE_VERSIONS
+
+# Last-access times are only rewritten when older than this, so hot entries
+# do not turn every lookup into a write
+ACCESS_RESOLUTION_SECONDS = 5
+
+# Eviction frees down to this fraction of max_bytes, so it does not run on every write
+EVICTION_TARGET = 0.9
+
+# The total size is kept in a one-row table by triggers, so a write does not
+# have to sum the whole table to know whether eviction is due
+SCHEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals (id, bytes) SELECT 0, COALESCE(SUM(size), 0) FROM entries;
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries
+BEGIN UPDATE totals SET bytes = bytes + NEW.size WHERE id = 0; END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries
+BEGIN UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 0; END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries
+BEGIN UPDATE totals SET bytes = bytes - OLD.size WHERE id = 0; END;
+COMMIT;
+"""
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    On-disk cache shared by every worker process on the host
+
+    One SQLite database in WAL mode: readers never block the writer, and
+    concurrent writers from several processes queue on SQLite's file lock
+    (up to busy_timeout). Each thread of each process opens its own
+    connection, since connections must not cross a fork or be shared
+    between threads. Size and access time are stored ahead of the value so
+    eviction never has to read the blobs. Writes only read the running total
+    (kept by triggers); once it passes max_bytes, eviction runs in a
+    BEGIN IMMEDIATE transaction, so workers over the limit at the same time
+    evict one after the other instead of both freeing space.
+    """
+
+    shared = True
+
+    def __init__(self, path, max_bytes, max_entry_bytes=None, busy_timeout=5.0):
+        super().__init__(max_bytes, max_entry_bytes)
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._schema_pid = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, namespace, key):
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT value, accessed FROM entries WHERE namespace = ? AND key = ?",
+                (self.versioned(namespace), key)
+            ).fetchone()
+            if row is None:
+                self._count(hit=False)
+                return None
+
+            now = time.time()
+            if now - row[1] > ACCESS_RESOLUTION_SECONDS:
+                connection.execute(
+                    "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?",
+                    (now, self.versioned(namespace), key)
+                )
+            self._count(hit=True)
+            return self.loads(row[0])
+        except Exception as e:
+            print(f"Cache read failed ({namespace}): {str(e)}")
+            return None
+
+    def set(self, namespace, key, value):
+        try:
+            data = self.dumps(value)
+            if len(data) > self.max_entry_bytes:
+                return
+            connection = self._connection()
+            # An upsert, not INSERT OR REPLACE: the implicit delete of REPLACE skips the delete trigger
+            connection.execute(
+                "INSERT INTO entries (namespace, key, size, accessed, value) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET "
+                "size = excluded.size, accessed = excluded.accessed, value = excluded.value",
+                (self.versioned(namespace), key, len(data), time.time(), data)
+            )
+            if self._total(connection) > self.max_bytes:
+                self._evict(connection)
+        except Exception as e:
+            print(f"Cache write failed ({namespace}): {str(e)}")
+
+    def delete(self, namespace, key):
+        try:
+            self._connection().execute(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", (self.versioned(namespace), key)
+            )
+        except sqlite3.Error as e:
+            print(f"Cache delete failed ({namespace}): {str(e)}")
+
+    def clear(self, namespace=None):
+        connection = self._connection()
+        if namespace is None:
+            connection.execute("DELETE FROM entries")
+        else:
+            connection.execute("DELETE FROM entries WHERE namespace = ?", (self.versioned(namespace),))
+
+    def purge_stale(self):
+        current = [f"{name}:v{version}" for name, version in NAMESPACE_VERSIONS.items()]
+        placeholders = ','.join('?' * len(current))
+        self._connection().execute(f"DELETE FROM entries WHERE namespace NOT IN ({placeholders})", current)
+
+    def stats(self):
+        try:
+            connection = self._connection()
+            entries = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            total = self._total(connection)
+        except sqlite3.Error as e:
+            print(f"Cache stats failed: {str(e)}")
+            entries, total = None, None
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            # Lookups made by this process
+            'hits': hits,
+            'misses': misses
+        }
+
+    def _total(self, connection):
+        return connection.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+
+    def _evict(self, connection):
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have evicted while this one waited for the lock
+            total = self._total(connection)
+            if total > self.max_bytes:
+                excess = total - int(self.max_bytes * EVICTION_TARGET)
+                victims, freed = [], 0
+                for rowid, size in connection.execute("SELECT rowid, size FROM entries ORDER BY accessed"):
+                    victims.append((rowid,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                connection.executemany("DELETE FROM entries WHERE rowid = ?", victims)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _connection(self):
+        pid = os.getpid()
+        cached = getattr(self._local, 'connection', None)
+        if cached is not None and cached[0] == pid:
+            return cached[1]
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit: every statement is its own short transaction
+        connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            if self._schema_pid != pid:
+                connection.executescript(SCHEMA)
+                self._schema_pid = pid
+        self._local.connection = (pid, connection)
+        return connection
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
@@ -0,0 +1,315 @@
+"""
+Chunked, resumable uploads
+
+Large files are sent as a series of chunk requests instead of one multipart
+body, so no request buffers more than a chunk and a dropped connection
+only costs the chunk in flight:
+
+    POST /upload/chunked                      {"filename", "size"} -> upload_id
+    PUT  /upload/chunked/<id>                 body = bytes, Upload-Offset: <offset>
+    GET  /upload/chunked/<id>                 offset received so far, state
+    POST /upload/chunked/<id>/complete        store the file, extract it in the background
+
+Chunks are appended to a partial file in the upload store's incoming
+folder. A chunk must start at the current offset (409 with the offset
+otherwise), which is how a client resumes: ask for the offset, send from
+there. Session state lives in a JSON file next to the partial file, so any
+worker can serve any chunk. Sessions idle for a day are swept with other
+stale incoming files. Until then, each open session reserves its declared
+size against UPLOAD_QUOTA_MB, and new sessions that would exceed it are
+refused.
+
+On completion the file is hashed and moved into the content-addressed
+store, and extraction starts in a background thread; its result lands in
+the shared extraction cache, where /analyze picks it up. Clients poll the
+session until its state is 'ready' (or 'failed'). An extraction whose worker
+exits (recycled or killed) or that runs past BACKGROUND_EXTRACTION_TIMEOUT_SECONDS
+is reported as failed by the next status check.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.utils import secure_filename
+from config import config
+from upload_store import upload_store, CHUNK_SIZE, STALE_INCOMING_SECONDS
+
+UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Serializes quota checks in create() across workers
+SESSIONS_LOCK = 'sessions.lock'
+
+class UploadNotFound(Exception):
+    """No upload session with this id (never created, or expired)"""
+    pass
+
+class UploadTooLarge(Exception):
+    """The declared or received size is over CHUNKED_UPLOAD_MAX_MB"""
+    pass
+
+class UploadQuotaExceeded(Exception):
+    """Open upload sessions already reserve the upload folder's quota"""
+    pass
+
+class UploadOffsetMismatch(Exception):
+    """A chunk did not start where the received data ends"""
+
+    def __init__(self, offset):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+class ChunkedUploads:
+    """Upload sessions stored on disk, shared by every worker"""
+
+    def __init__(self, store=None, max_bytes=None, workers=None):
+        self.store = store or upload_store
+        self.max_bytes = max_bytes or config.CHUNKED_UPLOAD_MAX_MB * 1024 * 1024
+        self.workers = workers or config.BACKGROUND_EXTRACTION_WORKERS
+        self.extraction_timeout = config.BACKGROUND_EXTRACTION_TIMEOUT_SECONDS
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def create(self, filename, size):
+        """
+        Open an upload session
+
+        Raises:
+            ValueError: If the size is not a non-negative integer
+            UploadTooLarge: If the size is over the limit
+            UploadQuotaExceeded: If the sizes declared by open sessions leave
+                no room for this one under UPLOAD_QUOTA_MB
+        """
+        size = int(size)
+        if size < 0:
+            raise ValueError('Upload size must be given in bytes')
+        if size > self.max_bytes:
+            raise UploadTooLarge(f"File is {size // (1024 * 1024)} MB; the limit is {self.max_bytes // (1024 * 1024)} MB")
+
+        session = {
+            'upload_id': uuid.uuid4().hex,
+            'filename': secure_filename(filename),
+            'size': size,
+            'state': 'uploading',
+            'created_at': time.time()
+        }
+        # Check and reserve under one lock, so concurrent creates cannot both take the last room
+        with open(os.path.join(self.store.incoming_dir(), SESSIONS_LOCK), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._check_quota(size)
+            open(self._part_path(session['upload_id']), 'wb').close()
+            self._save(session)
+        return self.status(session['upload_id'])
+
+    def _check_quota(self, size):
+        """Open sessions reserve their declared size, whether or not it has arrived yet"""
+        quota = self.store.quota_bytes
+        if not quota:
+            return
+        reserved = sum(session['size'] for session in self._open_sessions())
+        if reserved + size > quota:
+            raise UploadQuotaExceeded(
+                f"Uploads in progress already reserve {reserved // (1024 * 1024)} MB of the "
+                f"{quota // (1024 * 1024)} MB upload quota; try again later"
+            )
+
+    def _open_sessions(self):
+        """Sessions still receiving chunks and not yet due for the stale-file sweep"""
+        directory = self.store.incoming_dir()
+        now = time.time()
+        for name in os.listdir(directory):
+            upload_id, extension = os.path.splitext(name)
+            if extension != '.json':
+                continue
+            try:
+                if now - os.path.getmtime(os.path.join(directory, name)) > STALE_INCOMING_SECONDS:
+                    continue
+                session = self._load(upload_id)
+            except (OSError, ValueError, UploadNotFound):
+                continue
+            if session['state'] == 'uploading':
+                yield session
+
+    def write_chunk(self, upload_id, offset, stream):
+        """
+        Append a chunk that starts at offset
+
+        Returns:
+            The new offset
+
+        Raises:
+            UploadNotFound, UploadOffsetMismatch, UploadTooLarge
+            ValueError: If the upload was already completed
+        """
+        session = self._load(upload_id)
+        if session['state'] != 'uploading':
+            raise ValueError('Upload is already complete')
+
+        try:
+            f = open(self._part_path(upload_id), 'r+b')
+        except FileNotFoundError:
+            raise UploadNotFound(f"Upload not found: {upload_id}")
+
+        with f:
+            # Two requests for the same session (a client retry) must not interleave
+            fcntl.flock(f, fcntl.LOCK_EX)
+            current = os.fstat(f.fileno()).st_size
+            if offset != current:
+                raise UploadOffsetMismatch(current)
+
+            f.seek(current)
+            received = current
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                received += len(chunk)
+                if received > session['size']:
+                    f.truncate(current)
+                    raise UploadTooLarge(f"Chunk runs past the declared size of {session['size']} bytes")
+                f.write(chunk)
+
+        # Keep active sessions away from the stale-file sweep
+        self._touch(upload_id)
+        return received
+
+    def complete(self, upload_id):
+        """
+        Store a fully received upload and start extracting it in the background
+
+        Idempotent: completing an upload again returns its current status.
+
+        Raises:
+            UploadNotFound, UploadOffsetMismatch (data still missing)
+        """
+        part_path = self._part_path(upload_id)
+        try:
+            f = open(part_path, 'rb')
+        except FileNotFoundError:
+            # Already completed (possibly by another worker)
+            return self.status(upload_id)
+
+        with f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            session = self._load(upload_id)
+            if session['state'] != 'uploading':
+                return self.status(upload_id)
+
+            received = os.fstat(f.fileno()).st_size
+            if received != session['size']:
+                raise UploadOffsetMismatch(received)
+
+            hasher = hashlib.sha256()
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                hasher.update(chunk)
+            stored = self.store.commit(part_path, hasher.hexdigest(), received, session['filename'])
+
+            session.update(
+                state='extracting',
+                filepath=stored['filepath'],
+                deduplicated=stored['deduplicated'],
+                # Lets any worker tell a running extraction from one whose worker is gone
+                extraction_pid=os.getpid(),
+                extraction_started_at=time.time()
+            )
+            self._save(session)
+
+        self._get_executor().submit(self._extract, upload_id, stored['filepath'])
+        return self.status(upload_id)
+
+    def status(self, upload_id):
+        """Session state plus the offset received so far"""
+        session = self._load(upload_id)
+        if session['state'] == 'uploading':
+            try:
+                session['offset'] = os.path.getsize(self._part_path(upload_id))
+            except FileNotFoundError:
+                session['offset'] = 0
+        else:
+            session['offset'] = session['size']
+            if session['state'] == 'extracting' and self._extraction_lost(session):
+                session.update(
+                    state='failed',
+                    error='Extraction did not finish (the worker running it stopped or timed out); please upload the file again',
+                    error_status=500
+                )
+                self._save(session)
+        return session
+
+    def _extraction_lost(self, session):
+        """True if the extraction ran past its timeout or the worker running it has exited"""
+        if time.time() - session.get('extraction_started_at', 0) > self.extraction_timeout:
+            return True
+        try:
+            os.kill(session['extraction_pid'], 0)
+        except ProcessLookupError:
+            return True
+        except (PermissionError, KeyError):
+            pass
+        return False
+
+    def _extract(self, upload_id, filepath):
+        from data_extractors.extractor_factory import ExtractorFactory
+        from ai_providers.speculative import speculative_registry
+        from memory_accounting import MemoryBudgetExceeded
+        from metrics import metric_labels, stage, extractor_label
+
+        session = self._load(upload_id)
+        try:
+            with metric_labels(extractor=extractor_label(filepath)):
+                with stage('extract'):
+                    data = ExtractorFactory.extract(filepath)
+            session.update(state='ready', data_preview=data.get('preview', 'Data extracted successfully'))
+
+            # As on /upload: start the default analysis while the user picks options
+            if config.SPECULATIVE_ANALYSIS:
+                speculative_registry.start(filepath, data, config.DEFAULT_AI_PROVIDER, config.DEFAULT_TEMPLATE)
+        except MemoryBudgetExceeded as e:
+            session.update(state='failed', error=str(e), error_status=413)
+        except Exception as e:
+            print(f"Background extraction of {upload_id} failed: {str(e)}")
+            session.update(state='failed', error=str(e), error_status=500)
+        self._save(session)
+
+    def _load(self, upload_id):
+        if not UPLOAD_ID_PATTERN.match(upload_id or ''):
+            raise UploadNotFound(f"Upload not found: {upload_id}")
+        try:
+            with open(self._session_path(upload_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadNotFound(f"Upload not found: {upload_id}")
+
+    def _save(self, session):
+        path = self._session_path(session['upload_id'])
+        # Write-then-rename, so readers in other workers never see a partial file
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(session, f)
+        os.replace(temporary, path)
+
+    def _touch(self, upload_id):
+        # Not store.touch(): that only marks files already in the store
+        for path in (self._session_path(upload_id), self._part_path(upload_id)):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+    def _session_path(self, upload_id):
+        return os.path.join(self.store.incoming_dir(), f"{upload_id}.json")
+
+    def _part_path(self, upload_id):
+        return os.path.join(self.store.incoming_dir(), f"{upload_id}.part")
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix='background-extraction'
+                )
+            return self._executor
+
+chunked_uploads = ChunkedUploads()
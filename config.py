@@ -9,12 +9,18 @@ class Config:
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     OLLAMA_BASE_URL = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+    HUGGINGFACE_API_URL = os.getenv('HUGGINGFACE_API_URL', 'https://router.huggingface.co/v1/chat/completions')
     
     # Default AI Provider (hard-coded to free Hugging Face model)
     DEFAULT_AI_PROVIDER = os.getenv('DEFAULT_AI_PROVIDER', 'huggingface')
     
     # File Upload Settings
     UPLOAD_FOLDER = 'uploads'
+    UPLOAD_QUOTA_MB = int(os.getenv('UPLOAD_QUOTA_MB', '2048'))  # Least recently used uploads are deleted past this; 0 = no limit
+    CHUNKED_UPLOAD_MAX_MB = int(os.getenv('CHUNKED_UPLOAD_MAX_MB', '1024'))  # Files over MAX_FILE_SIZE are sent in chunks
+    UPLOAD_CHUNK_MB = int(os.getenv('UPLOAD_CHUNK_MB', '8'))  # Chunk size suggested to clients (must stay under MAX_FILE_SIZE)
+    BACKGROUND_EXTRACTION_WORKERS = int(os.getenv('BACKGROUND_EXTRACTION_WORKERS', '2'))
+    BACKGROUND_EXTRACTION_TIMEOUT_SECONDS = int(os.getenv('BACKGROUND_EXTRACTION_TIMEOUT_SECONDS', '600'))
     MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
     ALLOWED_EXTENSIONS = {'pdf', 'xlsx', 'xls', 'csv', 'png', 'jpg', 'jpeg'}
     
@@ -22,13 +28,96 @@ class Config:
     AVAILABLE_TEMPLATES = ['professional', 'vibrant', 'minimal', 'dark']
     DEFAULT_TEMPLATE = 'professional'
     
+    # Chart transport: 'json' returns Plotly figure JSON rendered client-side, 'html' returns HTML fragments
+    CHART_OUTPUT_FORMATS = ('html', 'json')
+    CHART_OUTPUT_FORMAT = os.getenv('CHART_OUTPUT_FORMAT', 'json')
+    JSON_ENGINE = os.getenv('JSON_ENGINE', 'auto')  # 'auto' uses orjson when installed
+    TYPED_ARRAYS = os.getenv('TYPED_ARRAYS', 'true').lower() == 'true'  # base64 numeric arrays (Plotly.js 2.28+)
+    TYPED_ARRAY_MIN_LENGTH = int(os.getenv('TYPED_ARRAY_MIN_LENGTH', '64'))
+    ANALYSIS_STORE_SIZE = int(os.getenv('ANALYSIS_STORE_SIZE', '256'))
+    FULL_FIGURE_VALIDATION = os.getenv('FULL_FIGURE_VALIDATION', 'false').lower() == 'true'  # Debug: validate AI specs with go.Figure
+    
+    # Point budget: larger scatter/line traces are downsampled, and drawn with WebGL above the threshold
+    POINT_BUDGET_PER_TRACE = int(os.getenv('POINT_BUDGET_PER_TRACE', '5000'))
+    WEBGL_POINT_THRESHOLD = int(os.getenv('WEBGL_POINT_THRESHOLD', '2000'))
+    BOX_MAX_OUTLIERS = int(os.getenv('BOX_MAX_OUTLIERS', '200'))  # Outlier markers kept per box
+    
+    # Figure budget for AI-emitted specs (larger figures are reduced, with an annotation)
+    FIGURE_MAX_TRACES = int(os.getenv('FIGURE_MAX_TRACES', '50'))
+    FIGURE_MAX_POINTS_PER_TRACE = int(os.getenv('FIGURE_MAX_POINTS_PER_TRACE', '100000'))
+    FIGURE_MAX_BYTES = int(os.getenv('FIGURE_MAX_BYTES', str(8 * 1024 * 1024)))  # Serialized figure JSON
+    
+    # Parallel chart rendering (process pool; 1 worker renders serially in the request thread)
+    RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', str(min(4, os.cpu_count() or 1))))
+    RENDER_TIMEOUT_SECONDS = float(os.getenv('RENDER_TIMEOUT_SECONDS', '30'))  # Per chart, once a worker has picked it up
+    RENDER_POOL_START_METHOD = os.getenv('RENDER_POOL_START_METHOD', 'spawn')  # 'spawn' is safe with threaded servers
+    RENDER_CACHE_MAX_BYTES = int(os.getenv('RENDER_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))  # Rendered-chart LRU
+    
+    # PDF export (chart images rendered server-side by a warm Kaleido process)
+    PDF_IMAGE_WIDTH = int(os.getenv('PDF_IMAGE_WIDTH', '1000'))
+    PDF_IMAGE_HEIGHT = int(os.getenv('PDF_IMAGE_HEIGHT', '600'))
+    PDF_IMAGE_SCALE = float(os.getenv('PDF_IMAGE_SCALE', '1'))
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))  # Chart image LRU
+    
+    # Speculative Analysis (start the default-provider LLM call right after upload)
+    SPECULATIVE_ANALYSIS = os.getenv('SPECULATIVE_ANALYSIS', 'true').lower() == 'true'
+    SPECULATIVE_WORKERS = int(os.getenv('SPECULATIVE_WORKERS', '4'))
+    SPECULATIVE_TTL_SECONDS = int(os.getenv('SPECULATIVE_TTL_SECONDS', '900'))
+    SPECULATIVE_SHARED_WAIT_SECONDS = int(os.getenv('SPECULATIVE_SHARED_WAIT_SECONDS', '60'))  # /analyze waits this long for a speculation running in another worker
+    
+    # Worker warm-up (runs in the background at start; /health reports ready when done)
+    # Steps: charts, extractors, providers, render_pool, pdf (empty disables warm-up)
+    WARMUP_STEPS = [step.strip() for step in os.getenv('WARMUP_STEPS', 'charts,extractors,providers,render_pool').split(',') if step.strip()]
+    
+    # Request profiling: admin header X-Profile: <PROFILE_TOKEN> (empty token disables it) or sampling
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))  # Fraction of requests profiled
+    PROFILE_MODE = os.getenv('PROFILE_MODE', 'sample')  # 'sample' (collapsed stacks) or 'cprofile' (.prof)
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+    PROFILE_MAX_CONCURRENT = int(os.getenv('PROFILE_MAX_CONCURRENT', '1'))
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+    
+    # Memory accounting and budget (large CSV/.xlsx files are streamed, other formats rejected)
+    MEMORY_TRACKING = os.getenv('MEMORY_TRACKING', 'rss')  # 'off', 'rss' or 'tracemalloc' (slow; diagnostics only)
+    MEMORY_TRACE_FRAMES = int(os.getenv('MEMORY_TRACE_FRAMES', '1'))
+    MEMORY_TOP_SITES = int(os.getenv('MEMORY_TOP_SITES', '0'))  # Log the top N allocation sites per stage (tracemalloc)
+    MEMORY_BUDGET_MB = int(os.getenv('MEMORY_BUDGET_MB', '1024'))  # Estimated memory one extraction may use
+    MEMORY_LIMIT_MB = int(os.getenv('MEMORY_LIMIT_MB', '0'))  # Container limit; 0 = unknown
+    STREAMING_CHUNK_ROWS = int(os.getenv('STREAMING_CHUNK_ROWS', '50000'))
+    STREAMING_MAX_ROWS = int(os.getenv('STREAMING_MAX_ROWS', '100000'))  # Evenly spaced rows kept in streaming mode
+    
+    # Shared cache for extractions, LLM responses, analyses and rendered charts
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'sqlite').lower()  # 'sqlite' (shared by workers, survives restarts), 'memory' or 'off'
+    CACHE_PATH = os.getenv('CACHE_PATH', os.path.join('cache', 'cache.sqlite3'))
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(512 * 1024 * 1024)))  # Least recently used entries are evicted past this
+    CACHE_MAX_ENTRY_BYTES = int(os.getenv('CACHE_MAX_ENTRY_BYTES', str(64 * 1024 * 1024)))  # Larger values are not cached
+    CACHE_NAMESPACES = [name.strip() for name in os.getenv('CACHE_NAMESPACES', 'extraction,llm,analysis,render,speculation').split(',') if name.strip()]
+    
+    # Production server (gunicorn -c gunicorn.conf.py wsgi:app)
+    # Worker class: 'gthread' (threads per worker; default, suits long LLM calls), 'sync' or 'gevent' (needs gevent)
+    SERVER_WORKER_CLASS = os.getenv('SERVER_WORKER_CLASS', 'gthread')
+    SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', '0'))  # 0 = one per CPU (sync: 2 per CPU + 1)
+    SERVER_THREADS = int(os.getenv('SERVER_THREADS', '8'))  # Requests per gthread worker
+    SERVER_WORKER_CONNECTIONS = int(os.getenv('SERVER_WORKER_CONNECTIONS', '100'))  # Requests per gevent worker
+    SERVER_TIMEOUT = int(os.getenv('SERVER_TIMEOUT', '180'))  # Above the 90s LLM timeout plus rendering
+    SERVER_GRACEFUL_TIMEOUT = int(os.getenv('SERVER_GRACEFUL_TIMEOUT', '120'))  # In-flight requests finish before a worker exits
+    SERVER_KEEPALIVE = int(os.getenv('SERVER_KEEPALIVE', '5'))
+    SERVER_PRELOAD = os.getenv('SERVER_PRELOAD', 'true').lower() == 'true'  # Import app and backends once, before forking
+    SERVER_MAX_REQUESTS = int(os.getenv('SERVER_MAX_REQUESTS', '0'))  # Recycle a worker after N requests; 0 = never
+    SERVER_MAX_WORKER_GROWTH_MB = int(os.getenv('SERVER_MAX_WORKER_GROWTH_MB', '768'))  # Recycle a worker whose RSS grew this much; 0 = never
+    
     # AI Providers Status
     AI_PROVIDERS = {
         'anthropic': {'name': 'Anthropic Claude', 'enabled': False},  # Disabled - using HF only
         'huggingface': {'name': 'Hugging Face (Free)', 'enabled': True},
         'openai': {'name': 'OpenAI GPT-4', 'enabled': False},
         'gemini': {'name': 'Google Gemini', 'enabled': False},
-        'llama': {'name': 'Local Llama', 'enabled': False}
+        'llama': {'name': 'Local Llama', 'enabled': False},
+        'stub': {'name': 'Local stub (benchmarks)', 'enabled': os.getenv('STUB_PROVIDER', 'false').lower() == 'true'}
     }
+    
+    # Stub provider (canned replies; benchmarks and offline development)
+    STUB_LATENCY_SECONDS = float(os.getenv('STUB_LATENCY_SECONDS', '0.5'))
+    STUB_RESPONSES_PATH = os.getenv('STUB_RESPONSES_PATH', '')  # JSON reply or list of replies to replay
 
 config = Config()
@@ -1,8 +1,16 @@
 # Data Extractors Package
-from .pdf_extractor import PDFExtractor
-from .excel_extractor import ExcelExtractor
-from .csv_extractor import CSVExtractor
-from .image_extractor import ImageExtractor
-from .extractor_factory import ExtractorFactory
+# Exports are imported on first access (PEP 562), so importing the package
+# does not load pdfplumber, pytesseract/PIL and pandas up front
+from lazy_exports import lazy_exports
+
+_EXPORTS = {
+    'PDFExtractor': '.pdf_extractor',
+    'ExcelExtractor': '.excel_extractor',
+    'CSVExtractor': '.csv_extractor',
+    'ImageExtractor': '.image_extractor',
+    'ExtractorFactory': '.extractor_factory'
+}
 
 __all__ = ['PDFExtractor', 'ExcelExtractor', 'CSVExtractor', 'ImageExtractor', 'ExtractorFactory']
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
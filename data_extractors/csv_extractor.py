@@ -1,4 +1,7 @@
 import pandas as pd
+from config import config
+from .streaming import stream_extract
+from .preview import PREVIEW_ROWS, count_lines, tabular_preview
 
 class CSVExtractor:
     """Extract data from CSV files"""
@@ -30,6 +33,23 @@ class CSVExtractor:
         except Exception as e:
             raise Exception(f"Error extracting CSV: {str(e)}")
 
+    def extract_streaming(self, chunk_rows=None, max_rows=None):
+        """Extract in bounded memory: counts from the whole file, an evenly spaced row sample for charts"""
+        try:
+            chunks = pd.read_csv(self.filepath, chunksize=chunk_rows or config.STREAMING_CHUNK_ROWS)
+            return stream_extract(chunks, self._sanitize_dataframe, 'csv', 'CSV', max_rows)
+        except Exception as e:
+            raise Exception(f"Error extracting CSV: {str(e)}")
+
+    def extract_preview(self, rows=PREVIEW_ROWS):
+        """Header, first rows and a line count, without parsing the rest of the file"""
+        try:
+            head = pd.read_csv(self.filepath, nrows=rows)
+            row_count = max(count_lines(self.filepath) - 1, 0)
+            return tabular_preview(head, row_count, self._sanitize_dataframe, 'csv', 'CSV')
+        except Exception as e:
+            raise Exception(f"Error extracting CSV: {str(e)}")
+
     def _sanitize_dataframe(self, df):
         """Sanitize dataframe to ensure JSON-safe values"""
         import numpy as np
@@ -1,4 +1,7 @@
 import pandas as pd
+import os
+from .streaming import stream_extract, excel_chunks
+from .preview import PREVIEW_ROWS, excel_head, tabular_preview
 
 class ExcelExtractor:
     """Extract data from Excel files"""
@@ -30,6 +33,26 @@ class ExcelExtractor:
         except Exception as e:
             raise Exception(f"Error extracting Excel: {str(e)}")
     
+    def extract_streaming(self, chunk_rows=None, max_rows=None):
+        """Extract in bounded memory: counts from the whole file, an evenly spaced row sample for charts"""
+        try:
+            chunks = excel_chunks(self.filepath, chunk_rows)
+            return stream_extract(chunks, self._sanitize_dataframe, 'excel', 'Excel', max_rows)
+        except Exception as e:
+            raise Exception(f"Error extracting Excel: {str(e)}")
+    
+    def extract_preview(self, rows=PREVIEW_ROWS):
+        """Header, first rows and the sheet's stored row count, read in openpyxl's read-only mode"""
+        try:
+            if os.path.splitext(self.filepath)[1].lower() == '.xlsx':
+                head, row_count = excel_head(self.filepath, rows)
+            else:
+                # Legacy .xls: no dimensions to read without parsing the sheet
+                head, row_count = pd.read_excel(self.filepath, nrows=rows), None
+            return tabular_preview(head, row_count, self._sanitize_dataframe, 'excel', 'Excel')
+        except Exception as e:
+            raise Exception(f"Error extracting Excel: {str(e)}")
+    
     def _sanitize_dataframe(self, df):
         """Sanitize dataframe to ensure JSON-safe values"""
         import numpy as np
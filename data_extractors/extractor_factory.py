@@ -1,8 +1,18 @@
 import os
-from .pdf_extractor import PDFExtractor
-from .excel_extractor import ExcelExtractor
-from .csv_extractor import CSVExtractor
-from .image_extractor import ImageExtractor
+import hashlib
+import importlib
+import functools
+
+# Extension -> (module, class); backends are imported on first use
+EXTRACTORS = {
+    '.pdf': ('.pdf_extractor', 'PDFExtractor'),
+    '.xlsx': ('.excel_extractor', 'ExcelExtractor'),
+    '.xls': ('.excel_extractor', 'ExcelExtractor'),
+    '.csv': ('.csv_extractor', 'CSVExtractor'),
+    '.png': ('.image_extractor', 'ImageExtractor'),
+    '.jpg': ('.image_extractor', 'ImageExtractor'),
+    '.jpeg': ('.image_extractor', 'ImageExtractor')
+}
 
 class ExtractorFactory:
     """Factory to get the appropriate data extractor based on file type"""
@@ -26,13 +36,92 @@ class ExtractorFactory:
         
         extension = os.path.splitext(filepath)[1].lower()
         
-        if extension == '.pdf':
-            return PDFExtractor(filepath)
-        elif extension in ['.xlsx', '.xls']:
-            return ExcelExtractor(filepath)
-        elif extension == '.csv':
-            return CSVExtractor(filepath)
-        elif extension in ['.png', '.jpg', '.jpeg']:
-            return ImageExtractor(filepath)
-        else:
+        if extension not in EXTRACTORS:
             raise ValueError(f"Unsupported file type: {extension}")
+        
+        module_name, class_name = EXTRACTORS[extension]
+        extractor_class = getattr(importlib.import_module(module_name, __package__), class_name)
+        return extractor_class(filepath)
+    
+    @staticmethod
+    def extract(filepath):
+        """
+        Extract a file within the per-request memory budget
+        
+        Files whose estimated in-memory size is over the budget are extracted
+        in streaming mode when the format allows it. Results are cached by
+        file content in the shared cache.
+        
+        Raises:
+            MemoryBudgetExceeded: If the file is over budget and cannot be streamed
+        """
+        from memory_accounting import plan_extraction
+        from caching.cache_factory import get_cache
+        from upload_store import upload_store
+        
+        extractor = ExtractorFactory.get_extractor(filepath)
+        upload_store.touch(filepath)
+        mode = plan_extraction(filepath)
+        
+        # Keyed by content, so identical files uploaded under any name share the entry
+        cache = get_cache('extraction')
+        if cache is not None:
+            # Stored uploads are named by their digest; other files are hashed here
+            digest = upload_store.digest_of(filepath) or file_digest(filepath)
+            extension = os.path.splitext(filepath)[1].lower()
+            key = f"{digest}{extension}:{mode}:{extraction_settings(extension, mode)}"
+            data = cache.get('extraction', key)
+            if data is not None:
+                if 'image_path' in data:
+                    data['image_path'] = filepath
+                return data
+        
+        data = extractor.extract_streaming() if mode == 'streaming' else extractor.extract()
+        if cache is not None:
+            cache.set('extraction', key, data)
+        return data
+
+    @staticmethod
+    def extract_preview(filepath):
+        """
+        Describe a file from its header, first rows and size, for /upload
+        
+        Much cheaper than extract(): rows past the first few are not parsed,
+        so the result has no 'dataframe' and is marked 'preview_only'. Not
+        cached, and not subject to the memory budget.
+        """
+        from upload_store import upload_store
+        
+        extractor = ExtractorFactory.get_extractor(filepath)
+        upload_store.touch(filepath)
+        return extractor.extract_preview()
+
+def extraction_settings(extension, mode):
+    """
+    The settings that change what extract() returns for a file, as part of
+    its cache key, so changing them does not serve stale cached results
+    """
+    from config import config
+    
+    if mode == 'streaming':
+        return f"rows={config.STREAMING_MAX_ROWS},chunk={config.STREAMING_CHUNK_ROWS}"
+    if EXTRACTORS.get(extension, (None,))[0] == '.image_extractor':
+        # OCR output depends on the installed Tesseract (or its absence)
+        return f"ocr={_tesseract_version()}"
+    return ''
+
+@functools.lru_cache(maxsize=1)
+def _tesseract_version():
+    try:
+        import pytesseract
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return 'none'
+
+def file_digest(filepath, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a file's contents, read in chunks"""
+    hasher = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
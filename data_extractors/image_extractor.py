@@ -40,3 +40,26 @@ class ImageExtractor:
             
         except Exception as e:
             raise Exception(f"Error processing image: {str(e)}")
+    
+    def extract_preview(self):
+        """Format and dimensions from the image header; OCR is left to full extraction"""
+        try:
+            with Image.open(self.filepath) as image:
+                width, height = image.size
+                image_format = image.format
+            
+            return {
+                'type': 'image',
+                'image_path': self.filepath,
+                'columns': [],
+                'sample_data': [],
+                'row_count': 0,
+                'column_count': 0,
+                'width': width,
+                'height': height,
+                'preview_only': True,
+                'preview': f"{image_format} image, {width}x{height}, ready for AI vision analysis"
+            }
+            
+        except Exception as e:
+            raise Exception(f"Error processing image: {str(e)}")
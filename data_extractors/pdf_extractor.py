@@ -51,3 +51,39 @@ class PDFExtractor:
                 
         except Exception as e:
             raise Exception(f"Error extracting PDF: {str(e)}")
+    
+    def extract_preview(self):
+        """Text and tables of the first page only, plus the page count"""
+        try:
+            with pdfplumber.open(self.filepath) as pdf:
+                page_count = len(pdf.pages)
+                data = {
+                    'type': 'pdf',
+                    'tables': [],
+                    'text': '',
+                    'columns': [],
+                    'sample_data': [],
+                    'row_count': 0,
+                    'column_count': 0,
+                    'page_count': page_count,
+                    'preview_only': True
+                }
+                
+                if page_count:
+                    page = pdf.pages[0]
+                    data['text'] = page.extract_text() or ''
+                    for table in page.extract_tables():
+                        if table and len(table) > 0:
+                            df = pd.DataFrame(table[1:], columns=table[0])
+                            data['tables'].append(df.to_dict('records'))
+                            if not data['columns']:
+                                data['columns'] = list(df.columns)
+                                data['sample_data'] = df.head(5).to_dict('records')
+                                data['row_count'] = len(df)
+                                data['column_count'] = len(df.columns)
+                
+                data['preview'] = f"Found {len(data['tables'])} table(s) on the first of {page_count} page(s) of PDF"
+                return data
+                
+        except Exception as e:
+            raise Exception(f"Error extracting PDF: {str(e)}")
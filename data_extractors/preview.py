@@ -0,0 +1,86 @@
+"""
+Preview extraction for /upload
+
+/upload only shows the user what was uploaded, so extractors can describe
+a file from its header, first rows and a row count without parsing,
+sanitizing and converting every row. Full extraction happens when an
+analysis needs the data (or in the background, for speculative analysis).
+"""
+import pandas as pd
+from .streaming import column_names
+
+PREVIEW_ROWS = 10
+
+LINE_COUNT_CHUNK = 1024 * 1024
+
+def count_lines(filepath):
+    """
+    Number of lines in a text file, counted on raw bytes
+
+    An upper bound on CSV records: quoted fields containing newlines and
+    blank lines are counted as lines.
+    """
+    lines = 0
+    last = b''
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(LINE_COUNT_CHUNK), b''):
+            lines += chunk.count(b'\n')
+            last = chunk
+    # A final line without a trailing newline
+    if last and not last.endswith(b'\n'):
+        lines += 1
+    return lines
+
+def excel_head(filepath, rows=PREVIEW_ROWS):
+    """
+    First rows and total row count of the first worksheet of an .xlsx file
+
+    Reads in openpyxl's read-only mode and stops after the requested rows.
+    The row count comes from the sheet's stored dimensions, so it is None
+    for files written without them.
+
+    Returns:
+        Tuple (DataFrame of the first rows, data row count or None)
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        max_row = sheet.max_row
+        values = sheet.iter_rows(max_row=rows + 1, values_only=True)
+        header = next(values, None)
+        if header is None:
+            return pd.DataFrame(), 0
+        head = pd.DataFrame(list(values), columns=column_names(header))
+        return head, (max_row - 1 if max_row else None)
+    finally:
+        workbook.close()
+
+def tabular_preview(head, row_count, sanitize, type_name, label):
+    """
+    Build a preview result from the first rows of a table
+
+    Args:
+        head: DataFrame of the first rows
+        row_count: Total data rows, or None if unknown
+        sanitize: The extractor's DataFrame sanitizer
+        type_name: Extracted data type ('csv', 'excel')
+        label: Format name used in the preview text
+    """
+    head_sanitized = sanitize(head)
+    columns = list(head_sanitized.columns)
+    if row_count is None:
+        summary = f"{len(columns)} columns in {label}"
+    else:
+        summary = f"{row_count} rows and {len(columns)} columns in {label}"
+
+    return {
+        'type': type_name,
+        'columns': columns,
+        'sample_data': head_sanitized.to_dict('records'),
+        'row_count': row_count,
+        'column_count': len(columns),
+        'preview_only': True,
+        'preview': f"Found {summary}"
+    }
@@ -0,0 +1,86 @@
+"""
+Gunicorn settings for production serving
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Defaults come from config (SERVER_* variables, see .env.example). The
+workload is dominated by LLM calls of several seconds, during which a
+request holds its worker without using CPU, so the default worker class is
+'gthread': SERVER_THREADS requests share each worker process. 'gevent'
+serves many more concurrent requests per worker when gevent is installed;
+'sync' serves one request per worker and only suits small deployments.
+
+With SERVER_PRELOAD the app and its heavy backends (pandas, Plotly,
+extractors) are imported once in the master and shared copy-on-write by the
+workers. Anything that does not survive a fork (warm-up thread, render
+pool, HTTP sessions, Kaleido) starts in each worker after the fork.
+
+Workers are recycled gracefully: a worker whose RSS has grown more than
+SERVER_MAX_WORKER_GROWTH_MB since it started stops taking requests, lets
+its in-flight requests finish and is replaced by a fresh one.
+"""
+import gc
+import os
+# Aliased: gunicorn reads every module-level name here, and 'config' is one of its settings
+from config import config as app_config
+
+def _worker_class():
+    if app_config.SERVER_WORKER_CLASS == 'gevent':
+        try:
+            import gevent  # noqa: F401
+        except ImportError:
+            print("gevent is not installed; using the gthread worker class")
+            return 'gthread'
+    return app_config.SERVER_WORKER_CLASS
+
+def _workers():
+    if app_config.SERVER_WORKERS:
+        return app_config.SERVER_WORKERS
+    cpus = os.cpu_count() or 1
+    return cpus * 2 + 1 if worker_class == 'sync' else cpus
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+worker_class = _worker_class()
+workers = _workers()
+threads = app_config.SERVER_THREADS if worker_class == 'gthread' else 1
+worker_connections = app_config.SERVER_WORKER_CONNECTIONS
+timeout = app_config.SERVER_TIMEOUT
+graceful_timeout = app_config.SERVER_GRACEFUL_TIMEOUT
+keepalive = app_config.SERVER_KEEPALIVE
+preload_app = app_config.SERVER_PRELOAD
+max_requests = app_config.SERVER_MAX_REQUESTS
+max_requests_jitter = max(app_config.SERVER_MAX_REQUESTS // 10, 1) if app_config.SERVER_MAX_REQUESTS else 0
+accesslog = '-'
+
+def when_ready(server):
+    """Master, after the app is loaded and before the first fork"""
+    if server.cfg.preload_app:
+        from warmup import preload_modules
+        preload_modules()
+        # Keep the collector from touching (and so copying) the shared objects in every worker
+        gc.freeze()
+    server.log.info(f"Serving with {workers} {worker_class} worker(s)" + (f" x {threads} threads" if worker_class == 'gthread' else ''))
+
+def post_fork(server, worker):
+    """Worker process, right after the fork"""
+    from memory_accounting import current_rss
+    from warmup import warmup
+
+    worker.rss_baseline = current_rss()
+    warmup.start()
+
+def post_request(worker, req, environ, resp):
+    """Recycle the worker once its memory has grown past the limit"""
+    if not app_config.SERVER_MAX_WORKER_GROWTH_MB or not worker.alive:
+        return
+
+    from memory_accounting import current_rss, MB
+
+    growth = current_rss() - getattr(worker, 'rss_baseline', 0)
+    if growth > app_config.SERVER_MAX_WORKER_GROWTH_MB * MB:
+        worker.log.info(
+            f"Worker {worker.pid} grew {growth // MB} MB (limit {app_config.SERVER_MAX_WORKER_GROWTH_MB} MB); "
+            "restarting after in-flight requests finish"
+        )
+        # Stops accepting; the arbiter replaces the worker once it exits
+        worker.alive = False
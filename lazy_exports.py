@@ -0,0 +1,32 @@
+"""
+Lazy package exports (PEP 562)
+
+Packages list their exports by submodule; each export is imported on first
+access and then stored on the package, so importing a package does not load
+its heavy dependencies up front.
+"""
+import importlib
+import sys
+
+def lazy_exports(module_name, exports):
+    """
+    Build the module-level __getattr__ and __dir__ for a package
+
+    Args:
+        module_name: The package's __name__
+        exports: Export name -> submodule (relative to the package)
+
+    Returns:
+        Tuple (__getattr__, __dir__)
+    """
+    def __getattr__(name):
+        if name in exports:
+            value = getattr(importlib.import_module(exports[name], module_name), name)
+            setattr(sys.modules[module_name], name, value)
+            return value
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[module_name])) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,124 @@
+"""
+Memory accounting and the per-request memory budget
+
+Each pipeline stage records its RSS delta and, with MEMORY_TRACKING set to
+'tracemalloc', the peak of Python allocations made during the stage (plus
+the top allocation sites when MEMORY_TOP_SITES > 0). tracemalloc slows
+allocation-heavy code several times over and its peak is process-wide, so
+it is meant for diagnosing a worker, not for normal traffic.
+
+Before a file is extracted its in-memory size is estimated from the file
+size. Files over the budget are extracted in streaming mode when the format
+allows it (CSV, .xlsx), and rejected otherwise, instead of letting the
+container's OOM killer take the whole worker down.
+"""
+import os
+import resource
+import tracemalloc
+from contextlib import contextmanager
+from config import config
+
+MB = 1024 * 1024
+
+# Peak traced memory of a full extraction relative to the file size (measured
+# on mixed text/number tables: DataFrame + sanitized copy + records list)
+EXPANSION_FACTORS = {
+    '.csv': 10,
+    '.xlsx': 15,
+    '.xls': 15,
+    '.pdf': 20,
+    '.png': 10,
+    '.jpg': 10,
+    '.jpeg': 10
+}
+
+STREAMABLE_EXTENSIONS = ('.csv', '.xlsx')
+
+class MemoryBudgetExceeded(Exception):
+    """The request would need more memory than the budget allows"""
+    pass
+
+def current_rss():
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Not Linux: fall back to the peak RSS (KB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if peak > 1 << 32 else peak * 1024
+
+def memory_budget():
+    """Bytes a request may use: MEMORY_BUDGET_MB, capped by the headroom below MEMORY_LIMIT_MB"""
+    budget = config.MEMORY_BUDGET_MB * MB
+    if config.MEMORY_LIMIT_MB:
+        budget = min(budget, config.MEMORY_LIMIT_MB * MB - current_rss())
+    return budget
+
+def estimate_extraction_bytes(filepath):
+    extension = os.path.splitext(filepath)[1].lower()
+    return os.path.getsize(filepath) * EXPANSION_FACTORS.get(extension, 10)
+
+def plan_extraction(filepath):
+    """
+    Decide how a file is extracted within the memory budget
+
+    Returns:
+        'full' or 'streaming'
+
+    Raises:
+        MemoryBudgetExceeded: If the file is over budget and cannot be streamed
+    """
+    estimate = estimate_extraction_bytes(filepath)
+    budget = memory_budget()
+    if estimate <= budget:
+        return 'full'
+
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension in STREAMABLE_EXTENSIONS:
+        print(f"Extracting {os.path.basename(filepath)} in streaming mode: needs ~{estimate // MB} MB, budget {max(budget, 0) // MB} MB")
+        return 'streaming'
+
+    raise MemoryBudgetExceeded(
+        f"This file needs an estimated {estimate // MB} MB to process, over the "
+        f"{max(budget, 0) // MB} MB memory budget. Please upload a smaller file."
+    )
+
+@contextmanager
+def track_memory(stage_name):
+    """
+    Record memory used by the enclosed code
+
+    Yields a dict filled in on exit with 'rss_delta' and, when tracing,
+    'traced_peak' (bytes allocated at the peak, above the level at entry).
+    """
+    mode = config.MEMORY_TRACKING
+    usage = {}
+    if mode == 'off':
+        yield usage
+        return
+
+    tracing = mode == 'tracemalloc'
+    if tracing and not tracemalloc.is_tracing():
+        tracemalloc.start(config.MEMORY_TRACE_FRAMES)
+    if tracing:
+        traced_start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot() if config.MEMORY_TOP_SITES else None
+    rss_start = current_rss()
+
+    try:
+        yield usage
+    finally:
+        usage['rss_delta'] = current_rss() - rss_start
+        if tracing:
+            usage['traced_peak'] = max(tracemalloc.get_traced_memory()[1] - traced_start, 0)
+            if before is not None:
+                _print_top_sites(stage_name, before, tracemalloc.take_snapshot())
+
+def _print_top_sites(stage_name, before, after):
+    stats = after.compare_to(before, 'lineno')[:config.MEMORY_TOP_SITES]
+    print(f"Top allocation sites for stage '{stage_name}':")
+    for stat in stats:
+        frame = stat.traceback[0]
+        print(f"  {frame.filename}:{frame.lineno}: {stat.size_diff / MB:+.1f} MB ({stat.count_diff:+d} blocks)")
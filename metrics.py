@@ -0,0 +1,317 @@
+"""
+In-process metrics with a Prometheus text endpoint
+
+Counters and histograms live in this process and are rendered in the
+Prometheus text exposition format by /metrics; nothing external is needed
+to collect them. Pipeline stages are timed with stage(), labelled by the
+extractor, provider and template of the request being served (set once per
+request with metric_labels(), and carried into background threads via
+contextvars).
+"""
+import contextvars
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from config import config
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(10))  # 1 KB .. 256 MB
+
+STAGE_LABELS = ('stage', 'extractor', 'provider', 'template')
+
+# Label values outside the configured providers and templates (both come from
+# request bodies) are reported as this, so clients cannot create new series
+OTHER_LABEL = 'other'
+
+_current_labels = contextvars.ContextVar('metric_labels', default={})
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                labels = dict(zip(self.labelnames, key))
+                for bound, count in zip(self.buckets, counts):
+                    samples.append((f"{self.name}_bucket", dict(labels, le=_format_value(bound)), count))
+                samples.append((f"{self.name}_sum", labels, total))
+                samples.append((f"{self.name}_count", labels, counts[-1]))
+        return samples
+
+class WorkerActivity:
+    """
+    Requests in flight in this worker process, and how long it has been busy
+
+    busy_seconds counts wall time with at least one request in flight (the
+    utilization of a sync worker); request_seconds sums every request's
+    duration, so its rate is the mean number of requests in flight (divide
+    by the thread count for threaded workers).
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.busy_seconds = 0.0
+        self.request_seconds = 0.0
+        self._changed_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def begin(self):
+        with self._lock:
+            self._advance()
+            self.in_flight += 1
+
+    def end(self):
+        with self._lock:
+            self._advance()
+            self.in_flight -= 1
+
+    def snapshot(self):
+        with self._lock:
+            self._advance()
+            return {'in_flight': self.in_flight, 'busy_seconds': self.busy_seconds, 'request_seconds': self.request_seconds}
+
+    def _advance(self):
+        now = time.perf_counter()
+        elapsed = now - self._changed_at
+        if self.in_flight:
+            self.busy_seconds += elapsed
+            self.request_seconds += elapsed * self.in_flight
+        self._changed_at = now
+
+class MetricsRegistry:
+    """Metrics of this process plus collectors read at scrape time"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=SECONDS_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """
+        Register a function returning (name, kind, documentation, [(labels, value)])
+        tuples, called on every scrape (decorator)
+        """
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines += _family(metric.name, metric.kind, metric.documentation, metric.samples())
+        for collect in self._collectors:
+            try:
+                families = list(collect())
+            except Exception as e:
+                print(f"Metrics collector {collect.__name__} failed: {str(e)}")
+                continue
+            for name, kind, documentation, values in families:
+                lines += _family(name, kind, documentation, [(name, labels, value) for labels, value in values])
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    'dataviz_stage_seconds', 'Time spent in each analysis pipeline stage', STAGE_LABELS
+)
+STAGE_RSS_GROWTH = registry.histogram(
+    'dataviz_stage_rss_growth_bytes', 'Resident memory growth during each pipeline stage', STAGE_LABELS, BYTES_BUCKETS
+)
+STAGE_TRACED_PEAK = registry.histogram(
+    'dataviz_stage_traced_peak_bytes', 'Peak Python allocations during each pipeline stage (MEMORY_TRACKING=tracemalloc)', STAGE_LABELS, BYTES_BUCKETS
+)
+STAGE_ERRORS = registry.counter(
+    'dataviz_stage_errors_total', 'Pipeline stages that raised an exception', STAGE_LABELS
+)
+REQUEST_SECONDS = registry.histogram(
+    'dataviz_http_request_seconds', 'HTTP request latency', ('endpoint', 'method', 'status')
+)
+RESPONSE_BYTES = registry.histogram(
+    'dataviz_http_response_bytes', 'HTTP response body size', ('endpoint',), BYTES_BUCKETS
+)
+PAYLOAD_BYTES = registry.histogram(
+    'dataviz_payload_bytes', 'Size of pipeline payloads (upload, prompt, LLM response)', ('payload', 'extractor', 'provider'), BYTES_BUCKETS
+)
+SPECULATION_CLAIMS = registry.counter(
+    'dataviz_speculative_claims_total', 'Speculative analyses claimed by /analyze, by outcome (hit, extraction only, miss)', ('result',)
+)
+
+worker_activity = WorkerActivity()
+
+@registry.collector
+def worker_metrics():
+    """Saturation of this worker process; the pid label tells workers apart when scrapes land on different ones"""
+    activity = worker_activity.snapshot()
+    labels = {'pid': os.getpid()}
+    yield 'dataviz_worker_requests_in_flight', 'gauge', 'Requests being served by this worker', [(labels, activity['in_flight'])]
+    yield 'dataviz_worker_busy_seconds_total', 'counter', 'Wall time this worker had at least one request in flight', [(labels, activity['busy_seconds'])]
+    yield 'dataviz_worker_request_seconds_total', 'counter', 'Summed duration of requests served by this worker', [(labels, activity['request_seconds'])]
+
+@registry.collector
+def cache_metrics():
+    """Render and image cache usage (only caches already loaded in this process are read)"""
+    caches = []
+    render_module = sys.modules.get('visualization.render_cache')
+    if render_module:
+        caches.append(('render', render_module.render_cache.stats()))
+    image_module = sys.modules.get('visualization.static_export')
+    if image_module:
+        caches.append(('image', image_module.static_renderer.stats()))
+    cache_module = sys.modules.get('caching.cache_factory')
+    if cache_module and cache_module._backend is not None:
+        # Entries and bytes are host-wide for the SQLite backend; hits and misses are this worker's
+        caches.append(('shared', cache_module._backend.stats()))
+
+    yield 'dataviz_cache_hits_total', 'counter', 'Cache lookups that hit', [({'cache': name}, stats['hits']) for name, stats in caches]
+    yield 'dataviz_cache_misses_total', 'counter', 'Cache lookups that missed', [({'cache': name}, stats['misses']) for name, stats in caches]
+    yield 'dataviz_cache_bytes', 'gauge', 'Bytes held in the cache', [({'cache': name}, stats['bytes']) for name, stats in caches if stats['bytes'] is not None]
+    yield 'dataviz_cache_entries', 'gauge', 'Entries held in the cache', [({'cache': name}, stats['entries']) for name, stats in caches if stats['entries'] is not None]
+
+@registry.collector
+def figure_budget_metrics():
+    """How often each figure budget limit fired"""
+    budget_module = sys.modules.get('visualization.figure_budget')
+    counts = budget_module.budget_counters.snapshot() if budget_module else {}
+    yield 'dataviz_figure_budget_total', 'counter', 'AI figures checked against the budget, and limits fired', [
+        ({'limit': name}, value) for name, value in counts.items()
+    ]
+
+@contextmanager
+def metric_labels(**labels):
+    """Set stage labels (extractor, provider, template) for the enclosed code"""
+    token = _current_labels.set(dict(_current_labels.get(), **_bounded(labels)))
+    try:
+        yield
+    finally:
+        _current_labels.reset(token)
+
+def set_metric_labels(**labels):
+    """Add stage labels for the rest of the current request"""
+    _current_labels.set(dict(_current_labels.get(), **_bounded(labels)))
+
+def clear_metric_labels():
+    """Drop labels left over from an earlier request served by the same thread"""
+    _current_labels.set({})
+
+@contextmanager
+def stage(name):
+    """Time a pipeline stage (and account its memory) under the current request labels"""
+    from memory_accounting import track_memory
+
+    labels = dict(_current_labels.get(), stage=name)
+    memory = {}
+    start = time.perf_counter()
+    try:
+        with track_memory(name) as memory:
+            yield
+    except Exception:
+        STAGE_ERRORS.inc(**labels)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, **labels)
+        if 'rss_delta' in memory:
+            STAGE_RSS_GROWTH.observe(max(memory['rss_delta'], 0), **labels)
+        if 'traced_peak' in memory:
+            STAGE_TRACED_PEAK.observe(memory['traced_peak'], **labels)
+
+def observe_payload(payload, size):
+    """Record a payload size (in bytes) under the current request labels"""
+    labels = _current_labels.get()
+    PAYLOAD_BYTES.observe(size, payload=payload, extractor=labels.get('extractor', ''), provider=labels.get('provider', ''))
+
+def extractor_label(filepath):
+    """Extractor name for a file ('csv', 'excel', 'pdf', 'image'), matching the extracted 'type'"""
+    from data_extractors.extractor_factory import EXTRACTORS
+    extension = os.path.splitext(filepath or '')[1].lower()
+    if extension not in EXTRACTORS:
+        return ''
+    return EXTRACTORS[extension][1][:-len('Extractor')].lower()
+
+def _bounded(labels):
+    """Map provider and template values that are not configured to OTHER_LABEL"""
+    allowed = {'provider': config.AI_PROVIDERS, 'template': config.AVAILABLE_TEMPLATES}
+    return {
+        name: value if name not in allowed or value in allowed[name] else OTHER_LABEL
+        for name, value in labels.items()
+    }
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+def _family(name, kind, documentation, samples):
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for sample_name, labels, value in samples:
+        label_text = ','.join(f'{key}="{_escape(value_)}"' for key, value_ in labels.items())
+        lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}" if label_text else f"{sample_name} {_format_value(value)}")
+    return lines
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return repr(value)
+    return str(value)
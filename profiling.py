@@ -0,0 +1,155 @@
+"""
+On-demand request profiling
+
+A request is profiled when it carries the admin header (X-Profile: <token>,
+or ?profile=<token>) matching PROFILE_TOKEN, or when it is picked by
+sampling PROFILE_SAMPLE_RATE of traffic. Two capture modes:
+
+- 'sample': a background thread samples the stacks of the request thread
+  (and of speculative-analysis threads, where the provider call may run)
+  every PROFILE_INTERVAL_MS and writes collapsed stacks
+  ('frame;frame;frame count'), ready for flamegraph.pl or speedscope.
+- 'cprofile': cProfile over the request thread, written as a .prof file
+  for pstats/snakeviz.
+
+Profiles are written to PROFILE_DIR; the file name is returned in the
+X-Profile-File response header.
+"""
+import cProfile
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from config import config
+
+# At most this many requests are profiled at once; further requests run unprofiled
+_slots = threading.BoundedSemaphore(config.PROFILE_MAX_CONCURRENT)
+
+# Threads sampled along with the request thread
+SAMPLED_THREAD_PREFIXES = ('speculative-analysis',)
+
+class StackSampler:
+    """Periodically sample Python stacks of selected threads into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, thread_name in self._targets():
+                frame = frames.get(thread_id)
+                if frame is not None and not (thread_id != self.thread_id and _is_idle_worker(frame)):
+                    self.counts[collapse_stack(frame, thread_name)] += 1
+            self.samples += 1
+
+    def _targets(self):
+        targets = [(self.thread_id, 'request')]
+        for thread in threading.enumerate():
+            if thread.ident != self.thread_id and thread.name.startswith(SAMPLED_THREAD_PREFIXES):
+                targets.append((thread.ident, thread.name))
+        return targets
+
+class RequestProfile:
+    """Profiler attached to one request"""
+
+    def __init__(self, label, mode=None, interval_ms=None):
+        self.label = label
+        self.mode = mode or config.PROFILE_MODE
+        self.interval = (interval_ms or config.PROFILE_INTERVAL_MS) / 1000
+        self.filename = None
+        self._started = time.perf_counter()
+        self._finished = False
+
+        if self.mode == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._profiler = StackSampler(threading.get_ident(), self.interval)
+            self._profiler.start()
+
+    def finish(self):
+        """Stop profiling and write the profile file (idempotent); returns its name"""
+        if self._finished:
+            return self.filename
+        self._finished = True
+
+        try:
+            os.makedirs(config.PROFILE_DIR, exist_ok=True)
+            elapsed_ms = int((time.perf_counter() - self._started) * 1000)
+            stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.label}-{elapsed_ms}ms-{uuid.uuid4().hex[:8]}"
+
+            if self.mode == 'cprofile':
+                self._profiler.disable()
+                self.filename = f"{stem}.prof"
+                self._profiler.dump_stats(os.path.join(config.PROFILE_DIR, self.filename))
+            else:
+                counts = self._profiler.stop()
+                self.filename = f"{stem}.collapsed"
+                with open(os.path.join(config.PROFILE_DIR, self.filename), 'w', encoding='utf-8') as f:
+                    for stack, count in counts.most_common():
+                        f.write(f"{stack} {count}\n")
+
+            print(f"Profile written: {self.filename}")
+            return self.filename
+        finally:
+            _slots.release()
+
+def maybe_start_profile(request):
+    """
+    Start a profile for a Flask request if it asked for one (admin token) or was sampled
+
+    Returns:
+        RequestProfile, or None if the request is not profiled
+    """
+    if not (_has_admin_token(request) or _sampled()):
+        return None
+    if not _slots.acquire(blocking=False):
+        return None
+
+    label = (request.url_rule.rule if request.url_rule else 'unmatched').strip('/').split('/')[0] or 'index'
+    try:
+        return RequestProfile(label)
+    except Exception as e:
+        _slots.release()
+        print(f"Could not start profiler: {str(e)}")
+        return None
+
+def collapse_stack(frame, root):
+    """Collapsed-stack line for a frame: root;outermost;...;innermost"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(root)
+    # flamegraph.pl splits on the last space, so spaces inside frames are fine
+    return ';'.join(reversed(names))
+
+def _is_idle_worker(frame):
+    # Pool threads waiting for work sit in concurrent.futures' _worker loop
+    return frame.f_code.co_name == '_worker' and frame.f_code.co_filename.endswith(os.path.join('futures', 'thread.py'))
+
+def _has_admin_token(request):
+    token = request.headers.get('X-Profile') or request.args.get('profile')
+    return bool(config.PROFILE_TOKEN and token) and hmac.compare_digest(token.encode('utf-8'), config.PROFILE_TOKEN.encode('utf-8'))
+
+def _sampled():
+    return config.PROFILE_SAMPLE_RATE > 0 and random.random() < config.PROFILE_SAMPLE_RATE
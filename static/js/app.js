@@ -4,6 +4,12 @@ let currentFilepath = null;
 let currentTemplate = 'professional';
 let currentProvider = 'huggingface'; // Hard-coded to use free Hugging Face model
 let currentAnalysis = null;
+let currentAnalysisId = null; // Server-side analysis reference (figures are not echoed back)
+const chartFormat = 'json'; // Figures arrive as Plotly JSON and are drawn with Plotly.react
+let renderedTemplate = null; // Template of the figures currently on screen (null for HTML charts)
+const CHUNKED_UPLOAD_THRESHOLD = 8 * 1024 * 1024; // Larger files go through the resumable /upload/chunked flow
+const CHUNK_RETRIES = 5;
+const EXTRACTION_POLL_TIMEOUT_MS = 15 * 60 * 1000; // Give up waiting for background extraction after this
 
 // DOM elements
 const dropZone = document.getElementById('dropZone');
@@ -48,19 +54,13 @@ fileInput.addEventListener('change', (e) => {
 async function handleFile(file) {
     currentFile = file;
 
-    const formData = new FormData();
-    formData.append('file', file);
-
     try {
         statusText.textContent = 'Uploading file...';
         uploadStatus.style.display = 'block';
 
-        const response = await fetch('/upload', {
-            method: 'POST',
-            body: formData
-        });
-
-        const data = await response.json();
+        const data = file.size > CHUNKED_UPLOAD_THRESHOLD
+            ? await uploadChunked(file)
+            : await uploadWhole(file);
 
         if (data.success) {
             statusText.textContent = `File uploaded: ${data.filename}`;
@@ -79,7 +79,94 @@ async function handleFile(file) {
     }
 }
 
-// Select template
+async function uploadWhole(file) {
+    const formData = new FormData();
+    formData.append('file', file);
+
+    const response = await fetch('/upload', {
+        method: 'POST',
+        body: formData
+    });
+    return response.json();
+}
+
+// Sends the file in slices; a failed slice is retried from the offset the server reports
+async function uploadChunked(file) {
+    let response = await fetch('/upload/chunked', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ filename: file.name, size: file.size })
+    });
+    let session = await response.json();
+    if (!response.ok) {
+        return session;
+    }
+
+    const uploadId = session.upload_id;
+    const chunkSize = session.chunk_size;
+    let offset = session.offset;
+    let retries = 0;
+
+    while (offset < file.size) {
+        statusText.textContent = `Uploading file... ${Math.floor(offset * 100 / file.size)}%`;
+        try {
+            response = await fetch(`/upload/chunked/${uploadId}`, {
+                method: 'PUT',
+                headers: { 'Upload-Offset': String(offset) },
+                body: file.slice(offset, offset + chunkSize)
+            });
+            const data = await response.json();
+            if (response.ok || response.status === 409) {
+                // 409: the server holds a different amount than we assumed; continue from there
+                offset = data.offset;
+                retries = 0;
+                continue;
+            }
+            if (response.status < 500) {
+                return data;
+            }
+        } catch (error) {
+            // Connection dropped; fall through to resume
+        }
+
+        if (++retries > CHUNK_RETRIES) {
+            throw new Error('Upload failed after several retries');
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000 * retries));
+        response = await fetch(`/upload/chunked/${uploadId}`);
+        session = await response.json();
+        if (!response.ok) {
+            return session;
+        }
+        offset = session.offset;
+    }
+
+    statusText.textContent = 'Extracting data...';
+    response = await fetch(`/upload/chunked/${uploadId}/complete`, { method: 'POST' });
+    session = await response.json();
+    if (!response.ok) {
+        return session;
+    }
+
+    const deadline = Date.now() + EXTRACTION_POLL_TIMEOUT_MS;
+    while (session.state === 'extracting') {
+        if (Date.now() > deadline) {
+            throw new Error('Timed out waiting for the file to be processed');
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        response = await fetch(`/upload/chunked/${uploadId}`);
+        session = await response.json();
+        if (!response.ok) {
+            return session;
+        }
+    }
+
+    if (session.state === 'failed') {
+        return { success: false, error: session.error };
+    }
+    return { success: true, ...session };
+}
+
 function selectTemplate(template) {
     currentTemplate = template;
 
@@ -93,12 +180,86 @@ function selectTemplate(template) {
         selectedCard.classList.add('active');
     }
 
-    // If we already have analysis, regenerate with new template
+    // If we already have analysis, restyle the charts in place (or regenerate HTML charts)
     if (currentAnalysis) {
-        regenerateVisualization();
+        if (renderedTemplate) {
+            applyThemePatch(template);
+        } else {
+            regenerateVisualization();
+        }
+    }
+}
+
+// Switch the rendered figures to another template with a relayout/restyle patch
+async function applyThemePatch(template) {
+    if (template === renderedTemplate) {
+        return;
+    }
+
+    try {
+        const params = new URLSearchParams({ from: renderedTemplate, to: template });
+        const response = await fetch(`/theme-patch?${params}`);
+        const patch = await response.json();
+
+        if (!patch.success) {
+            regenerateVisualization();
+            return;
+        }
+
+        document.querySelectorAll('#chartsContainer .plotly-graph-div').forEach(chartDiv => {
+            chartDiv.data.forEach((trace, index) => {
+                const update = {};
+                collectColorUpdates(trace, '', patch.palette_map, update);
+                if (Object.keys(update).length > 0) {
+                    Plotly.restyle(chartDiv, update, [index]);
+                }
+            });
+            Plotly.relayout(chartDiv, patch.relayout);
+        });
+
+        renderedTemplate = patch.template;
+    } catch (error) {
+        alert(`Error: ${error.message}`);
     }
 }
 
+// Collect restyle updates for trace color attributes that use the old palette
+function collectColorUpdates(obj, prefix, paletteMap, update) {
+    Object.entries(obj).forEach(([key, value]) => {
+        if (value && typeof value === 'object' && !Array.isArray(value) && !ArrayBuffer.isView(value)) {
+            collectColorUpdates(value, `${prefix}${key}.`, paletteMap, update);
+        } else if (key.toLowerCase().includes('color')) {
+            const mapped = mapPaletteColors(value, paletteMap);
+            if (mapped !== undefined) {
+                // Restyle values are per-trace lists
+                update[prefix + key] = [mapped];
+            }
+        }
+    });
+}
+
+// Map palette colors in a color value (string, list or colorscale); undefined if nothing changed
+function mapPaletteColors(value, paletteMap) {
+    if (typeof value === 'string') {
+        return paletteMap[value.toUpperCase()];
+    }
+
+    if (Array.isArray(value)) {
+        let changed = false;
+        const mapped = value.map(item => {
+            const result = mapPaletteColors(item, paletteMap);
+            if (result !== undefined) {
+                changed = true;
+                return result;
+            }
+            return item;
+        });
+        return changed ? mapped : undefined;
+    }
+
+    return undefined;
+}
+
 // Progress tracking
 let progressInterval = null;
 let holdMessageTimeout1 = null;
@@ -239,7 +400,8 @@ async function analyzeData() {
             body: JSON.stringify({
                 filepath: currentFilepath,
                 provider: currentProvider,
-                template: currentTemplate
+                template: currentTemplate,
+                format: chartFormat
             })
         });
 
@@ -250,6 +412,7 @@ async function analyzeData() {
 
         if (data.success) {
             currentAnalysis = data.analysis;
+            currentAnalysisId = data.analysis_id || null;
 
             // Small delay to show 100%
             setTimeout(() => {
@@ -281,17 +444,29 @@ async function regenerateVisualization() {
     try {
         loadingSection.style.display = 'block';
 
-        const response = await fetch('/regenerate', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                filepath: currentFilepath,
+        let response;
+        if (currentAnalysisId) {
+            // Cacheable GET: the browser revalidates with If-None-Match and may get a 304
+            const params = new URLSearchParams({
                 template: currentTemplate,
-                analysis: currentAnalysis
-            })
-        });
+                format: chartFormat,
+                filepath: currentFilepath
+            });
+            response = await fetch(`/visualizations/${currentAnalysisId}?${params}`);
+        } else {
+            response = await fetch('/regenerate', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    filepath: currentFilepath,
+                    template: currentTemplate,
+                    format: chartFormat,
+                    analysis: currentAnalysis
+                })
+            });
+        }
 
         const data = await response.json();
 
@@ -300,6 +475,8 @@ async function regenerateVisualization() {
                 analysis: currentAnalysis,
                 visualizations: data.visualizations
             });
+        } else {
+            alert(`Error: ${data.error}`);
         }
     } catch (error) {
         alert(`Error: ${error.message}`);
@@ -332,11 +509,18 @@ function displayResults(data) {
     // Display charts
     const chartsContainer = document.getElementById('chartsContainer');
     chartsContainer.innerHTML = '';
+    renderedTemplate = chartFormat === 'json' ? visualizations.template : null;
 
     visualizations.charts.forEach((chart, index) => {
         const chartItem = document.createElement('div');
         chartItem.className = 'chart-item';
 
+        // JSON transport: draw the figure directly with Plotly.react
+        if (chart.figure) {
+            renderFigureChart(chartItem, chart, visualizations.layout_template, chartsContainer);
+            return;
+        }
+
         // Create a temporary div to parse the HTML
         const tempDiv = document.createElement('div');
         tempDiv.innerHTML = chart.html;
@@ -367,6 +551,28 @@ function displayResults(data) {
     });
 }
 
+// Render a chart delivered as Plotly figure JSON
+function renderFigureChart(chartItem, chart, layoutTemplate, chartsContainer) {
+    const chartDiv = document.createElement('div');
+    chartDiv.id = chart.id;
+    chartDiv.className = 'plotly-graph-div';
+    chartItem.appendChild(chartDiv);
+
+    const descDiv = document.createElement('div');
+    descDiv.className = 'chart-description';
+    descDiv.textContent = chart.description;
+    chartItem.appendChild(descDiv);
+
+    chartsContainer.appendChild(chartItem);
+
+    const layout = Object.assign({}, chart.figure.layout);
+    if (!layout.template && layoutTemplate) {
+        layout.template = layoutTemplate;
+    }
+
+    Plotly.react(chartDiv, chart.figure.data, layout, { responsive: true });
+}
+
 // Export to PDF (Data-Driven)
 async function exportPDF() {
     const exportBtn = document.querySelector('.export-btn');
@@ -376,6 +582,12 @@ async function exportPDF() {
         exportBtn.textContent = 'Generating PDF...';
         exportBtn.disabled = true;
 
+        // Stored analyses are exported server-side (charts rendered in one batch)
+        if (currentAnalysisId) {
+            await downloadServerPDF();
+            return;
+        }
+
         // Initialize jsPDF
         const { jsPDF } = window.jspdf;
         const doc = new jsPDF();
@@ -515,6 +727,32 @@ async function exportPDF() {
     }
 }
 
+async function downloadServerPDF() {
+    const response = await fetch('/export-pdf', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            analysis_id: currentAnalysisId,
+            filepath: currentFilepath,
+            template: currentTemplate
+        })
+    });
+
+    if (!response.ok) {
+        const data = await response.json();
+        throw new Error(data.error || 'PDF export failed');
+    }
+
+    const url = URL.createObjectURL(await response.blob());
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = 'AI_Data_Analysis_Report.pdf';
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+    URL.revokeObjectURL(url);
+}
+
 // Initialize theme
 document.addEventListener('DOMContentLoaded', () => {
 
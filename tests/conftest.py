@@ -0,0 +1,18 @@
+"""
+Shared test setup
+
+The repository root goes on sys.path so tests import the app's modules as
+the app does. Settings are fixed before config is first imported: no shared
+cache, warm-up or speculative analysis, whatever the local .env says.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.update(
+    CACHE_BACKEND='off',
+    WARMUP_STEPS='',
+    SPECULATIVE_ANALYSIS='false',
+    MEMORY_TRACKING='off'
+)
@@ -0,0 +1,88 @@
+import time
+import pytest
+
+CSV = ("region,sales\n" + "\n".join(f"r{i % 3},{i}" for i in range(40)) + "\n").encode('utf-8')
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # Importing the app creates its folders in the working directory
+    monkeypatch.chdir(tmp_path)
+    import app as app_module
+    from chunked_uploads import ChunkedUploads
+    from upload_store import UploadStore
+
+    store = UploadStore(root=str(tmp_path / 'store'), quota_bytes=1000)
+    monkeypatch.setattr(app_module, 'chunked_uploads', ChunkedUploads(store=store, max_bytes=800, workers=1))
+    return app_module.app.test_client()
+
+def create(client, size, filename='data.csv'):
+    return client.post('/upload/chunked', json={'filename': filename, 'size': size})
+
+def put_chunk(client, upload_id, offset, body):
+    return client.put(f'/upload/chunked/{upload_id}', data=body, headers={'Upload-Offset': str(offset)})
+
+def wait_until_settled(client, upload_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f'/upload/chunked/{upload_id}').get_json()
+        if status['state'] != 'extracting':
+            return status
+        time.sleep(0.05)
+    raise AssertionError('extraction did not finish')
+
+def test_chunk_at_wrong_offset_is_refused_with_the_current_offset(client):
+    upload_id = create(client, len(CSV)).get_json()['upload_id']
+    assert put_chunk(client, upload_id, 0, CSV[:100]).get_json()['offset'] == 100
+
+    response = put_chunk(client, upload_id, 50, CSV[50:150])
+
+    assert response.status_code == 409
+    assert response.get_json()['offset'] == 100
+    assert client.get(f'/upload/chunked/{upload_id}').get_json()['offset'] == 100
+
+def test_resume_and_complete(client):
+    upload_id = create(client, len(CSV)).get_json()['upload_id']
+    put_chunk(client, upload_id, 0, CSV[:100])
+
+    # A client that lost track asks for the offset and resumes from there
+    offset = client.get(f'/upload/chunked/{upload_id}').get_json()['offset']
+    assert put_chunk(client, upload_id, offset, CSV[offset:]).get_json()['offset'] == len(CSV)
+
+    response = client.post(f'/upload/chunked/{upload_id}/complete')
+    assert response.status_code == 202
+    status = wait_until_settled(client, upload_id)
+    assert status['state'] == 'ready'
+    with open(status['filepath'], 'rb') as f:
+        assert f.read() == CSV
+
+    # Completing again is idempotent
+    assert client.post(f'/upload/chunked/{upload_id}/complete').get_json()['state'] == 'ready'
+
+def test_complete_before_all_data_arrived_is_refused(client):
+    upload_id = create(client, len(CSV)).get_json()['upload_id']
+    put_chunk(client, upload_id, 0, CSV[:100])
+
+    response = client.post(f'/upload/chunked/{upload_id}/complete')
+
+    assert response.status_code == 409
+    assert response.get_json()['offset'] == 100
+
+def test_chunk_past_the_declared_size_is_refused(client):
+    upload_id = create(client, 10).get_json()['upload_id']
+
+    assert put_chunk(client, upload_id, 0, b'x' * 11).status_code == 413
+    assert client.get(f'/upload/chunked/{upload_id}').get_json()['offset'] == 0
+
+def test_sessions_over_the_size_limit_or_quota_are_refused(client):
+    assert create(client, 801).status_code == 413
+
+    # Open sessions reserve their declared size against the 1000-byte quota
+    assert create(client, 600).status_code == 201
+    response = create(client, 500)
+    assert response.status_code == 507
+    assert 'quota' in response.get_json()['error']
+    assert create(client, 400).status_code == 201
+
+def test_unknown_upload_is_not_found(client):
+    assert client.get('/upload/chunked/' + '0' * 32).status_code == 404
+    assert put_chunk(client, 'not-an-upload-id', 0, b'x').status_code == 404
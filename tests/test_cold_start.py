@@ -0,0 +1,12 @@
+"""Cold-start regression test: `import app` stays fast and loads no heavy backend"""
+import os
+from benchmarks.bench_cold_start import HEAVY_MODULES, measure_import
+
+# Generous next to the benchmark's 0.5s default, so slow CI machines do not flake
+MAX_IMPORT_SECONDS = float(os.getenv('COLD_START_MAX_SECONDS', '1.0'))
+
+def test_import_app_loads_no_heavy_modules_and_stays_fast():
+    median, leaked = measure_import(runs=3)
+
+    assert leaked == [], f"heavy modules imported eagerly: {', '.join(leaked)} (of {', '.join(HEAVY_MODULES)})"
+    assert median < MAX_IMPORT_SECONDS, f"import app took {median:.3f}s (limit {MAX_IMPORT_SECONDS}s)"
@@ -0,0 +1,75 @@
+import numpy as np
+from visualization.downsampling import apply_point_budget, grid_sample_indices, lttb_indices
+
+def test_lttb_keeps_endpoints_and_point_count():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+
+    indices = lttb_indices(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0
+    assert indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+
+def test_lttb_keeps_a_spike():
+    x = np.arange(500, dtype=float)
+    y = np.zeros(500)
+    y[321] = 100.0
+
+    assert 321 in lttb_indices(x, y, 20)
+
+def test_lttb_below_threshold_keeps_everything():
+    x = np.arange(10, dtype=float)
+
+    assert list(lttb_indices(x, x, 10)) == list(range(10))
+    assert list(lttb_indices(x, x, 50)) == list(range(10))
+
+def test_grid_sample_keeps_one_point_per_occupied_cell():
+    # Four tight clusters: one point survives per cluster cell
+    rng = np.random.default_rng(0)
+    corners = np.array([[0, 0], [0, 10], [10, 0], [10, 10]], dtype=float)
+    points = np.repeat(corners, 250, axis=0) + rng.uniform(0, 0.01, (1000, 2))
+
+    indices = grid_sample_indices(points[:, 0], points[:, 1], 100)
+
+    assert sorted(map(tuple, corners)) == sorted(map(tuple, points[indices].round()))
+
+def test_grid_sample_skips_non_finite_points():
+    x = np.array([np.nan] * 50 + list(range(50)), dtype=float)
+
+    indices = grid_sample_indices(x, x, 25)
+
+    assert np.all(indices >= 50)
+    assert len(indices) <= 25
+
+def test_point_budget_reduces_line_traces_with_their_marker_arrays():
+    n = 10000
+    figure = {'data': [{
+        'type': 'scatter',
+        'mode': 'lines',
+        'x': list(range(n)),
+        'y': [float(i % 97) for i in range(n)],
+        'marker': {'color': list(range(n))}
+    }], 'layout': {}}
+
+    apply_point_budget(figure, max_points=500, webgl_threshold=100)
+
+    trace = figure['data'][0]
+    assert len(trace['x']) == len(trace['y']) == len(trace['marker']['color']) == 500
+    assert trace['x'][0] == 0 and trace['x'][-1] == n - 1
+    assert trace['marker']['color'] == trace['x']
+    assert trace['type'] == 'scattergl'
+    assert 'showing 500 of 10,000 points' in figure['layout']['annotations'][0]['text']
+
+def test_point_budget_leaves_small_and_non_scatter_traces_alone():
+    figure = {'data': [
+        {'type': 'scatter', 'x': [1, 2, 3], 'y': [1, 2, 3]},
+        {'type': 'bar', 'x': list(range(5000)), 'y': list(range(5000))}
+    ], 'layout': {}}
+
+    apply_point_budget(figure, max_points=100, webgl_threshold=1000)
+
+    assert figure['data'][0] == {'type': 'scatter', 'x': [1, 2, 3], 'y': [1, 2, 3]}
+    assert len(figure['data'][1]['y']) == 5000
+    assert 'annotations' not in figure['layout']
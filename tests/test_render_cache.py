@@ -0,0 +1,64 @@
+import pickle
+import numpy as np
+import pandas as pd
+from visualization.render_cache import RenderCache, render_key
+
+def chart(chart_id, payload=''):
+    return {'type': 'bar', 'id': chart_id, 'figure': {'data': [{'type': 'bar', 'y': [1, 2]}]}, 'html': payload}
+
+def size_of(value):
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+def test_lru_stays_within_its_byte_bound():
+    entry_size = size_of(chart('chart_0', 'x' * 1000))
+    cache = RenderCache(max_bytes=entry_size * 3)
+
+    for i in range(5):
+        cache.put(f"key{i}", chart(f"chart_{i}", 'x' * 1000))
+
+    stats = cache.stats()
+    assert stats['entries'] == 3
+    assert stats['bytes'] <= cache.max_bytes
+    # The two least recently used entries were evicted, with their ids
+    assert cache.get('key0') is None and cache.get('key1') is None
+    assert cache.get_by_id('chart_0') is None
+    assert cache.get('key4')['id'] == 'chart_4'
+
+def test_lookups_refresh_recency():
+    entry_size = size_of(chart('chart_0', 'x' * 1000))
+    cache = RenderCache(max_bytes=entry_size * 2)
+    cache.put('key0', chart('chart_0', 'x' * 1000))
+    cache.put('key1', chart('chart_1', 'x' * 1000))
+
+    cache.get('key0')
+    cache.put('key2', chart('chart_2', 'x' * 1000))
+
+    assert cache.get('key0') is not None
+    assert cache.get('key1') is None
+
+def test_entries_over_the_bound_are_not_cached():
+    cache = RenderCache(max_bytes=100)
+
+    cache.put('big', chart('chart_big', 'x' * 1000))
+
+    assert cache.get('big') is None
+    assert cache.stats()['bytes'] == 0
+
+def test_lookups_return_independent_copies():
+    cache = RenderCache(max_bytes=1024 * 1024)
+    cache.put('key', chart('chart_a'))
+
+    first = cache.get('key')
+    first['figure']['data'][0]['y'].append(3)
+
+    assert cache.get('key')['figure']['data'][0]['y'] == [1, 2]
+    assert cache.get_by_id('chart_a') == cache.get('key')
+
+def test_render_key_is_canonical():
+    df = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+
+    assert render_key('create_bar_chart', 'dark', 'json', (df, 'a'), {'title': 'T', 'bins': 3}) == \
+        render_key('create_bar_chart', 'dark', 'json', (df.copy(), 'a'), {'bins': 3, 'title': 'T'})
+    assert render_key('create_bar_chart', 'dark', 'json', (df,)) != \
+        render_key('create_bar_chart', 'minimal', 'json', (df,))
+    assert render_key('f', 't', 'json', (np.array([1, 2]),)) != render_key('f', 't', 'json', (np.array([1, 3]),))
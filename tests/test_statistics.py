@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from visualization.statistics import (
+    box_statistics, grouped_box_statistics, histogram_bins, partition_by, sample_outliers
+)
+
+def test_box_statistics_match_numpy():
+    values = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 100], dtype=float)
+
+    stats = box_statistics(values)
+
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    assert (stats['q1'], stats['median'], stats['q3']) == (q1, median, q3)
+    assert stats['mean'] == values.mean()
+    # Whiskers end at the most extreme values inside the Tukey fences
+    assert stats['lowerfence'] == 1
+    assert stats['upperfence'] == 9
+    assert list(stats['outliers']) == [100]
+
+def test_box_statistics_ignore_missing_values():
+    stats = box_statistics([1, None, 'n/a', 3, float('nan'), 5])
+
+    assert (stats['q1'], stats['median'], stats['q3']) == (2, 3, 4)
+    assert box_statistics([None, 'n/a']) is None
+
+def test_grouped_box_statistics_match_per_group_statistics():
+    keys = pd.Series(['b', 'a', 'b', 'a', 'b', 'c'])
+    values = pd.Series([1, 10, 2, 20, 3, None])
+
+    groups = grouped_box_statistics(keys, values)
+
+    # Order of first appearance; 'c' has no numeric data
+    assert [key for key, _ in groups] == ['b', 'a']
+    for (_, stats), group in zip(groups, ([1, 2, 3], [10, 20])):
+        expected = box_statistics(group)
+        assert list(stats.pop('outliers')) == list(expected.pop('outliers'))
+        assert stats == expected
+
+def test_partition_by_skips_missing_keys():
+    parts = {key: list(positions) for key, positions in partition_by(pd.Series(['x', None, 'y', 'x']))}
+
+    assert parts == {'x': [0, 3], 'y': [2]}
+
+def test_sample_outliers_keeps_both_extremes():
+    outliers = np.array([5, -50, 7, 80, 6, 9, 11], dtype=float)
+
+    sampled = sample_outliers(outliers, 3)
+
+    assert len(sampled) == 3
+    assert sampled.min() == -50 and sampled.max() == 80
+
+def test_numeric_histogram_matches_numpy():
+    values = [0, 1, 1, 2, 3, 3, 3, 4, None]
+
+    x, widths, counts = histogram_bins(values, bins=4)
+
+    expected_counts, edges = np.histogram([0, 1, 1, 2, 3, 3, 3, 4], bins=4)
+    assert list(counts) == list(expected_counts)
+    assert np.allclose(x, (edges[:-1] + edges[1:]) / 2)
+    assert np.allclose(widths, np.diff(edges))
+
+def test_categorical_histogram_counts_each_category():
+    x, widths, counts = histogram_bins(['red', 'blue', 'red', None, 'green', 'red'])
+
+    assert list(x) == ['red', 'blue', 'green']
+    assert list(counts) == [3, 1, 1]
+    assert widths is None
+
+def test_boolean_histogram_counts_categories():
+    x, widths, counts = histogram_bins(pd.Series([True, False, True, True]))
+
+    assert dict(zip(x, counts)) == {'True': 3, 'False': 1}
+    assert widths is None
+
+def test_date_histogram_bins_dates():
+    dates = ['2024-01-01', '2024-01-02', '2024-01-02', '2024-01-05']
+
+    x, widths, counts = histogram_bins(dates, bins=4)
+
+    # One-day bins, closed on the left
+    assert list(counts) == [1, 2, 0, 1]
+    assert x[0] > pd.Timestamp('2024-01-01') and x[-1] < pd.Timestamp('2024-01-05')
+    # Plotly date axes take bar widths in milliseconds: 4 days / 4 bins
+    assert np.allclose(widths, 86400 * 1000)
+
+def test_datetime_series_histogram_uses_dates():
+    x, widths, counts = histogram_bins(pd.Series(pd.to_datetime(['2024-01-01', '2024-03-01'])), bins=2)
+
+    assert list(counts) == [1, 1]
+    assert isinstance(x[0], pd.Timestamp)
@@ -0,0 +1,190 @@
+"""
+Content-addressed upload storage
+
+Uploads are hashed while they are streamed to disk and stored under their
+SHA-256 digest (uploads/<2 hex>/<digest><ext>), so two users uploading
+'data.csv' no longer overwrite each other, and an identical re-upload
+reuses the stored file (and its cached extraction) instead of writing a
+second copy. The folder is kept under UPLOAD_QUOTA_MB by evicting the least
+recently used files; a file counts as used when it is uploaded again or
+extracted. Partial uploads in the incoming folder count towards the quota
+but are never evicted.
+"""
+import hashlib
+import os
+import threading
+import time
+import uuid
+from werkzeug.utils import secure_filename
+from config import config
+
+CHUNK_SIZE = 1024 * 1024
+
+# Partial uploads; ignored by eviction
+INCOMING_DIR = '.incoming'
+
+# Partial files older than this are left over from crashed requests or abandoned uploads
+STALE_INCOMING_SECONDS = 24 * 3600
+
+class UploadStore:
+    """Deduplicating upload folder with an LRU disk quota"""
+
+    def __init__(self, root=None, quota_bytes=None):
+        self.root = root or config.UPLOAD_FOLDER
+        self.quota_bytes = quota_bytes if quota_bytes is not None else config.UPLOAD_QUOTA_MB * 1024 * 1024
+        self._lock = threading.Lock()
+
+    def save(self, file):
+        """
+        Store an uploaded file (werkzeug FileStorage)
+
+        Returns:
+            Dict with 'filepath' (where it is stored), 'filename' (sanitized
+            original name), 'digest', 'size' and 'deduplicated' (True if the
+            same content was already stored)
+        """
+        filename = secure_filename(file.filename)
+        return self.save_stream(file.stream, filename)
+
+    def save_stream(self, stream, filename):
+        """Store the contents of a readable binary stream under their digest"""
+        incoming = self.incoming_path()
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            with open(incoming, 'wb') as f:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            return self.commit(incoming, hasher.hexdigest(), size, filename)
+        finally:
+            if os.path.exists(incoming):
+                os.remove(incoming)
+
+    def commit(self, incoming, digest, size, filename):
+        """
+        Move a fully written file into the store under its digest
+
+        The incoming file is consumed (moved, or deleted when the content is
+        already stored).
+        """
+        filepath = self.path_for(digest, os.path.splitext(filename)[1])
+        deduplicated = os.path.exists(filepath)
+        if deduplicated:
+            os.remove(incoming)
+            self.touch(filepath)
+        else:
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            os.replace(incoming, filepath)
+            self.enforce_quota(keep=filepath)
+
+        return {
+            'filepath': filepath,
+            'filename': filename,
+            'digest': digest,
+            'size': size,
+            'deduplicated': deduplicated
+        }
+
+    def incoming_dir(self):
+        """Folder for partial uploads, on the same filesystem as the store"""
+        directory = os.path.join(self.root, INCOMING_DIR)
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def incoming_path(self):
+        """Fresh path for a partial upload"""
+        return os.path.join(self.incoming_dir(), uuid.uuid4().hex)
+
+    def path_for(self, digest, extension):
+        return os.path.join(self.root, digest[:2], f"{digest}{extension.lower()}")
+
+    def digest_of(self, filepath):
+        """The digest a stored file is named by, or None for files outside the store"""
+        name, _ = os.path.splitext(os.path.basename(filepath or ''))
+        directory = os.path.dirname(os.path.abspath(filepath or ''))
+        if len(name) != 64 or os.path.basename(directory) != name[:2]:
+            return None
+        if os.path.dirname(directory) != os.path.abspath(self.root):
+            return None
+        return name
+
+    def touch(self, filepath):
+        """Mark a stored file as recently used; files outside the store are left alone"""
+        if self.digest_of(filepath) is None:
+            return
+        try:
+            os.utime(filepath)
+        except OSError:
+            pass
+
+    def enforce_quota(self, keep=None):
+        """Delete least recently used files until the store fits its quota"""
+        if not self.quota_bytes:
+            return
+
+        with self._lock:
+            files, stored, incoming = self._scan()
+            total = stored + incoming
+            if total <= self.quota_bytes:
+                return
+            for _, size, path in sorted(files):
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    os.rmdir(os.path.dirname(path))
+                except FileNotFoundError:
+                    # Evicted by another worker
+                    pass
+                except OSError:
+                    # Other files share the digest prefix directory
+                    pass
+                total -= size
+                if total <= self.quota_bytes:
+                    break
+
+    def stats(self):
+        files, stored, incoming = self._scan()
+        return {'files': len(files), 'bytes': stored, 'incoming_bytes': incoming, 'quota_bytes': self.quota_bytes}
+
+    def _scan(self):
+        """Stored files as (mtime, size, path), their total size, and the size of partial uploads"""
+        files, total, incoming = [], 0, 0
+        now = time.time()
+        for directory, subdirectories, names in os.walk(self.root):
+            if os.path.basename(directory) == INCOMING_DIR:
+                incoming += self._remove_stale(directory, names, now)
+                subdirectories[:] = []
+                continue
+            subdirectories[:] = [name for name in subdirectories if len(name) == 2 or name == INCOMING_DIR]
+            if directory == self.root:
+                # Files from before content addressing are left alone
+                continue
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return files, total, incoming
+
+    def _remove_stale(self, directory, names, now):
+        """Delete stale partial files; returns the size of the ones kept"""
+        kept = 0
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+                if now - stat.st_mtime > STALE_INCOMING_SECONDS:
+                    os.remove(path)
+                else:
+                    kept += stat.st_size
+            except FileNotFoundError:
+                pass
+        return kept
+
+upload_store = UploadStore()
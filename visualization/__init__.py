@@ -1,6 +1,18 @@
 # Visualization Package
-from .templates import TEMPLATES, get_template_config, get_all_templates
-from .chart_generator import ChartGenerator
-from .template_manager import TemplateManager
+# Exports are imported on first access (PEP 562), so importing the package
+# does not load plotly and pandas up front
+from lazy_exports import lazy_exports
 
-__all__ = ['TEMPLATES', 'get_template_config', 'get_all_templates', 'ChartGenerator', 'TemplateManager']
+_EXPORTS = {
+    'TEMPLATES': '.templates',
+    'get_template_config': '.templates',
+    'get_all_templates': '.templates',
+    'compile_theme': '.theming',
+    'get_theme_patch': '.theming',
+    'ChartGenerator': '.chart_generator',
+    'TemplateManager': '.template_manager'
+}
+
+__all__ = ['TEMPLATES', 'get_template_config', 'get_all_templates', 'compile_theme', 'get_theme_patch', 'ChartGenerator', 'TemplateManager']
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
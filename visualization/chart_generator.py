@@ -1,15 +1,36 @@
 import plotly.graph_objects as go
-import plotly.express as px
+import plotly.io as pio
 import pandas as pd
+import numpy as np
+from functools import lru_cache
 from .templates import get_template_config
+from .theming import compile_theme
+from .downsampling import apply_point_budget
+from .render_cache import cached_render, figure_digest
+from .encoding import encode_typed_arrays
+from .figure_builder import validate_figure_structure, merge_layout, resolve_layout_template
+from .statistics import histogram_bins, box_statistics, grouped_box_statistics
+from config import config
+
+@lru_cache(maxsize=1)
+def get_default_layout_template():
+    """Plotly's default layout template as a plain dict (shared by every figure)"""
+    return pio.templates[pio.templates.default].to_plotly_json()
 
 class ChartGenerator:
     """Generate charts using Plotly"""
     
-    def __init__(self, template_name):
+    def __init__(self, template_name, output_format=None):
+        self.template_name = template_name
         self.template = get_template_config(template_name)
         self.colors = self.template['colors']
+        self.theme_layout = compile_theme(template_name)['layout']
+        self.output_format = output_format or config.CHART_OUTPUT_FORMAT
+        
+        if self.output_format not in config.CHART_OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported chart output format: {self.output_format}")
     
+    @cached_render
     def create_bar_chart(self, data, x_column, y_column, title, description):
         """Create a bar chart"""
         try:
@@ -18,19 +39,20 @@ class ChartGenerator:
             # Handle multiple y columns (comma-separated)
             if ',' in y_column:
                 y_columns = [col.strip() for col in y_column.split(',')]
+                x_values = df[x_column].to_numpy()
                 
-                # Create grouped bar chart
-                fig = go.Figure()
-                for i, col in enumerate(y_columns):
-                    if col in df.columns:
-                        fig.add_trace(go.Bar(
-                            name=col,
-                            x=df[x_column],
-                            y=df[col],
-                            marker_color=self.colors[i % len(self.colors)],
-                            text=df[col],
-                            textposition='auto',
-                        ))
+                # Create grouped bar chart in one pass (x is shared by every series)
+                fig = go.Figure(data=[
+                    go.Bar(
+                        name=col,
+                        x=x_values,
+                        y=df[col].to_numpy(),
+                        marker_color=self.colors[i % len(self.colors)],
+                        text=df[col].to_numpy(),
+                        textposition='auto',
+                    )
+                    for i, col in enumerate(y_columns) if col in df.columns
+                ])
                 
                 fig.update_layout(barmode='group')
                 yaxis_title = ' / '.join(y_columns)
@@ -48,26 +70,19 @@ class ChartGenerator:
                 yaxis_title = y_column
             
             fig.update_layout(
+                self.theme_layout,
                 title=title,
                 xaxis_title=x_column,
                 yaxis_title=yaxis_title,
-                plot_bgcolor=self.template['chart_style']['plot_bgcolor'],
-                paper_bgcolor=self.template['chart_style']['paper_bgcolor'],
-                font=dict(family=self.template['font_family'], color=self.template['text_color']),
-                xaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
-                yaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
                 height=400
             )
             
-            return {
-                'type': 'bar',
-                'html': fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart_{hash(title)}"),
-                'description': description
-            }
+            return self._render(fig, 'bar', title, description)
         except Exception as e:
             return self._error_chart(str(e))
     
     
+    @cached_render
     def create_line_chart(self, data, x_column, y_column, title, description):
         """Create a line chart"""
         try:
@@ -76,19 +91,20 @@ class ChartGenerator:
             # Handle multiple y columns (comma-separated)
             if ',' in y_column:
                 y_columns = [col.strip() for col in y_column.split(',')]
+                x_values = df[x_column].to_numpy()
                 
-                # Create multi-line chart
-                fig = go.Figure()
-                for i, col in enumerate(y_columns):
-                    if col in df.columns:
-                        fig.add_trace(go.Scatter(
-                            name=col,
-                            x=df[x_column],
-                            y=df[col],
-                            mode='lines+markers',
-                            line=dict(color=self.colors[i % len(self.colors)], width=3),
-                            marker=dict(size=8)
-                        ))
+                # Create multi-line chart in one pass (x is shared by every series)
+                fig = go.Figure(data=[
+                    go.Scatter(
+                        name=col,
+                        x=x_values,
+                        y=df[col].to_numpy(),
+                        mode='lines+markers',
+                        line=dict(color=self.colors[i % len(self.colors)], width=3),
+                        marker=dict(size=8)
+                    )
+                    for i, col in enumerate(y_columns) if col in df.columns
+                ])
                 
                 yaxis_title = ' / '.join(y_columns)
             else:
@@ -105,25 +121,18 @@ class ChartGenerator:
                 yaxis_title = y_column
             
             fig.update_layout(
+                self.theme_layout,
                 title=title,
                 xaxis_title=x_column,
                 yaxis_title=yaxis_title,
-                plot_bgcolor=self.template['chart_style']['plot_bgcolor'],
-                paper_bgcolor=self.template['chart_style']['paper_bgcolor'],
-                font=dict(family=self.template['font_family'], color=self.template['text_color']),
-                xaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
-                yaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
                 height=400
             )
             
-            return {
-                'type': 'line',
-                'html': fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart_{hash(title)}"),
-                'description': description
-            }
+            return self._render(fig, 'line', title, description)
         except Exception as e:
             return self._error_chart(str(e))
     
+    @cached_render
     def create_pie_chart(self, data, labels_column, values_column, title, description):
         """Create a pie chart"""
         try:
@@ -140,20 +149,16 @@ class ChartGenerator:
             ])
             
             fig.update_layout(
+                self.theme_layout,
                 title=title,
-                paper_bgcolor=self.template['chart_style']['paper_bgcolor'],
-                font=dict(family=self.template['font_family'], color=self.template['text_color']),
                 height=400
             )
             
-            return {
-                'type': 'pie',
-                'html': fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart_{hash(title)}"),
-                'description': description
-            }
+            return self._render(fig, 'pie', title, description)
         except Exception as e:
             return self._error_chart(str(e))
     
+    @cached_render
     def create_scatter_chart(self, data, x_column, y_column, title, description):
         """Create a scatter plot"""
         try:
@@ -174,25 +179,18 @@ class ChartGenerator:
             ])
             
             fig.update_layout(
+                self.theme_layout,
                 title=title,
                 xaxis_title=x_column,
                 yaxis_title=y_column,
-                plot_bgcolor=self.template['chart_style']['plot_bgcolor'],
-                paper_bgcolor=self.template['chart_style']['paper_bgcolor'],
-                font=dict(family=self.template['font_family'], color=self.template['text_color']),
-                xaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
-                yaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
                 height=400
             )
             
-            return {
-                'type': 'scatter',
-                'html': fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart_{hash(title)}"),
-                'description': description
-            }
+            return self._render(fig, 'scatter', title, description)
         except Exception as e:
             return self._error_chart(str(e))
     
+    @cached_render
     def create_heatmap(self, data, title, description):
         """Create a heatmap"""
         try:
@@ -209,20 +207,16 @@ class ChartGenerator:
             ))
             
             fig.update_layout(
+                self.theme_layout,
                 title=title,
-                paper_bgcolor=self.template['chart_style']['paper_bgcolor'],
-                font=dict(family=self.template['font_family'], color=self.template['text_color']),
                 height=400
             )
             
-            return {
-                'type': 'heatmap',
-                'html': fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart_{hash(title)}"),
-                'description': description
-            }
+            return self._render(fig, 'heatmap', title, description)
         except Exception as e:
             return self._error_chart(str(e))
     
+    @cached_render
     def create_bubble_chart(self, data, x_column, y_column, size_column, title, description, color_column=None):
         """Create a bubble chart with size dimension"""
         try:
@@ -251,104 +245,118 @@ class ChartGenerator:
             fig = go.Figure(data=[scatter_data])
             
             fig.update_layout(
+                self.theme_layout,
                 title=title,
                 xaxis_title=x_column,
                 yaxis_title=y_column,
-                plot_bgcolor=self.template['chart_style']['plot_bgcolor'],
-                paper_bgcolor=self.template['chart_style']['paper_bgcolor'],
-                font=dict(family=self.template['font_family'], color=self.template['text_color']),
-                xaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
-                yaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
                 height=400
             )
             
-            return {
-                'type': 'bubble',
-                'html': fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart_{hash(title)}"),
-                'description': description
-            }
+            return self._render(fig, 'bubble', title, description)
         except Exception as e:
             return self._error_chart(str(e))
     
+    @cached_render
     def create_histogram(self, data, x_column, title, description):
-        """Create a histogram for distribution analysis"""
+        """Create a histogram for distribution analysis (binned server-side)"""
         try:
             df = pd.DataFrame(data)
+            x, widths, counts = histogram_bins(df[x_column], bins=20)
             
             fig = go.Figure(data=[
-                go.Histogram(
-                    x=df[x_column],
+                go.Bar(
+                    x=x,
+                    y=counts,
+                    width=widths,
                     marker_color=self.colors[0],
                     opacity=0.8,
-                    nbinsx=20
+                    name=x_column
                 )
             ])
             
             fig.update_layout(
+                self.theme_layout,
                 title=title,
                 xaxis_title=x_column,
                 yaxis_title='Frequency',
-                plot_bgcolor=self.template['chart_style']['plot_bgcolor'],
-                paper_bgcolor=self.template['chart_style']['paper_bgcolor'],
-                font=dict(family=self.template['font_family'], color=self.template['text_color']),
-                xaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
-                yaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
+                # Numeric and date bins touch; category bars keep their gaps
+                bargap=0 if widths is not None else None,
                 height=400
             )
             
-            return {
-                'type': 'histogram',
-                'html': fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart_{hash(title)}"),
-                'description': description
-            }
+            return self._render(fig, 'histogram', title, description)
         except Exception as e:
             return self._error_chart(str(e))
     
+    @cached_render
     def create_box_plot(self, data, y_column, title, description, x_column=None):
-        """Create a box plot for statistical distribution"""
+        """Create a box plot for statistical distribution (quartiles computed server-side)"""
         try:
             df = pd.DataFrame(data)
             
             if x_column and x_column in df.columns:
-                # Grouped box plot
-                fig = go.Figure()
-                for category in df[x_column].unique():
-                    category_data = df[df[x_column] == category][y_column]
-                    fig.add_trace(go.Box(
-                        y=category_data,
-                        name=str(category),
-                        marker_color=self.colors[len(fig.data) % len(self.colors)]
-                    ))
+                # Grouped box plot: one partition pass over the rows for all categories
+                groups = grouped_box_statistics(df[x_column], df[y_column])
             else:
                 # Single box plot
-                fig = go.Figure(data=[
-                    go.Box(
-                        y=df[y_column],
-                        marker_color=self.colors[0],
-                        name=y_column
-                    )
-                ])
+                stats = box_statistics(df[y_column])
+                groups = [(y_column, stats)] if stats else []
+            
+            traces = self._box_traces(groups)
+            
+            fig = go.Figure(data=traces)
             
             fig.update_layout(
+                self.theme_layout,
                 title=title,
                 yaxis_title=y_column,
                 xaxis_title=x_column if x_column else '',
-                plot_bgcolor=self.template['chart_style']['plot_bgcolor'],
-                paper_bgcolor=self.template['chart_style']['paper_bgcolor'],
-                font=dict(family=self.template['font_family'], color=self.template['text_color']),
-                xaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
-                yaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
+                showlegend=False,
                 height=400
             )
             
-            return {
-                'type': 'box',
-                'html': fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart_{hash(title)}"),
-                'description': description
-            }
+            return self._render(fig, 'box', title, description)
         except Exception as e:
             return self._error_chart(str(e))
     
+    def _box_traces(self, groups):
+        """Precomputed box traces plus one marker trace holding every box's sampled outliers"""
+        traces = []
+        outlier_x, outlier_y, outlier_colors = [], [], []
+        
+        for i, (key, stats) in enumerate(groups):
+            name = str(key)
+            color = self.colors[i % len(self.colors)]
+            
+            traces.append(go.Box(
+                name=name,
+                x=[name],
+                q1=[stats['q1']],
+                median=[stats['median']],
+                q3=[stats['q3']],
+                mean=[stats['mean']],
+                lowerfence=[stats['lowerfence']],
+                upperfence=[stats['upperfence']],
+                marker_color=color
+            ))
+            
+            outlier_x.extend([name] * len(stats['outliers']))
+            outlier_y.append(stats['outliers'])
+            outlier_colors.extend([color] * len(stats['outliers']))
+        
+        if outlier_x:
+            traces.append(go.Scatter(
+                name='Outliers',
+                x=outlier_x,
+                y=np.concatenate(outlier_y),
+                mode='markers',
+                marker=dict(color=outlier_colors, size=5, opacity=0.6),
+                hovertemplate='%{x}: %{y}<extra>outlier</extra>'
+            ))
+        
+        return traces
+    
+    @cached_render
     def create_sunburst(self, data, labels_column, values_column, title, description, parents_column=None):
         """Create a sunburst chart for hierarchical data"""
         try:
@@ -374,20 +382,16 @@ class ChartGenerator:
             ))
             
             fig.update_layout(
+                self.theme_layout,
                 title=title,
-                paper_bgcolor=self.template['chart_style']['paper_bgcolor'],
-                font=dict(family=self.template['font_family'], color=self.template['text_color']),
                 height=400
             )
             
-            return {
-                'type': 'sunburst',
-                'html': fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart_{hash(title)}"),
-                'description': description
-            }
+            return self._render(fig, 'sunburst', title, description)
         except Exception as e:
             return self._error_chart(str(e))
     
+    @cached_render
     def create_funnel(self, data, x_column, y_column, title, description):
         """Create a funnel chart for conversion/pipeline visualization"""
         try:
@@ -403,20 +407,16 @@ class ChartGenerator:
             ))
             
             fig.update_layout(
+                self.theme_layout,
                 title=title,
-                paper_bgcolor=self.template['chart_style']['paper_bgcolor'],
-                font=dict(family=self.template['font_family'], color=self.template['text_color']),
                 height=400
             )
             
-            return {
-                'type': 'funnel',
-                'html': fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart_{hash(title)}"),
-                'description': description
-            }
+            return self._render(fig, 'funnel', title, description)
         except Exception as e:
             return self._error_chart(str(e))
     
+    @cached_render
     def create_waterfall(self, data, x_column, y_column, title, description):
         """Create a waterfall chart for cumulative effect visualization"""
         try:
@@ -434,25 +434,18 @@ class ChartGenerator:
             ))
             
             fig.update_layout(
+                self.theme_layout,
                 title=title,
                 xaxis_title=x_column,
                 yaxis_title=y_column,
-                plot_bgcolor=self.template['chart_style']['plot_bgcolor'],
-                paper_bgcolor=self.template['chart_style']['paper_bgcolor'],
-                font=dict(family=self.template['font_family'], color=self.template['text_color']),
-                xaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
-                yaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
                 height=400
             )
             
-            return {
-                'type': 'waterfall',
-                'html': fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart_{hash(title)}"),
-                'description': description
-            }
+            return self._render(fig, 'waterfall', title, description)
         except Exception as e:
             return self._error_chart(str(e))
     
+    @cached_render
     def create_chart_from_json(self, chart_json):
         """
         Create a chart directly from Plotly JSON specification
@@ -462,35 +455,67 @@ class ChartGenerator:
         """
         try:
             figure_data = chart_json.get('figure', {})
-            data = figure_data.get('data', [])
-            layout = figure_data.get('layout', {})
-            
-            # Create figure
-            fig = go.Figure(data=data, layout=layout)
-            
-            # Apply template styling overrides to ensure consistency
-            # But respect specific layout choices from AI
-            fig.update_layout(
-                plot_bgcolor=self.template['chart_style']['plot_bgcolor'],
-                paper_bgcolor=self.template['chart_style']['paper_bgcolor'],
-                font=dict(family=self.template['font_family'], color=self.template['text_color']),
-                xaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
-                yaxis=dict(gridcolor=self.template['chart_style']['gridcolor']),
-                height=450  # Slightly taller for complex charts
-            )
-            
             title = chart_json.get('title', 'Chart')
             description = chart_json.get('description', '')
             chart_type = chart_json.get('chart_type', 'custom')
             
+            # Template styling overrides ensure consistency but respect other layout choices from AI
+            overrides = dict(self.theme_layout, height=450)  # Slightly taller for complex charts
+            
+            if config.FULL_FIGURE_VALIDATION:
+                # Debug mode: run Plotly's property validators over the whole spec
+                fig = go.Figure(data=figure_data.get('data', []), layout=figure_data.get('layout', {}))
+                fig.update_layout(overrides)
+                return self._render(fig, chart_type, title, description)
+            
+            figure = validate_figure_structure(figure_data)
+            figure['layout'] = merge_layout(resolve_layout_template(figure['layout']), overrides)
+            
+            return self._render_figure(figure, chart_type, title, description)
+        except Exception as e:
+            return self._error_chart(f"Error rendering AI chart: {str(e)}")
+
+    def _render(self, fig, chart_type, title, description):
+        """Serialize a go.Figure built by the create_* methods"""
+        figure = fig.to_plotly_json()
+        
+        # The default layout template is sent once per response instead of per chart
+        if figure['layout'].get('template') == get_default_layout_template():
+            del figure['layout']['template']
+        
+        return self._render_figure(figure, chart_type, title, description)
+    
+    def _render_figure(self, figure, chart_type, title, description):
+        """Serialize a figure dict as compact figure JSON or as an HTML fragment"""
+        figure = apply_point_budget(figure)
+        
+        # Content-addressed id: stable across workers and restarts, distinct for charts sharing a title
+        chart_id = f"chart_{figure_digest(figure, self.template_name, self.output_format)[:16]}"
+        
+        if self.output_format == 'json':
+            if config.TYPED_ARRAYS:
+                # Large numeric arrays travel as base64 typed arrays instead of number lists
+                figure = encode_typed_arrays(figure)
+            
             return {
                 'type': chart_type,
-                'html': fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart_{hash(title)}"),
+                'id': chart_id,
+                'title': title,
+                'figure': figure,
                 'description': description
             }
-        except Exception as e:
-            return self._error_chart(f"Error rendering AI chart: {str(e)}")
-
+        
+        # Standalone HTML fragments carry the default template themselves
+        if 'template' not in figure['layout']:
+            figure = dict(figure, layout=dict(figure['layout'], template=get_default_layout_template()))
+        
+        return {
+            'type': chart_type,
+            'id': chart_id,
+            'html': pio.to_html(figure, full_html=False, include_plotlyjs=False, div_id=chart_id, validate=False),
+            'description': description
+        }
+    
     def _error_chart(self, error_message):
         """Return an error placeholder"""
         return {
@@ -0,0 +1,189 @@
+"""
+Point budget for figures before serialization
+
+Large line series are reduced with LTTB (Largest-Triangle-Three-Buckets),
+large scatter/bubble series with 2-D grid binning (one representative point
+per occupied cell), and traces that stay large are promoted to WebGL
+('scattergl'). Reduced figures get a visible annotation.
+"""
+import numpy as np
+import pandas as pd
+from config import config
+
+SCATTER_TYPES = ('scatter', 'scattergl')
+
+# Per-point attributes that must be subset together with x/y
+POINT_ATTRIBUTES = ('x', 'y', 'text', 'hovertext', 'customdata', 'ids')
+MARKER_POINT_ATTRIBUTES = ('size', 'color', 'symbol', 'opacity')
+
+def lttb_indices(x, y, threshold):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets
+
+    Args:
+        x: Numeric x values (sorted along the series)
+        y: Numeric y values
+        threshold: Number of points to keep (>= 3)
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.nan_to_num(x)
+    y = np.nan_to_num(y)
+
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket (or the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+
+    return indices
+
+def grid_sample_indices(x, y, max_points):
+    """
+    Indices of one representative point per occupied cell of a 2-D grid
+    sized so that at most max_points cells exist
+    """
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+
+    bins = max(int(np.sqrt(max_points)), 1)
+    finite = np.isfinite(x) & np.isfinite(y)
+
+    cells = np.full(n, -1, dtype=np.int64)
+    cells[finite] = _bin(x[finite], bins) * bins + _bin(y[finite], bins)
+
+    _, first_index = np.unique(cells[finite], return_index=True)
+    return np.sort(np.flatnonzero(finite)[first_index])
+
+def apply_point_budget(figure, max_points=None, webgl_threshold=None):
+    """
+    Reduce oversized scatter-type traces in a figure dict in place
+
+    Returns:
+        The figure dict (annotated if any trace was reduced)
+    """
+    max_points = max_points or config.POINT_BUDGET_PER_TRACE
+    webgl_threshold = webgl_threshold or config.WEBGL_POINT_THRESHOLD
+
+    shown_total = 0
+    original_total = 0
+
+    for trace in figure.get('data', []):
+        if trace.get('type', 'scatter') not in SCATTER_TYPES:
+            continue
+
+        n = _point_count(trace)
+        if n > max_points:
+            if _is_line_trace(trace, n):
+                indices = lttb_indices(_as_numeric_x(trace.get('x'), n), _as_numeric(trace['y']), max_points)
+            else:
+                indices = grid_sample_indices(_as_numeric_x(trace.get('x'), n), _as_numeric(trace['y']), max_points)
+
+            _take(trace, indices, n)
+            shown_total += len(indices)
+            original_total += n
+            n = len(indices)
+
+        if n > webgl_threshold and _supports_webgl(trace):
+            trace['type'] = 'scattergl'
+
+    if original_total:
+        annotations = list(figure.setdefault('layout', {}).get('annotations', []))
+        annotations.append({
+            'text': f"Downsampled: showing {shown_total:,} of {original_total:,} points",
+            'xref': 'paper',
+            'yref': 'paper',
+            'x': 1,
+            'y': -0.15,
+            'xanchor': 'right',
+            'yanchor': 'top',
+            'showarrow': False,
+            'font': {'size': 10}
+        })
+        figure['layout']['annotations'] = annotations
+
+    return figure
+
+def _bin(values, bins):
+    low, high = values.min(), values.max()
+    if high == low:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.minimum(((values - low) / (high - low) * bins).astype(np.int64), bins - 1)
+
+def _point_count(trace):
+    y = trace.get('y')
+    return len(y) if y is not None and not isinstance(y, (str, dict)) else 0
+
+def _is_line_trace(trace, n):
+    # Plotly defaults to 'lines' for scatter traces with more than 20 points
+    mode = trace.get('mode', 'lines' if n > 20 else 'lines+markers')
+    return 'lines' in mode
+
+def _supports_webgl(trace):
+    # scattergl lacks spline lines and most fill modes
+    line = trace.get('line') or {}
+    return line.get('shape') not in ('spline', 'hvh', 'vhv') and trace.get('fill') in (None, 'none', 'tozeroy', 'tonexty')
+
+def _as_numeric(values):
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+
+def _as_numeric_x(values, n):
+    """Numeric positions for x: numbers, dates (as epoch ns) or the point index"""
+    if values is None or isinstance(values, (str, dict)) or len(values) != n:
+        return np.arange(n, dtype=float)
+
+    array = np.asarray(values)
+    if array.dtype.kind in 'iuf':
+        return array.astype(float)
+    if array.dtype.kind == 'M':
+        return array.astype('datetime64[ns]').astype(np.int64).astype(float)
+
+    try:
+        # ISO 8601 only: parses vectorized and fails fast on category labels
+        return pd.to_datetime(pd.Series(values), format='ISO8601').to_numpy().astype('datetime64[ns]').astype(np.int64).astype(float)
+    except (ValueError, TypeError):
+        return np.arange(n, dtype=float)
+
+def _take(trace, indices, n):
+    """Subset every per-point attribute of a trace"""
+    for key in POINT_ATTRIBUTES:
+        trace[key] = _take_values(trace.get(key), indices, n)
+        if trace[key] is None:
+            del trace[key]
+
+    marker = trace.get('marker')
+    if isinstance(marker, dict):
+        for key in MARKER_POINT_ATTRIBUTES:
+            if key in marker:
+                marker[key] = _take_values(marker[key], indices, n)
+
+def _take_values(values, indices, n):
+    if values is None or isinstance(values, (str, dict)):
+        return values
+    if not hasattr(values, '__len__') or len(values) != n:
+        return values
+    if isinstance(values, np.ndarray):
+        return values[indices]
+    return [values[i] for i in indices]
@@ -0,0 +1,107 @@
+"""
+Binary typed-array encoding for figure JSON
+
+Large numeric trace arrays are emitted in Plotly.js's typed-array form
+({'dtype': 'f8', 'bdata': <base64>, 'shape': 'rows,cols'}) straight from
+the NumPy buffer, instead of as JSON number lists. Requires Plotly.js 2.28+.
+"""
+import base64
+import numpy as np
+from config import config
+
+# Trace attributes that hold per-point numeric data
+TYPED_ARRAY_KEYS = ('x', 'y', 'z', 'values', 'lat', 'lon', 'open', 'high', 'low', 'close')
+
+# NumPy dtypes Plotly.js can decode (little-endian)
+PLOTLY_DTYPES = {
+    'f8': '<f8', 'f4': '<f4',
+    'i4': '<i4', 'u4': '<u4',
+    'i2': '<i2', 'u2': '<u2',
+    'i1': 'i1', 'u1': 'u1'
+}
+
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+def encode_typed_arrays(figure, min_length=None):
+    """
+    Return a copy of a figure dict with large numeric arrays base64-encoded
+
+    Traces are copied, never modified, so cached figures stay intact.
+    """
+    min_length = min_length or config.TYPED_ARRAY_MIN_LENGTH
+
+    traces = []
+    for trace in figure.get('data', []):
+        encoded = None
+        for key in TYPED_ARRAY_KEYS:
+            spec = typed_array_spec(trace.get(key), min_length)
+            if spec is not None:
+                encoded = encoded or dict(trace)
+                encoded[key] = spec
+        traces.append(encoded or trace)
+
+    return dict(figure, data=traces)
+
+def decode_typed_arrays(figure):
+    """
+    Return a copy of a figure dict with typed-array specs turned back into NumPy
+    arrays, for renderers that predate typed-array support (e.g. Kaleido)
+    """
+    traces = []
+    for trace in figure.get('data', []):
+        decoded = None
+        for key in TYPED_ARRAY_KEYS:
+            value = trace.get(key)
+            if isinstance(value, dict) and 'bdata' in value:
+                decoded = decoded or dict(trace)
+                decoded[key] = _decode_spec(value)
+        traces.append(decoded or trace)
+
+    return dict(figure, data=traces)
+
+def typed_array_spec(value, min_length):
+    """Typed-array spec for a numeric array, or None if it should stay a JSON list"""
+    if isinstance(value, np.ndarray):
+        array = value
+    elif isinstance(value, (list, tuple)) and len(value) >= min_length and _looks_numeric(value):
+        try:
+            array = np.asarray(value)
+        except (ValueError, TypeError):
+            return None
+    else:
+        return None
+
+    if array.size < min_length or array.ndim > 2 or array.dtype.kind not in 'iuf':
+        return None
+
+    dtype = _plotly_dtype(array)
+    data = np.ascontiguousarray(array, dtype=PLOTLY_DTYPES[dtype])
+
+    spec = {'dtype': dtype, 'bdata': base64.b64encode(data.tobytes()).decode('ascii')}
+    if data.ndim == 2:
+        spec['shape'] = f"{data.shape[0]},{data.shape[1]}"
+    return spec
+
+def _decode_spec(spec):
+    array = np.frombuffer(base64.b64decode(spec['bdata']), dtype=PLOTLY_DTYPES[spec['dtype']])
+    if spec.get('shape'):
+        array = array.reshape([int(size) for size in str(spec['shape']).split(',')])
+    return array
+
+def _looks_numeric(values):
+    # Cheap rejection of category labels before converting the whole list
+    first = values[0]
+    if isinstance(first, (list, tuple)):
+        first = first[0] if first else None
+    return isinstance(first, (int, float, np.number)) and not isinstance(first, bool)
+
+def _plotly_dtype(array):
+    kind, size = array.dtype.kind, array.dtype.itemsize
+    if kind == 'f':
+        return 'f4' if size <= 4 else 'f8'
+    if size <= 4:
+        return f"{kind}{size}"
+    # 64-bit integers: narrow to 32 bits when the values fit, else fall back to float64
+    if array.size and INT32_MIN <= array.min() and array.max() <= INT32_MAX:
+        return 'i4'
+    return 'f8'
@@ -0,0 +1,185 @@
+"""
+Size guardrails for AI-emitted figure specs
+
+The model can return arbitrarily large figures. Before rendering, each spec
+is held to a trace limit (extra traces are dropped), a per-trace point limit
+(traces are sampled at an even stride; hierarchical traces are exempt) and
+a serialized byte limit (points are sampled further until the figure fits). Reduced figures get a visible
+annotation; figures that cannot be brought under the byte limit are rejected.
+"""
+import threading
+import numpy as np
+from config import config
+from .downsampling import _take_values
+
+# Per-point trace attributes, subset together when a trace is sampled
+POINT_KEYS = (
+    'x', 'y', 'z', 'text', 'hovertext', 'customdata', 'ids', 'values', 'labels',
+    'parents', 'lat', 'lon', 'open', 'high', 'low', 'close', 'r', 'theta',
+    'a', 'b', 'c', 'base', 'width', 'measure'
+)
+MARKER_POINT_KEYS = ('size', 'color', 'symbol', 'opacity')
+
+# Sampling these would drop parent nodes and orphan their children, so they
+# are never sampled: only the trace and byte limits apply to them
+HIERARCHICAL_TYPES = ('sunburst', 'treemap', 'icicle')
+
+# Attempts at shrinking a figure that is over the byte limit before rejecting it
+MAX_BYTE_PASSES = 4
+
+class FigureBudgetCounters:
+    """Thread-safe counts of how often each figure limit fired"""
+
+    LIMITS = ('traces', 'points', 'bytes', 'rejected')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(('checked',) + self.LIMITS, 0)
+
+    def increment(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+budget_counters = FigureBudgetCounters()
+
+def enforce_chart_budget(chart_json):
+    """
+    Apply the figure budget to an AI chart spec
+
+    Returns:
+        The spec (a copy if its figure was reduced), or None if the figure
+        cannot be brought within the byte limit
+    """
+    figure = chart_json.get('figure')
+    if not isinstance(figure, dict) or not isinstance(figure.get('data'), list):
+        # Malformed specs are reported by the renderer
+        return chart_json
+
+    budgeted = enforce_figure_budget(figure)
+    if budgeted is None:
+        return None
+    return chart_json if budgeted is figure else dict(chart_json, figure=budgeted)
+
+def enforce_figure_budget(figure, max_traces=None, max_points=None, max_bytes=None):
+    """
+    Hold a figure dict to the trace, point and byte limits
+
+    The input is never modified; a reduced copy is returned when a limit fires.
+
+    Returns:
+        The figure, a reduced copy, or None if it exceeds max_bytes even after sampling
+    """
+    max_traces = max_traces or config.FIGURE_MAX_TRACES
+    max_points = max_points or config.FIGURE_MAX_POINTS_PER_TRACE
+    max_bytes = max_bytes or config.FIGURE_MAX_BYTES
+
+    budget_counters.increment('checked')
+    traces = figure['data']
+    notes = []
+
+    if len(traces) > max_traces:
+        budget_counters.increment('traces')
+        notes.append(f"showing {max_traces} of {len(traces)} traces")
+        traces = traces[:max_traces]
+
+    counts = [_point_count(trace) for trace in traces]
+    if max(counts, default=0) > max_points:
+        budget_counters.increment('points')
+        notes.append(f"traces sampled to {max_points:,} points")
+        traces = [_sample_trace(trace, n, max_points) for trace, n in zip(traces, counts)]
+
+    size = _serialized_size(traces)
+    if size > max_bytes:
+        budget_counters.increment('bytes')
+        limit = max(counts, default=0)
+        for _ in range(MAX_BYTE_PASSES):
+            # Points dominate figure size, so shrink the per-trace limit proportionally
+            limit = int(min(limit, max_points) * max_bytes / size * 0.9)
+            if limit < 2:
+                break
+            traces = [_sample_trace(trace, _point_count(trace), limit) for trace in traces]
+            size = _serialized_size(traces)
+            if size <= max_bytes:
+                break
+        if size > max_bytes:
+            budget_counters.increment('rejected')
+            return None
+        notes.append(f"sampled to {limit:,} points per trace to fit {max_bytes // 1024:,} KB")
+
+    if not notes:
+        return figure
+
+    layout = dict(figure.get('layout') or {})
+    layout['annotations'] = list(layout.get('annotations') or []) + [{
+        'text': f"Reduced: {'; '.join(notes)}",
+        'xref': 'paper',
+        'yref': 'paper',
+        'x': 0,
+        'y': -0.15,
+        'xanchor': 'left',
+        'yanchor': 'top',
+        'showarrow': False,
+        'font': {'size': 10}
+    }]
+    return dict(figure, data=traces, layout=layout)
+
+def _point_count(trace):
+    """Largest per-point array length in a trace (cells for 2-D z); 0 if it cannot be sampled"""
+    if not isinstance(trace, dict) or trace.get('type') in HIERARCHICAL_TYPES:
+        return 0
+    count = 0
+    for key in POINT_KEYS:
+        values = trace.get(key)
+        if isinstance(values, (list, tuple, np.ndarray)):
+            n = len(values)
+            if key == 'z' and n and isinstance(values[0], (list, tuple, np.ndarray)):
+                n *= len(values[0])
+            count = max(count, n)
+    return count
+
+def _sample_trace(trace, n, limit):
+    """Copy of a trace with every per-point attribute sampled at an even stride"""
+    if n <= limit or not isinstance(trace, dict) or trace.get('type') in HIERARCHICAL_TYPES:
+        return trace
+
+    z = trace.get('z')
+    if isinstance(z, (list, tuple, np.ndarray)) and len(z) and isinstance(z[0], (list, tuple, np.ndarray)):
+        return _sample_grid(trace, limit)
+
+    indices = np.unique(np.linspace(0, n - 1, limit).round().astype(np.int64))
+    sampled = dict(trace)
+    for key in POINT_KEYS:
+        if key in sampled:
+            sampled[key] = _take_values(sampled[key], indices, n)
+
+    marker = sampled.get('marker')
+    if isinstance(marker, dict):
+        sampled['marker'] = {
+            key: _take_values(value, indices, n) if key in MARKER_POINT_KEYS else value
+            for key, value in marker.items()
+        }
+    return sampled
+
+def _sample_grid(trace, limit):
+    """Stride rows and columns of a 2-D z (heatmap, contour, surface) to fit the cell limit"""
+    z = trace['z']
+    rows, cols = len(z), len(z[0])
+    step = int(np.ceil(np.sqrt(rows * cols / limit)))
+    row_indices = np.arange(0, rows, step)
+    col_indices = np.arange(0, cols, step)
+
+    sampled = dict(trace)
+    sampled['z'] = [_take_values(z[i], col_indices, cols) for i in row_indices]
+    if 'x' in sampled:
+        sampled['x'] = _take_values(sampled['x'], col_indices, cols)
+    if 'y' in sampled:
+        sampled['y'] = _take_values(sampled['y'], row_indices, rows)
+    return sampled
+
+def _serialized_size(traces):
+    from plotly.io.json import to_json_plotly
+    return len(to_json_plotly(traces, engine=config.JSON_ENGINE))
@@ -0,0 +1,89 @@
+"""
+Lightweight figure construction for AI-emitted Plotly specs
+
+Building a go.Figure runs Plotly's property validators over every element
+of every trace, which dominates rendering time for large traces. For specs
+we only pass through to Plotly.js, a structural check and a dict-level
+layout merge are enough; the go.Figure path stays available as a debug
+mode (config.FULL_FIGURE_VALIDATION).
+"""
+
+TRACE_TYPES = frozenset({
+    'bar', 'barpolar', 'box', 'candlestick', 'carpet', 'choropleth',
+    'choroplethmapbox', 'cone', 'contour', 'contourcarpet', 'densitymapbox',
+    'funnel', 'funnelarea', 'heatmap', 'heatmapgl', 'histogram', 'histogram2d',
+    'histogram2dcontour', 'icicle', 'image', 'indicator', 'isosurface',
+    'mesh3d', 'ohlc', 'parcats', 'parcoords', 'pie', 'pointcloud', 'sankey',
+    'scatter', 'scatter3d', 'scattercarpet', 'scattergeo', 'scattergl',
+    'scattermapbox', 'scatterpolar', 'scatterpolargl', 'scattersmith',
+    'scatterternary', 'splom', 'streamtube', 'sunburst', 'surface', 'table',
+    'treemap', 'violin', 'volume', 'waterfall'
+})
+
+def validate_figure_structure(figure_data):
+    """
+    Check the shape of a figure spec and return a copy safe to modify
+
+    Dicts are copied at every level; arrays are shared, since later stages
+    replace them rather than mutate them.
+
+    Raises:
+        ValueError: If the spec is not a Plotly figure structure
+    """
+    if not isinstance(figure_data, dict):
+        raise ValueError("Figure must be an object with 'data' and 'layout'")
+
+    data = figure_data.get('data', [])
+    layout = figure_data.get('layout', {})
+
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        raise ValueError("Figure 'data' must be a list of traces")
+    if not isinstance(layout, dict):
+        raise ValueError("Figure 'layout' must be an object")
+
+    traces = []
+    for i, trace in enumerate(data):
+        if not isinstance(trace, dict):
+            raise ValueError(f"Trace {i} must be an object")
+        trace_type = trace.get('type', 'scatter')
+        if trace_type not in TRACE_TYPES:
+            raise ValueError(f"Trace {i} has unknown type '{trace_type}'")
+        trace = _copy_dicts(trace)
+        trace['type'] = trace_type
+        traces.append(trace)
+
+    return {'data': traces, 'layout': _copy_dicts(layout)}
+
+def merge_layout(layout, overrides):
+    """
+    Deep-merge layout overrides into a layout dict, like go.Figure.update_layout
+
+    Returns:
+        New layout dict; values from overrides win, nested dicts are merged
+    """
+    merged = dict(layout)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_layout(merged[key], value)
+        elif isinstance(value, dict):
+            merged[key] = _copy_dicts(value)
+        else:
+            merged[key] = value
+    return merged
+
+def resolve_layout_template(layout):
+    """Replace a named template (e.g. 'plotly_dark') with its definition, which Plotly.js needs"""
+    template = layout.get('template')
+    if isinstance(template, str):
+        import plotly.io as pio
+        layout['template'] = pio.templates[template].to_plotly_json() if template in pio.templates else None
+        if layout['template'] is None:
+            del layout['template']
+    return layout
+
+def _copy_dicts(value):
+    if isinstance(value, dict):
+        return {key: _copy_dicts(item) for key, item in value.items()}
+    return value
@@ -0,0 +1,221 @@
+"""
+Render AI chart specs concurrently in a bounded process pool
+
+Figure validation and serialization are CPU-bound Python, so charts are
+rendered in separate processes rather than threads. Results keep the order
+of the specs, a failing or slow chart only replaces its own slot with an
+error placeholder, and each chart is bounded by the render timeout. Running
+tasks cannot be cancelled, so a chart that does not stop at the timeout has
+its worker processes killed and the pool is started again.
+"""
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from config import config
+from .render_cache import render_cache, render_key
+
+# How often running charts are checked against the render timeout
+POLL_SECONDS = 0.1
+
+class RenderTimeout(Exception):
+    pass
+
+def _raise_render_timeout(signum, frame):
+    raise RenderTimeout('rendering timed out')
+
+def _render_chart(template_name, output_format, chart_json, timeout=None):
+    """Pool entry point: render one chart spec in a worker process, within timeout seconds"""
+    from .chart_generator import ChartGenerator
+
+    # Tasks run in the worker's main thread, so an alarm can interrupt a slow chart
+    # and free the worker; the parent kills workers that do not return even then
+    if timeout:
+        signal.signal(signal.SIGALRM, _raise_render_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        # Bypass the render cache: the parent process caches results
+        return ChartGenerator.create_chart_from_json.__wrapped__(
+            ChartGenerator(template_name, output_format), chart_json
+        )
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+def _warm_worker(template_name, output_format):
+    """Pool entry point: import the rendering stack and render a tiny chart in a worker"""
+    return _render_chart(template_name, output_format, {
+        'title': 'Warm-up',
+        'figure': {'data': [{'type': 'bar', 'x': ['a', 'b'], 'y': [1, 2]}], 'layout': {}}
+    }).get('type')
+
+class ParallelRenderer:
+    """Bounded process pool shared by every TemplateManager in this process"""
+
+    def __init__(self, max_workers=None, timeout=None, start_method=None):
+        self.max_workers = max_workers or config.RENDER_WORKERS
+        self.timeout = timeout or config.RENDER_TIMEOUT_SECONDS
+        self.start_method = start_method or config.RENDER_POOL_START_METHOD
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def render_all(self, chart_generator, template_name, chart_specs):
+        """
+        Render chart specs, in parallel when more than one is given
+
+        Args:
+            chart_generator: ChartGenerator for the serial path and error placeholders
+            template_name: Template the charts are rendered with
+            chart_specs: List of AI chart specs with a 'figure' key
+
+        Returns:
+            Rendered charts in the same order as chart_specs
+        """
+        if len(chart_specs) <= 1 or self.max_workers <= 1:
+            return [chart_generator.create_chart_from_json(spec) for spec in chart_specs]
+
+        # Cache lookups happen here: a worker process's own cache would be lost
+        output_format = chart_generator.output_format
+        keys = [
+            render_key('create_chart_from_json', template_name, output_format, (spec,))
+            for spec in chart_specs
+        ]
+        cached = [render_cache.get(key) for key in keys]
+
+        try:
+            executor = self._get_executor()
+            futures = [
+                executor.submit(_render_chart, template_name, output_format, spec, self._worker_timeout()) if chart is None else None
+                for spec, chart in zip(chart_specs, cached)
+            ]
+        except (BrokenProcessPool, RuntimeError) as e:
+            print(f"Render pool unavailable, rendering serially: {str(e)}")
+            self._reset_executor()
+            return [chart_generator.create_chart_from_json(spec) for spec in chart_specs]
+
+        # Each chart is bounded on its own, so a slow chart does not eat into the
+        # time of later ones. Workers stop a chart after the timeout themselves;
+        # one still running at twice the timeout did not react to that and is
+        # killed (the margin covers time spent queued behind other requests)
+        kill_after = 2 * self.timeout
+        charts = list(cached)
+        pending = {i: future for i, future in enumerate(futures) if future is not None}
+        started = {}
+        retried = set()
+        while pending:
+            done, _ = wait(list(pending.values()), timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for i, future in list(pending.items()):
+                if future not in done:
+                    if future.running():
+                        started.setdefault(i, now)
+                    continue
+                del pending[i]
+                try:
+                    chart = future.result()
+                    if chart.get('type') != 'error':
+                        render_cache.put(keys[i], chart)
+                    charts[i] = chart
+                except BrokenProcessPool as e:
+                    # The pool was replaced (a chart timed out or a worker crashed): try once more
+                    if i in retried or not self._resubmit(pending, i, template_name, output_format, chart_specs[i]):
+                        charts[i] = chart_generator._error_chart(f"Renderer crashed: {str(e)}")
+                    retried.add(i)
+                    started.pop(i, None)
+                except Exception as e:
+                    charts[i] = chart_generator._error_chart(f"Error rendering AI chart: {str(e)}")
+
+            # The pool marks one call more than it has workers as running; submission
+            # order tells which ones a worker really holds
+            holding = sorted((started[i], i) for i in pending if i in started)[:self.max_workers]
+            timed_out = [i for start, i in holding if now - start > kill_after]
+            if timed_out:
+                for i in timed_out:
+                    title = chart_specs[i].get('title', 'Chart')
+                    print(f"Chart '{title}' did not stop at the {self.timeout}s render timeout; restarting the render pool")
+                    charts[i] = chart_generator._error_chart(f"Rendering '{title}' timed out")
+                    del pending[i]
+                # A running task cannot be cancelled: kill the workers so the
+                # runaway chart does not hold one forever, and start the other
+                # unfinished charts again in the new pool
+                self._terminate_executor()
+                try:
+                    # Start the new workers first, so their start-up does not count against the charts
+                    self.warm(template_name, output_format)
+                except Exception as e:
+                    print(f"Render pool warm-up failed: {str(e)}")
+                for i in list(pending):
+                    started.pop(i, None)
+                    if not self._resubmit(pending, i, template_name, output_format, chart_specs[i]):
+                        charts[i] = chart_generator._error_chart("Render pool unavailable")
+
+        return charts
+
+    def _resubmit(self, pending, i, template_name, output_format, spec):
+        """Submit a chart to the current pool again; False if the pool cannot be started"""
+        for attempt in range(2):
+            try:
+                pending[i] = self._get_executor().submit(
+                    _render_chart, template_name, output_format, spec, self._worker_timeout()
+                )
+                return True
+            except (BrokenProcessPool, RuntimeError) as e:
+                # A crashed pool stays broken: replace it and try once more
+                print(f"Render pool unavailable: {str(e)}")
+                self._reset_executor()
+        pending.pop(i, None)
+        return False
+
+    def _worker_timeout(self):
+        # SIGALRM is Unix-only; elsewhere only the parent's kill applies
+        return self.timeout if hasattr(signal, 'setitimer') else None
+
+    def warm(self, template_name, output_format):
+        """Start the worker processes and load the rendering stack in each"""
+        if self.max_workers <= 1:
+            return
+        executor = self._get_executor()
+        futures = [executor.submit(_warm_worker, template_name, output_format) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result(timeout=self.timeout * 2)
+    
+    def shutdown(self):
+        """Stop the worker processes (they are started again on next use)"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method)
+                )
+            return self._executor
+
+    def _terminate_executor(self):
+        """Drop the pool and kill its worker processes, including ones still rendering"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        terminate_workers = getattr(executor, 'terminate_workers', None)  # Python 3.14+
+        if terminate_workers is not None:
+            terminate_workers()
+            return
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def _reset_executor(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+parallel_renderer = ParallelRenderer()
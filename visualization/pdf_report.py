@@ -0,0 +1,96 @@
+"""
+PDF report assembly
+
+Lays out the analysis summary, insights, key metrics and chart images in
+the same order as the on-screen dashboard.
+"""
+import io
+from datetime import datetime
+from xml.sax.saxutils import escape
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, KeepTogether
+
+MARGIN = 15 * mm
+
+def build_pdf_report(output, visualizations, images, failed=()):
+    """
+    Write a PDF report to a file-like object
+
+    Args:
+        output: Binary file-like object to write to
+        visualizations: Visualizations dict (summary, insights, key_metrics, charts)
+        images: PNG bytes per chart (None for charts without a figure)
+        failed: Indexes of charts whose image could not be rendered; they get
+            a placeholder instead
+    """
+    styles = _styles()
+    doc = SimpleDocTemplate(
+        output, pagesize=A4,
+        leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN,
+        title='AI Data Analysis Report'
+    )
+    story = [
+        Paragraph('AI Data Analysis Report', styles['ReportTitle']),
+        Paragraph(f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles['Meta']),
+        Spacer(1, 8 * mm)
+    ]
+
+    summary = visualizations.get('summary')
+    if summary:
+        story += [Paragraph('Executive Summary', styles['Heading']), Paragraph(escape(str(summary)), styles['Body']), Spacer(1, 6 * mm)]
+
+    insights = visualizations.get('insights') or []
+    if insights:
+        story.append(Paragraph('Key Insights', styles['Heading']))
+        story += [Paragraph(f"&bull; {escape(str(insight))}", styles['Body']) for insight in insights]
+        story.append(Spacer(1, 6 * mm))
+
+    metrics = visualizations.get('key_metrics') or {}
+    if isinstance(metrics, dict) and metrics:
+        story += [Paragraph('Key Metrics', styles['Heading']), _metrics_table(metrics, styles), Spacer(1, 6 * mm)]
+
+    width = doc.width
+    for i, (chart, image) in enumerate(zip(visualizations.get('charts', []), images)):
+        block = []
+        if chart.get('title'):
+            block.append(Paragraph(escape(str(chart['title'])), styles['ChartTitle']))
+        if i in failed:
+            block.append(Paragraph('[This chart could not be rendered for the report.]', styles['Caption']))
+        elif image:
+            reader = Image(io.BytesIO(image))
+            reader.drawWidth, reader.drawHeight = width, width * reader.imageHeight / reader.imageWidth
+            block.append(reader)
+        if chart.get('description'):
+            block.append(Paragraph(escape(str(chart['description'])), styles['Caption']))
+        if block:
+            # Keep each chart with its title and description on one page
+            story += [KeepTogether(block), Spacer(1, 6 * mm)]
+
+    doc.build(story)
+    return output
+
+def _metrics_table(metrics, styles):
+    rows = [[Paragraph(escape(str(name)), styles['Body']), Paragraph(escape(str(value)), styles['Body'])]
+            for name, value in metrics.items()]
+    table = Table(rows, colWidths=['45%', '55%'])
+    table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#DDDDDD')),
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#F5F7FA')),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP')
+    ]))
+    return table
+
+def _styles():
+    base = getSampleStyleSheet()
+    text = colors.HexColor('#2C3E50')
+    return {
+        'ReportTitle': ParagraphStyle('ReportTitle', parent=base['Title'], fontSize=22, textColor=text, alignment=0),
+        'Meta': ParagraphStyle('Meta', parent=base['Normal'], fontSize=10, textColor=colors.HexColor('#646464')),
+        'Heading': ParagraphStyle('Heading', parent=base['Heading2'], fontSize=14, textColor=text),
+        'Body': ParagraphStyle('Body', parent=base['Normal'], fontSize=11, leading=15, textColor=colors.HexColor('#3C3C3C')),
+        'ChartTitle': ParagraphStyle('ChartTitle', parent=base['Heading3'], textColor=text),
+        'Caption': ParagraphStyle('Caption', parent=base['Italic'], fontSize=10, textColor=colors.HexColor('#505050'))
+    }
@@ -0,0 +1,182 @@
+"""
+Rendered-chart cache
+
+Rendered charts are cached under a canonical hash of the chart spec (or the
+create_* arguments), the template and the output format, in an LRU bounded
+by the serialized size of the cached charts. Switching back to a template
+that was already viewed turns every chart render into a lookup.
+
+Entries are stored pickled: every lookup returns an independent copy, so
+callers may change a chart's figure in place (theme patches, sampling, id
+de-duplication) without corrupting the cache.
+
+With a shared cache backend (CACHE_BACKEND=sqlite) the LRU is a first
+tier: misses fall through to the shared cache, and rendered charts are
+written to both, so charts rendered by one worker are served by all.
+"""
+import functools
+import hashlib
+import json
+import pickle
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from config import config
+
+class RenderCache:
+    """Thread-safe LRU of rendered charts bounded by bytes"""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes if max_bytes is not None else config.RENDER_CACHE_MAX_BYTES
+        self._entries = OrderedDict()
+        self._ids = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return a copy of the cached chart, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is not None:
+            return pickle.loads(entry[0])
+
+        shared = _shared_cache()
+        chart = shared.get('render', key) if shared is not None else None
+        with self._lock:
+            if chart is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+        self._put_local(key, chart)
+        return chart
+
+    def get_by_id(self, chart_id):
+        """Return a copy of a cached chart by its content-derived id, or None"""
+        with self._lock:
+            key = self._ids.get(chart_id)
+            entry = self._entries.get(key) if key else None
+        if entry:
+            return pickle.loads(entry[0])
+
+        shared = _shared_cache()
+        key = shared.get('render_id', chart_id) if shared is not None else None
+        return self.get(key) if key else None
+
+    def put(self, key, chart):
+        """Cache a rendered chart unless it alone exceeds the byte budget"""
+        if not self._put_local(key, chart):
+            return
+
+        shared = _shared_cache()
+        if shared is not None:
+            shared.set('render', key, chart)
+            if chart.get('id'):
+                shared.set('render_id', chart['id'], key)
+
+    def _put_local(self, key, chart):
+        data = pickle.dumps(chart, protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(data)
+        if size > self.max_bytes:
+            return False
+
+        chart_id = chart.get('id')
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (data, size, chart_id)
+            if chart_id:
+                self._ids[chart_id] = key
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, evicted_id) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                if self._ids.get(evicted_id) not in self._entries:
+                    self._ids.pop(evicted_id, None)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._ids.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses
+            }
+
+def render_key(method_name, template_name, output_format, args=(), kwargs=None):
+    """Canonical content hash of a render call"""
+    hasher = hashlib.sha256()
+    hasher.update(f"{method_name}|{template_name}|{output_format}|".encode('utf-8'))
+    for value in args:
+        _hash_value(hasher, value)
+    for name in sorted(kwargs or {}):
+        hasher.update(f"|{name}=".encode('utf-8'))
+        _hash_value(hasher, kwargs[name])
+    return hasher.hexdigest()
+
+def figure_digest(figure, *parts):
+    """
+    Stable content hash of a figure dict (plus any extra parts such as the
+    template name). Unlike hash(), it is identical across processes and restarts.
+    """
+    from plotly.io.json import to_json_plotly
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(f"{part}|".encode('utf-8'))
+    hasher.update(to_json_plotly(figure, engine=config.JSON_ENGINE).encode('utf-8'))
+    return hasher.hexdigest()
+
+def cached_render(method):
+    """Serve a ChartGenerator render method from the render cache"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = render_key(method.__name__, self.template_name, self.output_format, args, kwargs)
+        cached = render_cache.get(key)
+        if cached is not None:
+            return cached
+
+        chart = method(self, *args, **kwargs)
+        if chart.get('type') != 'error':
+            render_cache.put(key, chart)
+        return chart
+    return wrapper
+
+def _shared_cache():
+    from caching.cache_factory import get_cache
+    cache = get_cache('render')
+    return cache if cache is not None and cache.shared else None
+
+def _hash_value(hasher, value):
+    hasher.update(b'|')
+    if isinstance(value, pd.DataFrame):
+        hasher.update(json.dumps([str(col) for col in value.columns]).encode('utf-8'))
+        hasher.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray) and value.dtype.kind in 'biuf':
+        hasher.update(f"{value.dtype.str}{value.shape}".encode('utf-8'))
+        hasher.update(np.ascontiguousarray(value).tobytes())
+    else:
+        hasher.update(json.dumps(value, sort_keys=True, separators=(',', ':'), default=_canonical_default).encode('utf-8'))
+
+def _canonical_default(value):
+    if isinstance(value, (np.ndarray, pd.Series, pd.Index)):
+        return np.asarray(value).tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+render_cache = RenderCache()
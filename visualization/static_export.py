@@ -0,0 +1,101 @@
+"""
+Static chart images for server-side reports
+
+Images are rendered by Plotly's Kaleido scope, which keeps one headless
+Chromium process alive between calls: only the first image pays the process
+startup (about a second), later images take tens of milliseconds. Rendered
+images are cached by figure hash and size in a byte-bounded LRU.
+"""
+import threading
+from collections import OrderedDict
+from config import config
+from .encoding import decode_typed_arrays
+from .render_cache import figure_digest
+
+class StaticRenderer:
+    """Render figure dicts to PNG through one warm Kaleido process"""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes if max_bytes is not None else config.IMAGE_CACHE_MAX_BYTES
+        self._images = OrderedDict()
+        self._bytes = 0
+        # The Kaleido process handles one request at a time
+        self._render_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def warm(self):
+        """Start the Kaleido process ahead of the first report"""
+        self._render({'data': [], 'layout': {}}, 100, 100, 1)
+
+    def render_images(self, figures, width=None, height=None, scale=None):
+        """
+        Render a batch of figures to PNG bytes, in order
+
+        Cached images are returned directly; the rest are rendered back to back
+        on the warm process while holding it once for the whole batch. A figure
+        that fails to render gets None, so one bad chart does not sink the batch.
+        """
+        width = width or config.PDF_IMAGE_WIDTH
+        height = height or config.PDF_IMAGE_HEIGHT
+        scale = scale or config.PDF_IMAGE_SCALE
+
+        keys = [figure_digest(figure, 'png', width, height, scale) for figure in figures]
+        images = [self._get(key) for key in keys]
+
+        missing = [i for i, image in enumerate(images) if image is None]
+        if missing:
+            with self._render_lock:
+                for i in missing:
+                    try:
+                        images[i] = self._render(figures[i], width, height, scale)
+                    except Exception as e:
+                        print(f"Chart image render failed: {str(e)}")
+                        self.failures += 1
+                        continue
+                    self._put(keys[i], images[i])
+
+        return images
+
+    def stats(self):
+        with self._cache_lock:
+            return {
+                'entries': len(self._images),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'failures': self.failures
+            }
+
+    def _render(self, figure, width, height, scale):
+        import plotly.io as pio
+        # Kaleido bundles a Plotly.js without typed-array support
+        figure = decode_typed_arrays(figure)
+        return pio.to_image(figure, format='png', width=width, height=height, scale=scale, validate=False)
+
+    def _get(self, key):
+        with self._cache_lock:
+            image = self._images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def _put(self, key, image):
+        if len(image) > self.max_bytes:
+            return
+        with self._cache_lock:
+            if key in self._images:
+                self._bytes -= len(self._images.pop(key))
+            self._images[key] = image
+            self._bytes += len(image)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= len(evicted)
+
+static_renderer = StaticRenderer()
@@ -1,14 +1,17 @@
-from .chart_generator import ChartGenerator
+from .chart_generator import ChartGenerator, get_default_layout_template
 from .templates import get_template_config
+from .parallel_renderer import parallel_renderer
+from .figure_budget import enforce_chart_budget
+from .render_cache import render_cache
 import pandas as pd
 
 class TemplateManager:
     """Manage visualization generation with different templates"""
     
-    def __init__(self, template_name):
+    def __init__(self, template_name, output_format=None):
         self.template_name = template_name
         self.template_config = get_template_config(template_name)
-        self.chart_generator = ChartGenerator(template_name)
+        self.chart_generator = ChartGenerator(template_name, output_format)
     
     def generate_visualizations(self, extracted_data, analysis):
         """
@@ -29,6 +32,10 @@ class TemplateManager:
             'key_metrics': analysis.get('key_metrics', {})
         }
         
+        # JSON figures omit the shared layout template; the client applies it to each chart
+        if self.chart_generator.output_format == 'json':
+            visualizations['layout_template'] = get_default_layout_template()
+        
         # Get data (kept for reference, though AI now handles data transformation)
         if 'dataframe' in extracted_data:
             data = extracted_data['dataframe']
@@ -48,21 +55,24 @@ class TemplateManager:
             print("Warning: Received old format from AI, using fallback")
             recommendations = analysis.get('chart_recommendations', [])
         
+        # Full Plotly JSON specs (new format) are rendered concurrently, in order
+        chart_specs = []
         for rec in recommendations:
-            try:
-                # Check if this is a full Plotly JSON spec (new format)
-                if 'figure' in rec:
-                    chart = self.chart_generator.create_chart_from_json(rec)
-                    visualizations['charts'].append(chart)
-                else:
-                    # Fallback or error for unrecognized format
-                    print(f"Skipping chart '{rec.get('title', 'Unknown')}': missing figure specification")
+            if isinstance(rec, dict) and 'figure' in rec:
+                # Oversized AI figures are reduced before they reach the renderer
+                budgeted = enforce_chart_budget(rec)
+                if budgeted is None:
+                    print(f"Skipping chart '{rec.get('title', 'Unknown')}': figure exceeds the size budget")
                     continue
-            
-            except Exception as e:
-                # Skip charts that fail to generate
-                print(f"Failed to generate chart: {str(e)}")
-                continue
+                chart_specs.append(budgeted)
+            else:
+                # Fallback or error for unrecognized format
+                title = rec.get('title', 'Unknown') if isinstance(rec, dict) else 'Unknown'
+                print(f"Skipping chart '{title}': missing figure specification")
+        
+        visualizations['charts'].extend(
+            parallel_renderer.render_all(self.chart_generator, self.template_name, chart_specs)
+        )
         
         # If no charts were generated, create a default one
         if len(visualizations['charts']) == 0:
@@ -70,8 +80,31 @@ class TemplateManager:
                 self._create_default_chart(data)
             )
         
+        self._dedupe_chart_ids(visualizations['charts'])
+        
         return visualizations
     
+    def _dedupe_chart_ids(self, charts):
+        """
+        Suffix repeated content-derived ids so identical charts get distinct DOM ids
+
+        The suffixed copies are cached under their own id, so GET /charts/<id>
+        serves them too (identical content, so the id stays immutable).
+        """
+        seen = {}
+        for i, chart in enumerate(charts):
+            chart_id = chart.get('id')
+            if not chart_id:
+                continue
+            seen[chart_id] = seen.get(chart_id, 0) + 1
+            if seen[chart_id] > 1:
+                unique_id = f"{chart_id}_{seen[chart_id]}"
+                chart = dict(chart, id=unique_id)
+                if 'html' in chart:
+                    chart['html'] = chart['html'].replace(chart_id, unique_id)
+                charts[i] = chart
+                render_cache.put(f"chart_id:{unique_id}", chart)
+    
     def _create_default_chart(self, data):
         """Create a default visualization if AI recommendations fail"""
         try:
@@ -0,0 +1,73 @@
+"""
+Compiled themes for the visualization templates
+
+Each template in TEMPLATES is compiled once into a plain-dict Plotly layout
+(colors, fonts, grid) plus its palette. Figures are styled from the compiled
+layout, and switching templates on the client only needs the relayout/restyle
+patch between two compiled themes instead of re-rendering every figure.
+"""
+from functools import lru_cache
+from .templates import TEMPLATES, get_template_config
+
+@lru_cache(maxsize=None)
+def compile_theme(template_name):
+    """
+    Compile a template into reusable layout settings
+
+    Returns:
+        Dictionary with:
+        - layout: nested layout properties applied to every figure
+        - relayout: the same properties as flat Plotly.relayout keys
+        - palette: the template's trace colors
+    """
+    template = get_template_config(template_name)
+    style = template['chart_style']
+
+    layout = {
+        'colorway': list(template['colors']),
+        'plot_bgcolor': style['plot_bgcolor'],
+        'paper_bgcolor': style['paper_bgcolor'],
+        'font': {'family': template['font_family'], 'color': template['text_color']},
+        'xaxis': {'gridcolor': style['gridcolor']},
+        'yaxis': {'gridcolor': style['gridcolor']}
+    }
+
+    return {
+        'layout': layout,
+        'relayout': _flatten(layout),
+        'palette': list(template['colors'])
+    }
+
+@lru_cache(maxsize=None)
+def get_theme_patch(from_template, to_template):
+    """
+    Patch that turns a figure styled with one template into another
+
+    Returns:
+        Dictionary with 'relayout' (flat layout updates for every chart) and
+        'palette_map' (upper-cased source color -> target color, applied to
+        trace color attributes on the client)
+    """
+    source = compile_theme(from_template)['palette']
+    target = compile_theme(to_template)['palette']
+
+    palette_map = {
+        color.upper(): target[i % len(target)]
+        for i, color in enumerate(source)
+    }
+
+    return {
+        'template': to_template if to_template in TEMPLATES else 'professional',
+        'relayout': compile_theme(to_template)['relayout'],
+        'palette_map': palette_map
+    }
+
+def _flatten(layout, prefix=''):
+    """Flatten nested layout properties into Plotly.relayout's dotted keys"""
+    flat = {}
+    for key, value in layout.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
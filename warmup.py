@@ -0,0 +1,178 @@
+"""
+Worker warm-up
+
+The first /analyze after a restart pays for lazy initialization: backend
+imports, Plotly's validator classes, pandas' parsers, the render pool's
+worker processes and TLS handshakes with the AI provider. Warm-up runs
+those steps once in a background thread when the worker starts, and
+/health only reports ready once it has finished, so a load balancer routes
+requests to warm workers only.
+"""
+import os
+import tempfile
+import threading
+import time
+from config import config
+
+SAMPLE_ROWS = [
+    {'category': f"Item {i}", 'value': i * 1.5, 'count': i, 'date': f"2024-01-{i + 1:02d}"}
+    for i in range(10)
+]
+
+SAMPLE_SPEC = {
+    'title': 'Warm-up',
+    'chart_type': 'bar',
+    'figure': {
+        'data': [{'type': 'bar', 'x': [row['category'] for row in SAMPLE_ROWS], 'y': [row['value'] for row in SAMPLE_ROWS]}],
+        'layout': {'title': 'Warm-up'}
+    }
+}
+
+def warm_charts():
+    """Render a dummy figure per template and output format (builds Plotly's validators)"""
+    from visualization.templates import TEMPLATES
+    from visualization.chart_generator import ChartGenerator
+
+    for template_name in TEMPLATES:
+        for output_format in config.CHART_OUTPUT_FORMATS:
+            generator = ChartGenerator(template_name, output_format)
+            # Unwrapped: warm-up charts should not occupy the render cache
+            ChartGenerator.create_bar_chart.__wrapped__(generator, SAMPLE_ROWS, 'category', 'value', 'Warm-up', '')
+            ChartGenerator.create_chart_from_json.__wrapped__(generator, SAMPLE_SPEC)
+
+def warm_extractors():
+    """Import every extractor and preview and parse a tiny CSV and Excel sample"""
+    import importlib
+    import pandas as pd
+    from data_extractors.extractor_factory import ExtractorFactory, EXTRACTORS
+
+    for module_name, _ in set(EXTRACTORS.values()):
+        importlib.import_module(module_name, 'data_extractors')
+
+    with tempfile.TemporaryDirectory() as directory:
+        sample = pd.DataFrame(SAMPLE_ROWS)
+        for filename, write in (('warmup.csv', sample.to_csv), ('warmup.xlsx', sample.to_excel)):
+            path = os.path.join(directory, filename)
+            write(path, index=False)
+            extractor = ExtractorFactory.get_extractor(path)
+            extractor.extract_preview()
+            extractor.extract()
+
+def warm_providers():
+    """Open connections to every enabled AI provider"""
+    from ai_providers.provider_factory import ProviderFactory
+
+    for provider_name in ProviderFactory.get_available_providers():
+        ProviderFactory.get_provider(provider_name).warm_up()
+
+def warm_render_pool():
+    """Start the chart render worker processes"""
+    from visualization.parallel_renderer import parallel_renderer
+    parallel_renderer.warm(config.DEFAULT_TEMPLATE, config.CHART_OUTPUT_FORMAT)
+
+def warm_pdf():
+    """Start the Kaleido process used for PDF export"""
+    from visualization.static_export import static_renderer
+    static_renderer.warm()
+
+# Imported in the server's master process before it forks workers: the
+# modules are loaded once and their memory is shared copy-on-write
+PRELOAD_MODULES = (
+    'pandas',
+    'plotly.graph_objects',
+    'plotly.io',
+    'visualization.chart_generator',
+    'visualization.template_manager',
+    'data_extractors.csv_extractor',
+    'data_extractors.excel_extractor',
+    'data_extractors.pdf_extractor',
+    'data_extractors.image_extractor',
+    'ai_providers.huggingface_provider'
+)
+
+def preload_modules():
+    """
+    Import the heavy backends without starting threads, processes or
+    connections, none of which survive a fork
+    """
+    import importlib
+
+    for module_name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            print(f"Preloading {module_name} failed: {str(e)}")
+
+WARMUP_STEPS = {
+    'charts': warm_charts,
+    'extractors': warm_extractors,
+    'providers': warm_providers,
+    'render_pool': warm_render_pool,
+    'pdf': warm_pdf
+}
+
+class WarmupState:
+    """Runs the configured warm-up steps once in the background and tracks readiness"""
+
+    def __init__(self, steps=None):
+        self.steps = list(steps if steps is not None else config.WARMUP_STEPS)
+        self.status = 'pending'
+        self.results = {}
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start warm-up in a daemon thread (only once per process)"""
+        with self._lock:
+            if self._thread is not None or self.status == 'ready':
+                return
+            if not self.steps:
+                self.status = 'ready'
+                return
+            self.status = 'warming'
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+            self._thread.start()
+
+    def is_ready(self):
+        return self.status == 'ready'
+
+    def wait(self, timeout=None):
+        """Block until warm-up finishes; returns readiness"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.is_ready()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'status': self.status,
+                'steps': {name: dict(result) for name, result in self.results.items()},
+                'seconds': round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None
+            }
+
+    def _run(self):
+        for name in self.steps:
+            step = WARMUP_STEPS.get(name)
+            start = time.perf_counter()
+            try:
+                if step is None:
+                    raise ValueError(f"Unknown warm-up step: {name}")
+                step()
+                result = {'ok': True}
+            except Exception as e:
+                # A failed step leaves that part cold; it does not keep the worker out of rotation
+                print(f"Warm-up step '{name}' failed: {str(e)}")
+                result = {'ok': False, 'error': str(e)}
+            result['seconds'] = round(time.perf_counter() - start, 3)
+            with self._lock:
+                self.results[name] = result
+
+        with self._lock:
+            self.finished_at = time.time()
+            self.status = 'ready'
+        print(f"Warm-up finished in {self.finished_at - self.started_at:.2f}s")
+
+warmup = WarmupState()
@@ -0,0 +1,11 @@
+"""
+WSGI entry point for production servers
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn.conf.py starts the warm-up in each worker; other WSGI servers
+should call warmup.start() in their post-fork hook.
+"""
+from app import app
+
+application = app